@@ -0,0 +1,109 @@
+import sys
+import os
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict
+
+# Ensure the src module can be imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.engine import GameEngine
+from src.core.grid import TileGrid
+from src.data.models import Entity, EntityType, LevelConfig, Point
+
+MAP_SIZES = [(200, 100), (1000, 1000)]
+ENTITY_COUNTS = [1000, 100000]
+
+@dataclass(frozen=True)
+class DictPoint:
+    """The pre-slots Point, kept only as a point of comparison."""
+    x: int
+    y: int
+
+@dataclass
+class DictEntity:
+    """The pre-slots Entity, kept only as a point of comparison."""
+    name: str
+    symbol: str
+    position: DictPoint
+    hp: int = 1
+    max_hp: int = 1
+    entity_type: EntityType = EntityType.ENEMY
+    aura: bool = False
+    metadata: Dict = field(default_factory=dict)
+
+def build_template(width: int, height: int, minions: int, seed: int = 3) -> list:
+    """An open walled room with minions scattered over it and the player in a corner."""
+    rng = random.Random(seed)
+    grid = [["#"] * width] + [["#"] + ["."] * (width - 2) + ["#"] for _ in range(height - 2)] + [["#"] * width]
+    cells = [(x, y) for y in range(1, height - 1) for x in range(1, width - 1)]
+    for x, y in rng.sample(cells[1:-1], min(minions, len(cells) - 2)):
+        grid[y][x] = "G"
+    grid[1][1] = "@"
+    grid[height - 2][width - 2] = ">"
+    return ["".join(row) for row in grid]
+
+def allocated(build) -> tuple:
+    """Bytes still allocated after `build()` returns, and the object it built (kept alive while measuring)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, built
+
+def bench_grid(width: int, height: int) -> dict:
+    template = build_template(width, height, 0)
+    lists, _ = allocated(lambda: [list(row) for row in template])
+    packed, _ = allocated(lambda: TileGrid(template))
+    return {"lists_mb": lists / 2**20, "grid_mb": packed / 2**20}
+
+def bench_entities(count: int) -> dict:
+    dicts, _ = allocated(lambda: [DictEntity("Minion", "G", DictPoint(i, i), 5, 5) for i in range(count)])
+    slots, _ = allocated(lambda: [Entity("Minion", "G", Point(i, i), 5, 5) for i in range(count)])
+    return {"dataclass_b": dicts / count, "slots_b": slots / count}
+
+def bench_engine(width: int, height: int, minions: int) -> dict:
+    level = LevelConfig(99, "Bench", "", build_template(width, height, minions))
+    engine = GameEngine()
+    started = time.perf_counter()
+    engine.load_level(level)
+    load = time.perf_counter() - started
+
+    started = time.perf_counter()
+    engine.mark_all_dirty()
+    engine.get_render_data()
+    render = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(100):
+        engine.save_state()
+        engine.move_player(1, 0, width)
+        engine.undo()
+    undo = (time.perf_counter() - started) / 100
+    return {"load_ms": load * 1e3, "render_ms": render * 1e3, "undo_us": undo * 1e6}
+
+def main():
+    print("Tile storage (walled room, no entities)")
+    print(f"{'map':>10} {'list of lists MB':>17} {'TileGrid MB':>12}")
+    for width, height in MAP_SIZES:
+        result = bench_grid(width, height)
+        print(f"{f'{width}x{height}':>10} {result['lists_mb']:>17.2f} {result['grid_mb']:>12.2f}")
+
+    print("\nBytes per minion, including its Point and metadata dict")
+    print(f"{'entities':>10} {'dataclass':>10} {'slots':>10}")
+    for count in ENTITY_COUNTS:
+        result = bench_entities(count)
+        print(f"{count:>10} {result['dataclass_b']:>10.0f} {result['slots_b']:>10.0f}")
+
+    print("\nEngine on large levels (full render builds the whole map; no camera)")
+    print(f"{'map':>10} {'minions':>8} {'load ms':>9} {'render ms':>10} {'save+move+undo us':>18}")
+    for width, height in MAP_SIZES:
+        for minions in ENTITY_COUNTS:
+            result = bench_engine(width, height, minions)
+            print(f"{f'{width}x{height}':>10} {minions:>8} {result['load_ms']:>9.1f} {result['render_ms']:>10.1f} {result['undo_us']:>18.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+
+# Ensure the src module can be imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.engine import GameEngine
+from src.data.procgen import DungeonGenerator
+from src.data.models import LevelConfig, Point
+
+MAP_SIZES = [(25, 12), (100, 50), (400, 200), (1000, 1000)]
+COUNT = 9999
+REPEATS = 200
+
+def build_engine(width: int, height: int) -> GameEngine:
+    """An open procgen map with the player's column cleared, so 9999j runs to the bottom wall."""
+    grid = [list(row) for row in DungeonGenerator(width, height, seed=11).generate(difficulty=11)]
+    for y in range(2, height - 1):
+        grid[y][1] = "."
+    engine = GameEngine()
+    engine.load_level(LevelConfig(99, "Bench", "", ["".join(row) for row in grid]))
+    return engine
+
+def step_move(engine: GameEngine, dx: int, dy: int, count: int):
+    """The per-step loop counted moves used before the ray tables, kept only as a point of comparison."""
+    for _ in range(count):
+        new_x = max(0, min(engine.width - 1, engine.player.position.x + dx))
+        new_y = max(0, min(engine.height - 1, engine.player.position.y + dy))
+        if not engine._enter(Point(new_x, new_y)):
+            break
+
+def bench_moves(width: int, height: int) -> dict:
+    engine = build_engine(width, height)
+    start = engine.player.position
+
+    def timed(move, invalidate: bool) -> float:
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            engine.player.position = start
+            if invalidate:
+                # A removal or unlock somewhere in the column
+                engine.rays.invalidate(start.x, height // 2)
+            move()
+        return (time.perf_counter() - started) / REPEATS
+
+    warm = timed(lambda: engine.move_player(0, 1, COUNT), False)
+    cold = timed(lambda: engine.move_player(0, 1, COUNT), True)
+    stepped = timed(lambda: step_move(engine, 0, 1, COUNT), False)
+    return {"cells": height - 3, "warm_us": warm * 1e6, "rebuilt_us": cold * 1e6, "stepped_us": stepped * 1e6}
+
+def main():
+    print(f"{COUNT}j down an open column")
+    print(f"{'size':>10} {'cells':>6} {'ray us':>9} {'rebuilt us':>11} {'stepped us':>11}")
+    for width, height in MAP_SIZES:
+        result = bench_moves(width, height)
+        print(f"{f'{width}x{height}':>10} {result['cells']:>6} {result['warm_us']:>9.2f} {result['rebuilt_us']:>11.2f} {result['stepped_us']:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import sys
+import os
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+
+# Ensure the src module can be imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data.models import LevelConfig
+from src.data.pack import level_to_dict, read_levels_json, read_pack, write_pack
+from src.data.procgen import DungeonGenerator
+
+LIBRARY_SIZES = [1000, 20000]
+DISTINCT_MAPS = 200 # Generated maps reused across the library; generation is not what is measured
+LOOKUPS = 1000
+
+def build_library(count: int) -> list:
+    """`count` procedural sectors with the curriculum's hint and formula par (no solver)."""
+    maps = [DungeonGenerator(25, 12, seed=seed).generate(difficulty=11 + seed % 20) for seed in range(DISTINCT_MAPS)]
+    return [
+        LevelConfig(n, f"Sector {n}", f"Proceed to the next portal. Threat Level {n}.", maps[n % DISTINCT_MAPS],
+                    {"all"}, n * 2 + 10, hint="Procedural Sector. Use everything you've learned.")
+        for n in range(count)
+    ]
+
+def load_json(path: str) -> list:
+    """Every level decoded up front, kept only as a point of comparison."""
+    return read_levels_json(path)
+
+def measure(open_library, count: int) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    library = open_library()
+    opened = time.perf_counter() - started
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    rng = random.Random(1)
+    started = time.perf_counter()
+    for _ in range(LOOKUPS):
+        library[rng.randrange(count)]
+    lookup = (time.perf_counter() - started) / LOOKUPS
+    return {"open_ms": opened * 1e3, "held_mb": held / 2**20, "lookup_us": lookup * 1e6}
+
+def main():
+    print("Level libraries: time to open, Python memory held once open (mapped pages are not counted), time to fetch one level")
+    print(f"{'levels':>8} {'format':>6} {'file MB':>8} {'open ms':>9} {'held MB':>8} {'level us':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in LIBRARY_SIZES:
+            levels = build_library(count)
+            pack_path = os.path.join(directory, f"{count}.pack")
+            json_path = os.path.join(directory, f"{count}.json")
+            write_pack(levels, path=pack_path)
+            with open(json_path, "w") as json_file:
+                json.dump([level_to_dict(level) for level in levels], json_file)
+            del levels
+
+            for name, path, opener in (("json", json_path, load_json), ("pack", pack_path, read_pack)):
+                result = measure(lambda: opener(path), count)
+                print(f"{count:>8} {name:>6} {os.path.getsize(path) / 2**20:>8.2f} {result['open_ms']:>9.2f} {result['held_mb']:>8.2f} {result['lookup_us']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import sys
+import os
+import string
+import time
+
+# Ensure the src module can be imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.vim_logic import VimParser
+from src.data.models import GameMode
+
+# Counts, registers, operators and plain motions, using Textual key names where it has them
+KEY_STREAM = ["5", "j", "quotation_mark", "a", "y", "d", "d", "l", "w", "1", "2", "h", "quotation_mark", "a", "p", "k", "b", "u"]
+REPEATS = 20000
+
+def build_parser(remaps: bool, extra_bindings: int) -> VimParser:
+    key_map = {}
+    if remaps:
+        # Swap every hjkl pair and map the spare letters onto motions
+        key_map = {"h": "l", "l": "h", "j": "k", "k": "j"}
+        key_map.update({char: "w" for char in "eimnorstxz"})
+    parser = VimParser(lambda mode: None, lambda action, params: None, key_map)
+    # Extra multi-key bindings under spare prefixes, like a heavily customised config
+    prefixes = [char for char in string.ascii_uppercase if char != "T"]
+    for i in range(extra_bindings):
+        parser.register_motion(prefixes[i % len(prefixes)] + string.ascii_lowercase[i // len(prefixes) % 26], f"extra{i}")
+    return parser
+
+def bench_parser(remaps: bool, extra_bindings: int) -> float:
+    """Keys per second through VimParser.handle_key."""
+    parser = build_parser(remaps, extra_bindings)
+    keys = KEY_STREAM * REPEATS
+    started = time.perf_counter()
+    for key in keys:
+        parser.handle_key(key, GameMode.NORMAL)
+    return len(keys) / (time.perf_counter() - started)
+
+def main():
+    print(f"handle_key throughput over {len(KEY_STREAM) * REPEATS} keys")
+    print(f"{'remaps':>7} {'extra bindings':>15} {'keys/s':>12}")
+    for remaps, extra_bindings in [(False, 0), (True, 0), (False, 500), (True, 500)]:
+        print(f"{str(remaps):>7} {extra_bindings:>15} {bench_parser(remaps, extra_bindings):>12,.0f}")
+
+if __name__ == "__main__":
+    main()
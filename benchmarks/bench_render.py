@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+
+# Ensure the src module can be imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.engine import GameEngine
+from src.data.procgen import DungeonGenerator
+from src.data.models import LevelConfig, Point
+from src.ui.widgets import VimMap
+
+MAP_SIZES = [(25, 12), (100, 50), (200, 100), (400, 200)]
+KEYSTROKES = 50
+
+def bench_render(width: int, height: int, incremental: bool) -> float:
+    """
+    Average cost of one frame after a single-cell player move: engine row
+    composition plus building the VimMap strips for every line Textual repaints.
+    """
+    engine = GameEngine()
+    engine.load_level(LevelConfig(99, "Bench", "", DungeonGenerator(width, height, seed=3).generate(difficulty=20)))
+    vim_map = VimMap()
+    vim_map.render_map(engine.get_render_data(), engine.player.position, engine.aura_active, engine.mode)
+
+    started = time.perf_counter()
+    for step in range(KEYSTROKES):
+        engine.player.position = Point(1 + step % 2, 1)
+        if not incremental:
+            engine.mark_all_dirty()
+        vim_map.render_map(
+            engine.get_render_data(),
+            engine.player.position,
+            engine.aura_active,
+            engine.mode,
+            engine.visual_anchor,
+            engine.render_dirty_rows
+        )
+        for row_index in engine.render_dirty_rows or range(height):
+            vim_map.row_strip(row_index)
+    return (time.perf_counter() - started) / KEYSTROKES
+
+def main():
+    print(f"Per-keystroke render latency (player moves one cell, {KEYSTROKES} frames)")
+    print(f"{'map':>10} {'full ms':>10} {'incremental ms':>15} {'speedup':>8}")
+    for width, height in MAP_SIZES:
+        full = bench_render(width, height, incremental=False)
+        incremental = bench_render(width, height, incremental=True)
+        print(f"{width}x{height:<6} {full * 1e3:>10.3f} {incremental * 1e3:>15.3f} {full / incremental:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
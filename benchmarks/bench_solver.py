@@ -0,0 +1,45 @@
+import sys
+import os
+import time
+
+# Ensure the src module can be imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.solver import solve_par
+from src.data.procgen import DungeonGenerator
+from src.data.models import LevelConfig
+
+MAP_SIZES = [(25, 12), (40, 20), (60, 30), (100, 50)]
+DIFFICULTIES = [11, 15, 18, 24, 30]
+SEEDS = range(5)
+
+def bench_solver(width: int, height: int, difficulty: int) -> dict:
+    """Solves one map per seed and reports the slowest solve and the average optimum."""
+    times, strokes, failed = [], [], 0
+    for seed in SEEDS:
+        level = LevelConfig(difficulty, "Bench", "", DungeonGenerator(width, height, seed=seed).generate(difficulty=difficulty))
+        started = time.perf_counter()
+        solution = solve_par(level)
+        times.append(time.perf_counter() - started)
+        if solution is None:
+            failed += 1
+        else:
+            strokes.append(solution.strokes)
+    return {
+        "mean_ms": sum(times) / len(times) * 1e3,
+        "max_ms": max(times) * 1e3,
+        "mean_strokes": sum(strokes) / len(strokes) if strokes else 0.0,
+        "failed": failed,
+    }
+
+def main():
+    print(f"solve_par over {len(SEEDS)} seeded procgen maps per row")
+    print(f"{'size':>8} {'difficulty':>10} {'mean ms':>9} {'max ms':>9} {'strokes':>8} {'failed':>7}")
+    for width, height in MAP_SIZES:
+        for difficulty in DIFFICULTIES:
+            result = bench_solver(width, height, difficulty)
+            print(f"{f'{width}x{height}':>8} {difficulty:>10} {result['mean_ms']:>9.1f} {result['max_ms']:>9.1f} "
+                  f"{result['mean_strokes']:>8.1f} {result['failed']:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import sys
+import os
+import random
+import time
+
+# Ensure the src module can be imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.engine import GameEngine
+from src.data.procgen import DungeonGenerator
+from src.data.models import LevelConfig, Point
+
+MAP_SIZE = 200
+ENTITY_COUNTS = [0, 100, 1000, 5000]
+STEPS = 190
+
+def build_level(entity_count: int, seed: int = 7) -> LevelConfig:
+    """Builds a large procgen map and packs extra minions onto it, keeping row 1 open."""
+    rng = random.Random(seed)
+    grid = [list(row) for row in DungeonGenerator(MAP_SIZE, MAP_SIZE, seed=seed).generate(difficulty=30)]
+    for x in range(2, MAP_SIZE - 1):
+        grid[1][x] = "."
+    free = [(x, y) for y in range(2, MAP_SIZE - 1) for x in range(1, MAP_SIZE - 1) if grid[y][x] == "."]
+    for x, y in rng.sample(free, entity_count):
+        grid[y][x] = "G"
+    return LevelConfig(99, "Bench", "", ["".join(row) for row in grid])
+
+def linear_lookup(engine: GameEngine, position: Point):
+    """The pre-index lookup, kept only as a point of comparison."""
+    for entity in engine.enemies + engine.interactables:
+        if entity.position == position: return entity
+    return None
+
+def bench_counted_motion(entity_count: int, repeats: int = 20) -> dict:
+    engine = GameEngine()
+    engine.load_level(build_level(entity_count))
+    start = engine.player.position
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        engine.player.position = start
+        engine.move_player(1, 0, STEPS)
+    indexed = (time.perf_counter() - started) / (repeats * STEPS)
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for x in range(STEPS):
+            linear_lookup(engine, Point(start.x + x, start.y))
+    linear = (time.perf_counter() - started) / (repeats * STEPS)
+
+    return {
+        "entities": len(engine.enemies) + len(engine.interactables),
+        "indexed_step_us": indexed * 1e6,
+        "linear_lookup_us": linear * 1e6,
+    }
+
+def main():
+    print(f"Counted motion ({STEPS}l) on a {MAP_SIZE}x{MAP_SIZE} procgen map")
+    print(f"{'entities':>10} {'indexed us/step':>16} {'linear us/lookup':>17}")
+    for entity_count in ENTITY_COUNTS:
+        result = bench_counted_motion(entity_count)
+        print(f"{result['entities']:>10} {result['indexed_step_us']:>16.2f} {result['linear_lookup_us']:>17.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Benchmark suite for the hot paths: counted moves, undo, render data, map
+markup, camera scrolling, parser throughput and procgen, swept over map sizes
+and minion densities. Runs headless.
+
+    python benchmarks/run.py --save-baseline      # once per machine: record its numbers as the baseline
+    python benchmarks/run.py                      # run, write results.json, compare with baseline.json
+    python benchmarks/run.py --quick --tolerance 0.5
+
+Each case reports the best per-operation time over several rounds, in
+microseconds; cases under a millisecond get more rounds, being the ones a
+busy machine skews most. Timings only mean something next to numbers from
+the same machine, so no baseline is shipped: record one locally first,
+before the change being measured. Without one the run only prints its
+numbers.
+
+Cases are compared as ratios to the "reference" case, plain Python work
+that none of the game code affects, timed in rounds alternating with each
+case's own, so a machine that is busier than when the baseline was taken
+does not read as a regression. The run exits with status 1 when any case's
+ratio grew by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+# Ensure the src module can be imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.engine import GameEngine
+from src.core.vim_logic import VimParser
+from src.data.procgen import DungeonGenerator
+from src.data.models import GameMode, LevelConfig, Point
+from src.ui.widgets import VimMap
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(HERE, "baseline.json")
+RESULTS_FILE = os.path.join(HERE, "results.json")
+
+MAP_SIZES = [(25, 12), (100, 50), (400, 200)]
+QUICK_MAP_SIZES = [(25, 12), (100, 50)]
+DENSITIES = [0.0, 0.02, 0.1] # Fraction of open cells holding a minion
+VIEWPORT = (60, 30) # Camera size in cells for the view_* cases, about a full-screen terminal
+COUNT = 9999
+ROUNDS = 5
+SHORT_CASE_ROUNDS = 15 # For cases under SHORT_CASE_US, whose best time is the noisiest
+SHORT_CASE_US = 1000
+ROUND_SECONDS = 0.02 # Each round repeats the operation for at least this long
+TOLERANCE = 0.3 # Allowed slowdown over the baseline, relative to the reference case, before a case fails
+REFERENCE_CASE = "reference"
+
+# Counts, registers, operators and plain motions, using Textual key names where it has them
+KEY_STREAM = ["5", "j", "quotation_mark", "a", "y", "d", "d", "l", "w", "1", "2", "h", "quotation_mark", "a", "p", "k", "b", "u"]
+
+def build_level(width: int, height: int, density: float, seed: int = 5) -> LevelConfig:
+    """A procgen map with minions scattered at `density`; the player's column is kept clear for counted moves."""
+    rng = random.Random(seed)
+    grid = [list(row) for row in DungeonGenerator(width, height, seed=seed).generate(difficulty=11)]
+    for y in range(2, height - 1):
+        grid[y][1] = "."
+    free = [(x, y) for y in range(2, height - 1) for x in range(2, width - 1) if grid[y][x] == "."]
+    for x, y in rng.sample(free, int(len(free) * density)):
+        grid[y][x] = "G"
+    return LevelConfig(99, "Bench", "", ["".join(row) for row in grid])
+
+def reference():
+    """Interpreter work unrelated to the game: dict, list and string churn."""
+    table = {}
+    for i in range(200):
+        table[str(i)] = [i] * 4
+    "".join(sorted(table))
+
+def calibrate(operation: Callable[[], None]) -> int:
+    """How many calls of `operation` take about ROUND_SECONDS."""
+    number = 1
+    while True:
+        elapsed = timed(operation, number) * number
+        if elapsed >= ROUND_SECONDS:
+            return number
+        number *= 2 if elapsed == 0 else max(2, min(10, int(ROUND_SECONDS / elapsed) + 1))
+
+def timed(operation: Callable[[], None], number: int) -> float:
+    """Seconds per call over `number` calls."""
+    started = time.perf_counter()
+    for _ in range(number):
+        operation()
+    return (time.perf_counter() - started) / number
+
+def measure(operation: Callable[[], None], reference_number: int) -> Tuple[float, float, float]:
+    """
+    Times `operation` in rounds alternating with rounds of the reference
+    case, so each pair sees the same load: ROUNDS pairs, or SHORT_CASE_ROUNDS
+    for short cases. Returns the best seconds per call of each and the
+    median ratio of the operation's time to the reference's over the pairs.
+    """
+    number = calibrate(operation)
+    times, reference_times = [], []
+    rounds = ROUNDS
+    while len(times) < rounds:
+        times.append(timed(operation, number))
+        reference_times.append(timed(reference, reference_number))
+        if times[0] * 1e6 < SHORT_CASE_US:
+            rounds = SHORT_CASE_ROUNDS
+    ratios = sorted(case / base for case, base in zip(times, reference_times))
+    return min(times), min(reference_times), ratios[len(ratios) // 2]
+
+def map_cases(width: int, height: int, density: float) -> Dict[str, Callable[[], None]]:
+    """The engine and render operations for one map, keyed by case name."""
+    engine = GameEngine()
+    engine.load_level(build_level(width, height, density))
+    start = engine.player.position
+    vim_map = VimMap()
+
+    def move():
+        engine.player.position = start
+        engine.move_player(0, 1, COUNT)
+
+    def undo():
+        engine.save_state()
+        engine.move_player(0, 1, COUNT)
+        engine.undo()
+
+    def render_step():
+        # One-cell move: only the touched rows are recomposed
+        engine.player.position = Point(start.x, start.y + (engine.player.position == start))
+        engine.get_render_data()
+
+    def render_full():
+        engine.mark_all_dirty()
+        engine.get_render_data()
+
+    def markup():
+        vim_map.render_map(engine.get_render_data(), engine.player.position, engine.aura_active, engine.mode)
+        for row_index in range(height):
+            vim_map.row_strip(row_index)
+
+    # The same map seen through a terminal-sized camera; walking the column keeps it scrolling
+    viewed = GameEngine()
+    viewed.load_level(build_level(width, height, density))
+    viewed.camera.resize(*VIEWPORT)
+    viewed_map = VimMap()
+
+    # Once the walk passes the margin every step scrolls; it wraps back there at the bottom
+    scroll_from = min(VIEWPORT[1], height // 2)
+
+    def view_scroll():
+        y = viewed.player.position.y + 1
+        viewed.player.position = Point(start.x, y if y < height - 1 else scroll_from)
+        left, top, _, _ = viewed.render_window
+        viewed_map.render_map(viewed.get_render_data(), viewed.player.position, viewed.aura_active, viewed.mode,
+                              dirty_rows=viewed.render_dirty_rows, origin=Point(left, top))
+        for row_index in viewed.render_dirty_rows or range(len(viewed.render_buffer)):
+            viewed_map.row_strip(row_index)
+
+    return {
+        "move": move, "undo": undo, "render_step": render_step, "render_full": render_full, "markup": markup,
+        "view_scroll": view_scroll,
+    }
+
+def run_suite(map_sizes: List[Tuple[int, int]]) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Runs every case. Returns microseconds per operation and each case's time
+    as a multiple of the reference case's, both keyed by case id.
+    """
+    results: Dict[str, float] = {}
+    relative: Dict[str, float] = {}
+    reference_number = calibrate(reference)
+
+    def record(case: str, operation: Callable[[], None], per_call: int = 1):
+        seconds, reference_seconds, ratio = measure(operation, reference_number)
+        results[case] = seconds * 1e6 / per_call
+        relative[case] = ratio
+        results[REFERENCE_CASE] = min(results.get(REFERENCE_CASE, float("inf")), reference_seconds * 1e6)
+
+    for width, height in map_sizes:
+        for density in DENSITIES:
+            for name, operation in map_cases(width, height, density).items():
+                record(f"{name}/{width}x{height}/d{density:g}", operation)
+        record(f"procgen/{width}x{height}", lambda: DungeonGenerator(width, height, seed=1).generate(difficulty=20))
+
+    parser = VimParser(lambda mode: None, lambda action, params: None)
+    def parse():
+        for key in KEY_STREAM:
+            parser.handle_key(key, GameMode.NORMAL)
+    record("parser/stream", parse, len(KEY_STREAM))
+    return results, relative
+
+def compare(results: Dict[str, float], relative: Dict[str, float], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Prints each case against the baseline and returns the ids that regressed.
+    The change is that of the case's time relative to the reference case.
+    """
+    regressions = []
+    print(f"{'case':<32} {'us/op':>12} {'baseline':>12} {'change':>8}")
+    for case, value in results.items():
+        base = baseline["results"].get(case)
+        if case not in relative or case not in baseline["relative"]:
+            print(f"{case:<32} {value:>12.2f} {'-' if base is None else f'{base:.2f}':>12} {'-' if case == REFERENCE_CASE else 'new':>8}")
+            continue
+        change = relative[case] / baseline["relative"][case] - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(case)
+            flag = "  REGRESSION"
+        print(f"{case:<32} {value:>12.2f} {base:>12.2f} {change:>+7.0%}{flag}")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the engine, parser, procgen and render hot paths.")
+    parser.add_argument("--quick", action="store_true", help="skip the largest map size")
+    parser.add_argument("--output", default=RESULTS_FILE, help="where to write this run's results")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown relative to the reference case, 0.3 = 30%%")
+    args = parser.parse_args(argv)
+
+    results, relative = run_suite(QUICK_MAP_SIZES if args.quick else MAP_SIZES)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "unit": "us/op",
+        "results": results,
+        "relative": relative,
+    }
+    with open(args.baseline if args.save_baseline else args.output, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+
+    if args.save_baseline:
+        print(f"Saved {len(results)} cases to {args.baseline}")
+        return 0
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    if "relative" not in baseline:
+        for case, value in results.items():
+            print(f"{case:<32} {value:>12.2f}")
+        print("\nNo baseline to compare with; record one on this machine first with --save-baseline.")
+        return 0
+    regressions = compare(results, relative, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
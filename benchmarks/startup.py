@@ -0,0 +1,97 @@
+"""
+Cold start budget: how long a fresh interpreter takes to import the game and
+to show its first frame, headless.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --frame-budget 800
+
+Every sample starts a new Python process so no module is already imported,
+and the best of the runs is held against the budget. First frame is timed
+from spawning the process to the app's Ready event, interpreter start-up
+included, since that is what a player waits through. The run exits with
+status 1 when either number is over its budget.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+RUNS = 5
+IMPORT_BUDGET_MS = 500 # import src.app, measured inside the process; Textual is most of it
+FRAME_BUDGET_MS = 1000 # process spawn to first frame
+
+IMPORT_PROBE = """
+import time
+started = time.perf_counter()
+import src.app
+print((time.perf_counter() - started) * 1e3)
+"""
+
+# Ready is sent once the first frame has been drawn
+FRAME_PROBE = """
+from src.app import VimMasterpiece
+
+class Probe(VimMasterpiece):
+    def on_ready(self):
+        print("ready", flush=True)
+        self.exit()
+
+Probe().run(headless=True, size=(120, 40))
+"""
+
+def spawn(code: str, workdir: str) -> subprocess.Popen:
+    # Run from a scratch directory so the score database and any .vimgamerc there stay out of the tree
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.Popen([sys.executable, "-c", code], cwd=workdir, env=env, stdout=subprocess.PIPE, text=True)
+
+def time_import(workdir: str) -> float:
+    process = spawn(IMPORT_PROBE, workdir)
+    output, _ = process.communicate()
+    return float(output.strip().splitlines()[-1])
+
+def time_first_frame(workdir: str) -> float:
+    started = time.perf_counter()
+    process = spawn(FRAME_PROBE, workdir)
+    line = process.stdout.readline()
+    elapsed = (time.perf_counter() - started) * 1e3
+    process.communicate()
+    if line.strip() != "ready":
+        raise RuntimeError("the app exited before drawing its first frame")
+    return elapsed
+
+def time_interpreter(workdir: str) -> float:
+    started = time.perf_counter()
+    spawn("pass", workdir).communicate()
+    return (time.perf_counter() - started) * 1e3
+
+def report(name: str, samples: List[float], budget: float) -> bool:
+    best = min(samples)
+    within = best <= budget
+    print(f"{name:<14} {best:>9.1f} {sorted(samples)[len(samples) // 2]:>9.1f} {budget:>9.0f}  {'ok' if within else 'OVER BUDGET'}")
+    return within
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure import time and time to first frame against a budget.")
+    parser.add_argument("--runs", type=int, default=RUNS, help="fresh processes per measurement")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS, help="milliseconds allowed for import src.app")
+    parser.add_argument("--frame-budget", type=float, default=FRAME_BUDGET_MS, help="milliseconds allowed from spawn to first frame")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        interpreter = [time_interpreter(workdir) for _ in range(args.runs)]
+        imports = [time_import(workdir) for _ in range(args.runs)]
+        frames = [time_first_frame(workdir) for _ in range(args.runs)]
+
+    print(f"{'':<14} {'best ms':>9} {'median':>9} {'budget':>9}")
+    print(f"{'interpreter':<14} {min(interpreter):>9.1f} {sorted(interpreter)[len(interpreter) // 2]:>9.1f} {'-':>9}")
+    within = report("import", imports, args.import_budget)
+    within = report("first frame", frames, args.frame_budget) and within
+    return 0 if within else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,39 @@
-import winsound
+import time
+from collections.abc import Sequence
+from functools import partial
 from textual.app import App, ComposeResult
-from textual.widgets import Header, Footer, Static
+from textual.widgets import Header, Footer, RichLog
 from textual.containers import Container, Vertical, Horizontal
+from textual.worker import get_current_worker
+from rich.markup import escape
 
 from src.core.engine import GameEngine
-from src.core.vim_logic import VimParser
+from src.core.vim_logic import VimParser, decode_keys, normalize_key
 from src.core.config import ConfigManager
-from src.data.levels import LEVELS
-from src.data.models import GameMode
-from src.data.narrative import MILESTONE_1, MILESTONE_10, MILESTONE_30
-from src.ui.widgets import VimMap, StatsDisplay, CommandBar, SoundBubble, NarrativeOverlay, HelpPanel, HelpOverlay
+from src.core.events import LOG_LINES, EventKind, EventLogWriter
+from src.core.profiler import Profiler
+from src.core.scheduler import TICK_SECONDS, Scheduler
+from src.data.levels import DUNGEON_HEIGHT, DUNGEON_WIDTH, LEVELS, Curriculum
+from src.data.models import GameMode, LevelConfig, Point
+from src.data.pack import read_pack
+from src.data.narrative import MILESTONE_30, MILESTONES
+from src.ui.widgets import VimMap, StatsDisplay, CommandBar, SoundBubble, NarrativeOverlay, HelpPanel, HelpOverlay, PerfOverlay
 from src.mechanics.engines import ScoringEngine
+from src.mechanics.audio import AudioSystem
+
+UI_PARTS = ("map", "log", "stats", "hint")
+PERF_REFRESH = 0.5 # Seconds between performance overlay updates
+
+# Cosmetic durations in clock ticks (TICK_SECONDS each)
+SHAKE_TICKS = 2
+BUBBLE_TICKS = 6
+AURA_PULSE_TICKS = 8
 
 class VimMasterpiece(App):
     """The Ultimate Vim Learning Game: Featuring Interactive Help and Masterpiece Aesthetics."""
     
+    FRAME_INTERVAL = 1 / 30 # Upper bound on UI flushes, however fast keys arrive
+    
     CSS = """
     Screen { background: #1a1b26; color: #c0caf5; }
     #main-container { layout: horizontal; width: 100%; height: 100%; }
@@ -52,6 +71,17 @@ class VimMasterpiece(App):
     .theme-gruvbox { background: #282828; color: #ebdbb2; }
     """
 
+    def __init__(self):
+        super().__init__()
+        # Settings are read before the DOM exists: a class added now costs nothing,
+        # while every class change after mounting restyles the whole screen
+        self.config = ConfigManager()
+        self.themes = ["tokyonight", "dracula", "gruvbox"]
+        theme = self.config.settings.theme
+        self.current_theme_idx = self.themes.index(theme) if theme in self.themes else 0
+        self.add_class(f"theme-{self.themes[self.current_theme_idx]}")
+        self.overlays = {} # Help and perf overlays by id, mounted the first time they are shown
+
     def compose(self) -> ComposeResult:
         yield Header()
         with Container(id="main-container"):
@@ -59,164 +89,358 @@ class VimMasterpiece(App):
             with Vertical(id="side-pane"):
                 yield StatsDisplay(id="stats")
                 yield HelpPanel(id="help-panel")
-                yield Static(id="log")
+                yield RichLog(id="log", max_lines=LOG_LINES, wrap=True, markup=True)
         yield CommandBar("Buffer: ", id="command-bar")
         yield SoundBubble(id="sound-fx")
-        yield HelpOverlay(id="help-overlay")
         yield NarrativeOverlay(id="narrative")
         yield Footer()
 
     def on_mount(self) -> None:
         """Called when the application is mounted. Initializes game components."""
-        self.engine = GameEngine()
-        self.parser = VimParser(self.on_mode_change, self.on_action)
+        # One clock drives every timed effect: particles, the aura pulse, the screen shake and the sound bubble
+        self.clock = Scheduler()
+        self.engine = GameEngine(self.clock)
         self.scoring = ScoringEngine()
-        self.config = ConfigManager()
+        self.parser = VimParser(self.on_mode_change, self.on_action, self.config.settings.key_map)
+        self.audio = AudioSystem.from_config(self.config, ring=lambda: self.call_from_thread(self.bell))
+        self.engine.camera.scrolloff = self.config.settings.scrolloff
+        self.levels = self.build_curriculum(self.config.settings)
+        self.profiler = Profiler(tracing=bool(self.config.settings.trace_file))
+        self.perf_timer = None
+        self.key_started = None # When the oldest key not yet drawn arrived, while profiling
         
-        self.themes = ["tokyonight", "dracula", "gruvbox"]
-        self.current_theme_idx = 0
-        self.add_class(f"theme-{self.themes[0]}")
+        self.bubble_timer = None
+        # Hold the map itself: the tick timer can still fire while the DOM is being torn down
+        vim_map = self.query_one("#map", VimMap)
+        self.clock.every(AURA_PULSE_TICKS, vim_map.pulse)
+        self.tick_timer = self.set_interval(TICK_SECONDS, self.on_tick)
+
+        self.dirty_parts = set()
+        self.frame_pending = False
+        self.last_frame_time = 0.0
+        self.log_seq = 0 # Last event already written to the log
+        self.loading = False # A sector is being generated in a worker
+
+        self.config.subscribe(self.apply_theme, "theme")
+        self.config.subscribe(lambda settings, changed: self.parser.set_key_map(settings.key_map), "key_map")
+        self.config.subscribe(self.restart_audio, "sound_enabled", "sound_backend", "sound_files")
+        self.config.subscribe(lambda settings, changed: self.show_perf(settings.profiling), "profiling")
+        self.config.subscribe(self.apply_scrolloff, "scrolloff")
+        self.config.subscribe(lambda settings, changed: setattr(self, "levels", self.build_curriculum(settings)), "dungeon_size", "level_pack")
+        self.config.watch(dispatch=self.call_from_thread)
+        self.show_perf(self.config.settings.profiling)
+
+        events = self.engine.events
+        events.subscribe(self.on_log_event)
+        events.subscribe(self.on_damage, EventKind.DAMAGED)
+        events.subscribe(self.on_level_complete, EventKind.LEVEL_COMPLETE)
+        self.event_log = None
+        if self.config.settings.event_log:
+            self.event_log = EventLogWriter(self.config.settings.event_log)
+            events.subscribe(self.event_log, threaded=True)
         
         self.load_level()
 
+    def on_unmount(self) -> None:
+        self.tick_timer.stop()
+        self.workers.cancel_all()
+        if self.perf_timer is not None:
+            self.perf_timer.stop()
+        self.clock.clear()
+        self.config.stop()
+        self.audio.close()
+        self.scoring.close()
+        self.engine.events.close()
+        if self.event_log:
+            self.event_log.close()
+        if self.config.settings.trace_file:
+            self.profiler.dump_trace(self.config.settings.trace_file)
+
+    def apply_theme(self, settings, changed=None):
+        """Switches to the configured theme, if it is one the app knows."""
+        if settings.theme in self.themes:
+            self.remove_class(f"theme-{self.themes[self.current_theme_idx]}")
+            self.current_theme_idx = self.themes.index(settings.theme)
+            self.add_class(f"theme-{settings.theme}")
+
+    def restart_audio(self, settings, changed):
+        """Rebuilds the audio system after a sound setting changed."""
+        self.audio.close()
+        self.audio = AudioSystem.from_config(self.config, ring=lambda: self.call_from_thread(self.bell))
+
+    def build_curriculum(self, settings) -> Sequence:
+        """
+        The configured level pack, else the shared curriculum or one with
+        procedural sectors of the configured size (used from the next sector on).
+        Those sectors are generated in a worker and played on the formula par
+        until another worker has searched the real one.
+        """
+        if settings.level_pack:
+            pack = read_pack(settings.level_pack)
+            if pack is not None and len(pack):
+                return pack
+            self.engine.publish(EventKind.INFO, "Could not open level pack {}; playing the curriculum.", escape(settings.level_pack))
+        # Sectors smaller than the default would not fit the generator's features
+        width, height = max(settings.dungeon_size[0], DUNGEON_WIDTH), max(settings.dungeon_size[1], DUNGEON_HEIGHT)
+        if (width, height) == (DUNGEON_WIDTH, DUNGEON_HEIGHT):
+            return LEVELS
+        return Curriculum(width=width, height=height, solve=False)
+
+    def apply_scrolloff(self, settings, changed):
+        self.engine.camera.scrolloff = settings.scrolloff
+        self.engine.mark_all_dirty()
+        self.update_ui("map")
+
+    def show_perf(self, visible: bool):
+        """Opens or closes the performance overlay; spans are only timed while it is open or a trace is recording."""
+        if visible and self.perf_timer is None:
+            overlay = self.overlay(PerfOverlay, "perf")
+            self.profiler.enabled = True
+            self.perf_timer = self.set_interval(PERF_REFRESH, lambda: overlay.show_summary(self.profiler.summary()))
+            overlay.show_summary(self.profiler.summary())
+        elif not visible and self.perf_timer is not None:
+            self.perf_timer.stop()
+            self.perf_timer = None
+            self.profiler.enabled = self.profiler.tracing
+            self.overlays["perf"].hide()
+
+    def overlay(self, widget_type, widget_id: str):
+        """The overlay with this id, mounted on first use so startup only composes what the first frame shows."""
+        widget = self.overlays.get(widget_id)
+        if widget is None:
+            widget = self.overlays[widget_id] = widget_type(id=widget_id)
+            self.mount(widget)
+        return widget
+
     def load_level(self):
         """Loads the current level and shows narrative milestones."""
         level_index = self.engine.current_level_index
-        if level_index < len(LEVELS):
-            if level_index == 0: self.show_narrative(MILESTONE_1)
-            elif level_index == 9: self.show_narrative(MILESTONE_10)
-            elif level_index == 29: self.show_narrative(MILESTONE_30)
+        if level_index < len(self.levels):
+            if level_index in MILESTONES:
+                self.show_narrative(MILESTONES[level_index])
 
-            self.engine.load_level(LEVELS[level_index])
-            self.update_ui()
+            levels = self.levels
+            if isinstance(levels, Curriculum) and levels.needs_build(level_index):
+                # Big sectors take seconds to generate; only the game waits, keys are ignored meanwhile
+                self.loading = True
+                self.engine.publish(EventKind.INFO, "Generating sector {}...", level_index + 1)
+                self.run_worker(partial(self.build_level, levels, level_index), group="levels", thread=True)
+            else:
+                self.start_level(levels, level_index, levels[level_index])
         else:
             self.show_narrative(MILESTONE_30)
             self.set_timer(5, self.exit)
 
+    def start_level(self, levels: Sequence, level_index: int, level: LevelConfig):
+        """Puts a built level into play and queues the search for its par if it was deferred."""
+        self.loading = False
+        self.engine.load_level(level)
+        self.level_started = time.monotonic()
+        self.update_ui()
+        if isinstance(levels, Curriculum) and level_index in levels.unsolved:
+            self.run_worker(partial(self.settle_par, levels, level_index), group="par", thread=True)
+
+    def build_level(self, levels: Curriculum, level_index: int):
+        """Worker thread: generates a sector, then starts it on the UI thread."""
+        level = levels[level_index]
+        if not get_current_worker().is_cancelled:
+            self.call_from_thread(self.start_level, levels, level_index, level)
+
+    def settle_par(self, levels: Curriculum, level_index: int):
+        """Worker thread: searches a sector's par while it is played, then shows it."""
+        if levels.settle_par(level_index) and not get_current_worker().is_cancelled:
+            self.call_from_thread(self.update_ui, "stats")
+
     def show_narrative(self, content: str):
         overlay = self.query_one("#narrative")
         overlay.show(content)
 
     def on_mode_change(self, new_mode: GameMode):
-        if new_mode == GameMode.VISUAL:
-            self.engine.set_visual_anchor()
-        self.engine.mode = new_mode
-        self.update_ui()
+        self.engine.set_mode(new_mode)
+        self.update_ui("map", "stats")
 
     def on_action(self, action: str, params: dict):
         """Processes actions emitted by the Vim parser."""
-        if action != "undo":
-            self.engine.save_state()
-            
-        previous_hp = self.engine.player.hp
-        self.engine.keystroke_count += 1
-        
-        if self.config.get("sound_enabled"):
-            winsound.MessageBeep(winsound.MB_OK)
-            
-        if action == "move":
-            motion = params["motion"]
-            count = params.get("count", 1)
-            
-            # Translate Vim motions to engine vectors
-            dx, dy = 0, 0
-            if motion == "l": dx = 1
-            elif motion == "h": dx = -1
-            elif motion == "j": dy = 1
-            elif motion == "k": dy = -1
-            elif motion == "w": dx = 3
-            elif motion == "b": dx = -3
-            
-            self.engine.move_player(dx, dy, count)
-            
-        elif action in ["delete_line", "delete_word", "delete_char"]:
-            self.engine.perform_action("delete")
-        elif action == "yank":
-            self.engine.perform_action("yank", {"reg": params["reg"]})
-        elif action == "put":
-            self.engine.perform_action("put", {"reg": params["reg"]})
-        elif action == "regex_attack":
-            self.engine.perform_action("regex_attack", {"command": params["command"]})
-        elif action == "undo":
-            self.engine.undo()
-            
-        if self.engine.player.hp < previous_hp:
-            self.trigger_shake()
-            if self.config.get("sound_enabled"):
-                winsound.MessageBeep(winsound.MB_ICONHAND)
+        if self.parser.playing:
+            # Macro steps run silently; play_macro's caller refreshes once at the end
+            if action == "play_macro":
+                self.play_macro(params)
+            elif not self.engine.level_complete:
+                self.engine.apply_player_action(action, params)
+            return
+
+        self.audio.play("key")
+        with self.profiler.span(f"engine.{action}"):
+            if action == "play_macro":
+                self.play_macro(params)
+            else:
+                self.engine.apply_player_action(action, params)
 
         if self.engine.level_complete:
-            self.scoring.save_best(self.engine.current_level.num, self.engine.keystroke_count)
             self.engine.current_level_index += 1
             self.load_level()
         
         self.update_ui()
 
+    def on_log_event(self, event):
+        if event.template:
+            self.update_ui("log")
+
+    def on_damage(self, event):
+        if event.entity is self.engine.player:
+            self.trigger_shake()
+            self.audio.play("hit")
+
+    def on_level_complete(self, event):
+        level = self.engine.current_level
+        self.scoring.record_attempt(level.num, event.amount, time.monotonic() - self.level_started, level.par_keystrokes)
+
+    def play_macro(self, params: dict):
+        """Replays a macro register as one batched turn."""
+        keys = decode_keys(self.engine.registers.get(params["reg"], ""))
+        with self.engine.batch():
+            self.parser.play(keys, params["count"], lambda: self.engine.mode, lambda: self.engine.level_complete)
+
+    def on_vim_map_resized(self, message: VimMap.Resized):
+        self.update_ui("map")
+
+    def on_tick(self):
+        """Advances the game clock; expired effects only mark their own rows for redraw."""
+        self.clock.advance()
+        if self.engine.dirty_rows:
+            self.update_ui("map")
+
     def trigger_shake(self):
         container = self.query_one("#main-container")
         container.add_class("shake")
-        self.set_timer(0.1, lambda: container.remove_class("shake"))
+        self.clock.after(SHAKE_TICKS, lambda: container.remove_class("shake"))
+
+    def show_bubble(self, text: str):
+        """Shows the sound bubble; a newer sound restarts its countdown."""
+        bubble = self.query_one("#sound-fx")
+        if self.bubble_timer is not None:
+            self.bubble_timer.cancel()
+        bubble.display(text)
+        self.bubble_timer = self.clock.after(BUBBLE_TICKS, bubble.clear)
 
     def on_key(self, event) -> None:
         overlay = self.query_one("#narrative")
-        help_overlay = self.query_one("#help-overlay")
+        help_overlay = self.overlays.get("help-overlay")
 
         if overlay.styles.display == "block":
             overlay.hide()
             event.stop()
             return
         
-        if help_overlay.styles.display == "block":
+        if help_overlay is not None and help_overlay.styles.display == "block":
             help_overlay.hide()
             event.stop()
             return
 
-        if event.key == "?":
-            help_overlay.show(self.engine.current_level.detailed_help or "No detailed help for this sector.")
+        if self.loading:
+            event.stop()
+            return
+
+        key = normalize_key(event.key)
+        if key == "f12":
+            self.show_perf(self.perf_timer is None)
+            event.stop()
+            return
+
+        if key == "?":
+            self.overlay(HelpOverlay, "help-overlay").show(self.engine.current_level.detailed_help or "No detailed help for this sector.")
             event.stop()
             return
 
-        if event.key == "T":
+        if key == "T":
             # Count S-Ranks
-            s_ranks = sum(1 for best in self.scoring.best_scores.values() if best <= LEVELS[0].par_keystrokes) # Oversimplified, should check per level but sufficient for demo
+            s_ranks = sum(1 for best in self.scoring.best_scores.values() if best <= self.levels[0].par_keystrokes) # Oversimplified, should check per level but sufficient for demo
             
             # Simple unlock logic: always allow cycle in demo
             self.remove_class(f"theme-{self.themes[self.current_theme_idx]}")
             self.current_theme_idx = (self.current_theme_idx + 1) % len(self.themes)
             self.add_class(f"theme-{self.themes[self.current_theme_idx]}")
-            self.engine.add_message(f"Theme changed to: {self.themes[self.current_theme_idx].capitalize()}")
-            self.update_ui()
+            self.engine.publish(EventKind.INFO, "Theme changed to: {}", self.themes[self.current_theme_idx].capitalize())
             event.stop()
             return
 
-        bubble = self.query_one("#sound-fx")
-        if self.config.get("sound_enabled"):
-            bubble.display("CLACK" if event.key.isalnum() else "TICK")
+        if self.config.settings.sound_enabled:
+            self.show_bubble("CLACK" if key.isalnum() else "TICK")
 
-        buffer = self.parser.handle_key(event.key, self.engine.mode)
+        if self.profiler.enabled and self.key_started is None:
+            self.key_started = time.perf_counter()
+        with self.profiler.span("handle_key"):
+            buffer = self.parser.handle_key(key, self.engine.mode)
         self.query_one("#command-bar").update(f"Buffer: {buffer}")
-        self.update_ui()
+        self.update_ui("map", "stats")
         event.stop()
 
-    def update_ui(self):
-        """Updates all UI components based on the current engine state."""
-        self.query_one("#map").render_map(
-            self.engine.get_render_data(), 
-            self.engine.player.position,
-            self.engine.aura_active,
-            self.engine.mode,
-            self.engine.visual_anchor
-        )
-        self.query_one("#log").update("\n".join(self.engine.messages))
-        self.query_one("#stats").update_stats(
-            self.engine.current_level.num,
-            self.engine.player.hp,
-            self.engine.keystroke_count,
-            self.engine.current_level.par_keystrokes,
-            self.engine.mode.name,
-            self.engine.registers
-        )
-        self.query_one("#help-panel").update_hint(self.engine.current_level.hint)
+    def update_ui(self, *parts: str):
+        """
+        Marks UI components dirty and schedules a frame to redraw them.
+        With no arguments every component is marked. However many times this is
+        called, dirty components are flushed at most once per FRAME_INTERVAL.
+        """
+        self.dirty_parts.update(parts or UI_PARTS)
+        if self.frame_pending:
+            return
+        self.frame_pending = True
+        delay = self.last_frame_time + self.FRAME_INTERVAL - time.monotonic()
+        if delay > 0:
+            self.set_timer(delay, self.flush_ui)
+        else:
+            self.call_later(self.flush_ui)
+
+    def flush_ui(self):
+        """Redraws the components marked dirty since the last frame."""
+        self.frame_pending = False
+        self.last_frame_time = time.monotonic()
+        parts, self.dirty_parts = self.dirty_parts, set()
+
+        profiler = self.profiler
+        if "map" in parts:
+            vim_map = self.query_one("#map")
+            with profiler.span("get_render_data"):
+                self.engine.camera.resize(*vim_map.viewport_size())
+                map_data = self.engine.get_render_data()
+            with profiler.span("widget.map"):
+                left, top, _, _ = self.engine.render_window
+                vim_map.render_map(
+                    map_data,
+                    self.engine.player.position,
+                    self.engine.aura_active,
+                    self.engine.mode,
+                    self.engine.visual_anchor,
+                    self.engine.render_dirty_rows,
+                    Point(left, top)
+                )
+        if "log" in parts:
+            # Only lines published since the last frame are formatted and appended
+            fresh = self.engine.events.since(self.log_seq)
+            if fresh:
+                with profiler.span("widget.log"):
+                    log = self.query_one("#log")
+                    for event in fresh:
+                        log.write(event.text)
+                    self.log_seq = fresh[-1].seq
+        if "stats" in parts:
+            with profiler.span("widget.stats"):
+                self.query_one("#stats").update_stats(
+                    self.engine.current_level.num,
+                    self.engine.player.hp,
+                    self.engine.keystroke_count,
+                    self.engine.current_level.par_keystrokes,
+                    self.engine.mode.name,
+                    self.engine.registers
+                )
+        if "hint" in parts:
+            with profiler.span("widget.hint"):
+                self.query_one("#help-panel").update_hint(self.engine.current_level.hint)
+
+        if self.key_started is not None:
+            # From the oldest key this frame answers to the end of its UI updates
+            profiler.record("key_to_frame", time.perf_counter() - self.key_started, self.key_started)
+            self.key_started = None
 
 if __name__ == "__main__":
     VimMasterpiece().run()
@@ -0,0 +1,49 @@
+from typing import Tuple
+
+DEFAULT_SCROLLOFF = 5
+
+class Camera:
+    """
+    The window of the map that is drawn, following the player like Vim's
+    viewport: the view only scrolls once the player comes within `scrolloff`
+    cells of an edge, and never past the map's borders. A zero width or
+    height means the view is unbounded in that direction.
+    """
+    def __init__(self, width: int = 0, height: int = 0, scrolloff: int = DEFAULT_SCROLLOFF):
+        self.width = width
+        self.height = height
+        self.scrolloff = scrolloff
+        self.left = 0
+        self.top = 0
+
+    def resize(self, width: int, height: int) -> bool:
+        """Sets the view size in cells. Returns True if it changed."""
+        width, height = max(0, width), max(0, height)
+        if (width, height) == (self.width, self.height):
+            return False
+        self.width, self.height = width, height
+        return True
+
+    def follow(self, x: int, y: int, map_width: int, map_height: int) -> bool:
+        """Scrolls just enough to keep (x, y) inside the margins. Returns True if the view moved."""
+        left = self._axis(self.left, x, self.width, map_width)
+        top = self._axis(self.top, y, self.height, map_height)
+        if (left, top) == (self.left, self.top):
+            return False
+        self.left, self.top = left, top
+        return True
+
+    def window(self, map_width: int, map_height: int) -> Tuple[int, int, int, int]:
+        """The visible (left, top, right, bottom) cells, right and bottom exclusive."""
+        width = min(self.width or map_width, map_width)
+        height = min(self.height or map_height, map_height)
+        return self.left, self.top, self.left + width, self.top + height
+
+    def _axis(self, start: int, position: int, size: int, extent: int) -> int:
+        if not size or size >= extent:
+            return 0
+        # Like Vim, a margin larger than half the view keeps the player centered
+        margin = min(self.scrolloff, (size - 1) // 2)
+        start = min(start, position - margin)
+        start = max(start, position + margin - size + 1)
+        return max(0, min(start, extent - size))
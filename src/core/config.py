@@ -1,5 +1,9 @@
+import copy
 import json
 import os
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 CONFIG_FILE = ".vimgamerc"
 
@@ -8,32 +12,165 @@ DEFAULT_CONFIG = {
     "key_map": {
         "h": "h", "j": "j", "k": "k", "l": "l"
     },
-    "sound_enabled": True
+    "sound_enabled": True,
+    "sound_backend": "bell", # bell, wav or none
+    "sound_files": {}, # e.g. {"key": "sounds/key.wav", "hit": "sounds/hit.wav"} for the wav backend
+    "scrolloff": 5, # Cells kept between the player and the edge of the view before it scrolls
+    "dungeon_size": [25, 12], # Width and height of procedural sectors
+    "level_pack": "", # Level pack to play instead of the built-in curriculum (see src/data/pack.py)
+    "profiling": False, # Start with the performance overlay open (F12 toggles it)
+    "trace_file": "", # When set, every timing span is written here as a Chrome trace on exit
+    "event_log": "" # When set at startup, every game event is appended here as a JSON line
 }
 
+RELOAD_INTERVAL = 1.0 # Seconds between checks of the config file's mtime
+
+@dataclass(frozen=True)
+class Settings:
+    """Resolved, typed configuration. Values of the wrong type fall back to their defaults."""
+    theme: str = DEFAULT_CONFIG["theme"]
+    key_map: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_CONFIG["key_map"]))
+    sound_enabled: bool = DEFAULT_CONFIG["sound_enabled"]
+    sound_backend: str = DEFAULT_CONFIG["sound_backend"]
+    sound_files: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_CONFIG["sound_files"]))
+    scrolloff: int = DEFAULT_CONFIG["scrolloff"]
+    dungeon_size: List[int] = field(default_factory=lambda: list(DEFAULT_CONFIG["dungeon_size"]))
+    level_pack: str = DEFAULT_CONFIG["level_pack"]
+    profiling: bool = DEFAULT_CONFIG["profiling"]
+    trace_file: str = DEFAULT_CONFIG["trace_file"]
+    event_log: str = DEFAULT_CONFIG["event_log"]
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "Settings":
+        defaults = cls()
+        values = {}
+        for setting in fields(cls):
+            value = raw.get(setting.name, getattr(defaults, setting.name))
+            default = getattr(defaults, setting.name)
+            if not _matches(value, default):
+                print(f"Ignoring setting {setting.name}: expected a value like {default!r}")
+                value = default
+            values[setting.name] = copy.deepcopy(value)
+        return cls(**values)
+
+    def changed(self, other: "Settings") -> Set[str]:
+        """Names of the settings that differ from `other`."""
+        return {setting.name for setting in fields(self) if getattr(self, setting.name) != getattr(other, setting.name)}
+
+def _matches(value: Any, default: Any) -> bool:
+    """Whether a loaded value has the shape of its default: dicts of strings, lists of non-negative ints of the same length."""
+    if type(value) is not type(default):
+        return False
+    if isinstance(default, dict):
+        return all(isinstance(key, str) and isinstance(item, str) for key, item in value.items())
+    if isinstance(default, list):
+        return len(value) == len(default) and all(type(item) is int and item >= 0 for item in value)
+    return not isinstance(default, int) or value >= 0
+
+def find_config_file() -> str:
+    """The .vimgamerc in the working directory if there is one, otherwise the one in the home directory."""
+    if os.path.exists(CONFIG_FILE):
+        return os.path.abspath(CONFIG_FILE)
+    return os.path.join(os.path.expanduser("~"), CONFIG_FILE)
+
 class ConfigManager:
-    """Manages game configuration and persistence."""
-    def __init__(self):
+    """
+    Manages game configuration and persistence.
+    `settings` holds the resolved values, so reading one is an attribute
+    lookup. `watch` polls the file's mtime on a daemon thread; when it
+    changes the file is re-read, and each subscriber is told which of the
+    settings it listens to changed.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or find_config_file()
         self.config = self._load_configuration()
+        self.settings = Settings.from_dict(self.config)
+        self.stamp = self._stamp()
+        self.subscribers: List[Tuple[Callable[[Settings, Set[str]], None], Set[str]]] = []
+        self.watcher: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
 
-    def _load_configuration(self):
+    def _load_configuration(self) -> Dict[str, Any]:
         """Loads configuration from the .vimgamerc file."""
-        if os.path.exists(CONFIG_FILE):
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        if os.path.exists(self.path):
             try:
-                with open(CONFIG_FILE, "r") as config_file:
-                    return {**DEFAULT_CONFIG, **json.load(config_file)}
+                with open(self.path, "r") as config_file:
+                    config.update(json.load(config_file))
             except Exception as error:
                 print(f"Failed to load configuration: {error}")
-        return DEFAULT_CONFIG
+        return config
 
     def save(self):
         """Saves the current configuration to disk."""
         try:
-            with open(CONFIG_FILE, "w") as config_file:
+            with open(self.path, "w") as config_file:
                 json.dump(self.config, config_file, indent=4)
+            self.stamp = self._stamp()
         except Exception as error:
             print(f"Failed to save configuration: {error}")
 
     def get(self, key):
         """Retrieves a configuration value by key."""
-        return self.config.get(key)
+        return getattr(self.settings, key, None)
+
+    def subscribe(self, callback: Callable[[Settings, Set[str]], None], *keys: str):
+        """Calls `callback(settings, changed)` after a reload changes any of `keys` (any setting if none are given)."""
+        self.subscribers.append((callback, set(keys)))
+
+    def reload(self) -> Set[str]:
+        """Re-reads the file if it changed on disk. Returns the names of the settings that changed."""
+        update = self._poll()
+        if update is None:
+            return set()
+        self.apply(*update)
+        return update[1]
+
+    def apply(self, settings: Settings, changed: Set[str]):
+        """Installs new settings and notifies the subscribers interested in what changed."""
+        self.settings = settings
+        for callback, keys in self.subscribers:
+            if changed and (not keys or keys & changed):
+                callback(settings, changed)
+
+    def watch(self, interval: float = RELOAD_INTERVAL, dispatch: Optional[Callable] = None):
+        """
+        Starts polling for changes. `dispatch(fn, *args)` runs the update on the
+        thread that owns the subscribers (an app passes `call_from_thread`);
+        without it subscribers are called on the watcher thread.
+        """
+        if self.watcher is not None:
+            return
+        self.watcher = threading.Thread(target=self._watch, args=(interval, dispatch), name="config", daemon=True)
+        self.watcher.start()
+
+    def stop(self):
+        """Stops the watcher thread."""
+        self.stopped.set()
+
+    def _watch(self, interval: float, dispatch: Optional[Callable]):
+        while not self.stopped.wait(interval):
+            update = self._poll()
+            if update is None or not update[1]:
+                continue
+            if dispatch is None:
+                self.apply(*update)
+            else:
+                dispatch(self.apply, *update)
+
+    def _poll(self) -> Optional[Tuple[Settings, Set[str]]]:
+        """Re-reads the file if its mtime or size moved. Returns the new settings and what changed."""
+        stamp = self._stamp()
+        if stamp == self.stamp:
+            return None
+        self.stamp = stamp
+        self.config = self._load_configuration()
+        settings = Settings.from_dict(self.config)
+        return settings, settings.changed(self.settings)
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
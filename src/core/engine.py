@@ -1,30 +1,70 @@
 import random
 import re
-import copy
+from contextlib import contextmanager
 from typing import List, Tuple, Dict, Optional, Set
 from src.data.models import Entity, EntityType, Point, LevelConfig, GameMode, Effect
+from src.core.camera import Camera
+from src.core.events import EventBus, EventKind, GameEvent
+from src.core.grid import TileGrid
+from src.core.scheduler import Scheduler
+from src.core.spatial import SpatialIndex
+from src.core.motions import MotionTables, RayTables
+from src.core.journal import UndoJournal, MISSING
+from src.mechanics.regex_combat import DAMAGE_PER_REPLACEMENT, DEFAULT_PAYLOAD, RegexError, escape_markup, parse_substitution
+
+# Parser motions translated to engine vectors
+MOTION_VECTORS = {
+    "l": (1, 0), "h": (-1, 0), "j": (0, 1), "k": (0, -1)
+}
+
+# Motions that leap along the row to a target column from MotionTables
+JUMP_MOTIONS = {"w", "b", "0", "$", "f", "t", "F", "T"}
+
+EFFECT_TICKS = 8 # How long explosion particles stay on the map
+
+# Template characters that are neither floor nor wall: the player, entities and special tiles
+SPECIAL_CELL = re.compile(r"[^.#]")
+
+# Entities that stop a move into their cell (see GameEngine._enter)
+STOPPING_TYPES = {EntityType.EXIT, EntityType.LOCK, EntityType.BOSS, EntityType.ENEMY, EntityType.RUBBLE}
 
 class GameEngine:
     """
     The core logic for the Vim learning game.
     Manages the player, enemies, map state, and game rules.
     """
-    def __init__(self):
+    def __init__(self, clock: Optional[Scheduler] = None):
         self.mode = GameMode.NORMAL
         self.current_level_index = 0
         self.player = Entity("Player", "@", Point(1, 1), 20, 20, EntityType.PLAYER)
         self.enemies: List[Entity] = []
         self.interactables: List[Entity] = []
-        self.map_data: List[List[str]] = []
-        self.messages: List[str] = ["VimRunner Online. Neural link established."]
+        self.spatial = SpatialIndex() # Position index over enemies + interactables
+        self.motions = MotionTables(self._symbol_row) # Jump targets per row
+        self.rays = RayTables(self._is_free) # Distance to the next blocker per cell and direction
+        self.map_data = TileGrid([]) # Tiles only; entities live in the spatial index
+        self.entities: Dict[int, Entity] = {} # Every placed entity by id
+        self.next_entity_id = 0
+        self.events = EventBus() # Typed outcomes for the log, sound, scoring and telemetry
         self.level_complete = False
         self.keystroke_count = 0
         self.registers: Dict[str, str] = {} # Key-value pairs for yank/put
         self.aura_active = False # Vim Aura
         self.last_move_efficient = False
-        self.history_stack = []
+        self.journal = UndoJournal()
+        self.batch_depth = 0 # Nesting depth of batch(); actions inside share one turn
         self.visual_anchor: Optional[Point] = None
-        self.active_effects: List[Effect] = []
+        self.clock = clock or Scheduler() # Ages effects; only runs when something advances it
+        self.effects: Dict[int, List[Effect]] = {} # Live particle effects by row
+        self.rng = random.Random() # Cosmetic randomness; seeded by replays for determinism
+        self.render_buffer: List[List[str]] = []
+        self.dirty_rows: Set[int] = set() # Rows whose rendered content changed since the last frame
+        self.full_redraw = True
+        self.render_dirty_rows: Optional[Set[int]] = None # Rows refreshed by the last get_render_data, None for all
+        self.camera = Camera() # Unbounded until the UI sizes it
+        self.render_window = (0, 0, 0, 0) # left, top, right, bottom of render_buffer in map cells
+        self.last_view_state = None
+        self.publish(EventKind.INFO, "VimRunner Online. Neural link established.")
 
     def load_level(self, config: LevelConfig):
         """
@@ -32,42 +72,60 @@ class GameEngine:
         Initializes map, player, enemies, and interactables.
         """
         self.current_level = config
-        self.map_data = [list(row) for row in config.map_template]
-        self.height = len(self.map_data)
-        self.width = len(self.map_data[0])
+        self.map_data = TileGrid(config.map_template)
+        self.height = self.map_data.height
+        self.width = self.map_data.width
         self.enemies = []
         self.interactables = []
+        self.entities = {}
+        self.next_entity_id = 0
         self.level_complete = False
         self.keystroke_count = 0
         self.mode = GameMode.NORMAL
         self.aura_active = False
-        self.history_stack = []
+        self.journal.clear()
         self.visual_anchor = None
-        self.active_effects = []
+        for row_effects in self.effects.values():
+            for effect in row_effects:
+                effect.expiry.cancel()
+        self.effects = {}
+        self.camera.left = self.camera.top = 0
+        self.spatial.clear()
+        self.mark_all_dirty()
         
-        for y, row in enumerate(self.map_data):
-            for x, char in enumerate(row):
+        # Only cells that are not plain floor or wall need a look
+        for y, row in enumerate(config.map_template):
+            for match in SPECIAL_CELL.finditer(row):
+                x, char = match.start(), match.group()
                 point = Point(x, y)
                 if char == "@":
                     self.player.position = point
-                    self.map_data[y][x] = "."
+                    self.map_data.set(x, y, ".")
                 elif char in "G B": # G for Goblin, B for Regex Boss
                     entity_type = EntityType.BOSS if char == "B" else EntityType.ENEMY
                     name = "Corrupted Binary" if char == "B" else "Minion"
-                    self.enemies.append(Entity(name, char, point, 10 if char == "B" else 5, 10 if char == "B" else 5, entity_type))
-                    self.map_data[y][x] = "."
+                    metadata = {"payload": config.boss_payload or DEFAULT_PAYLOAD} if char == "B" else {}
+                    self.add_entity(Entity(name, char, point, 10 if char == "B" else 5, 10 if char == "B" else 5, entity_type, metadata=metadata))
+                    self.map_data.set(x, y, ".")
                 elif char == ">":
-                    self.interactables.append(Entity("Exit", ">", point, 1, 1, EntityType.EXIT))
-                    self.map_data[y][x] = "."
+                    self.add_entity(Entity("Exit", ">", point, 1, 1, EntityType.EXIT))
+                    self.map_data.set(x, y, ".")
                 elif char == "R":
-                    self.interactables.append(Entity("Rubble", "R", point, 1, 1, EntityType.RUBBLE))
-                    self.map_data[y][x] = "."
+                    self.add_entity(Entity("Rubble", "R", point, 1, 1, EntityType.RUBBLE))
+                    self.map_data.set(x, y, ".")
                 elif char.islower() and char != 'b': # 'a', 'c', etc. are keys
-                    self.interactables.append(Entity(f"Key {char}", char, point, 1, 1, EntityType.KEY, metadata={"reg": char}))
-                    self.map_data[y][x] = "."
+                    self.add_entity(Entity(f"Key {char}", char, point, 1, 1, EntityType.KEY, metadata={"reg": char}))
+                    self.map_data.set(x, y, ".")
                 elif char.isupper() and char not in "RGB B": # 'A', 'C', etc. are locks
-                    self.interactables.append(Entity(f"Lock {char}", char, point, 1, 1, EntityType.LOCK, metadata={"reg": char.lower()}))
-                    self.map_data[y][x] = "."
+                    self.add_entity(Entity(f"Lock {char}", char, point, 1, 1, EntityType.LOCK, metadata={"reg": char.lower()}))
+                    self.map_data.set(x, y, ".")
+        self.motions.build(self.height)
+        self.rays.build(self.width, self.height)
+
+    @property
+    def messages(self) -> List[str]:
+        """The most recent log lines, oldest first."""
+        return [event.text for event in self.events.lines]
 
     def move_player(self, dx: int, dy: int, count: int = 1):
         """
@@ -76,35 +134,140 @@ class GameEngine:
         """
         # Efficiency check for Aura
         self.aura_active = (count > 1) or self.last_move_efficient
-        
-        for _ in range(count):
-            new_x = max(0, min(self.width - 1, self.player.position.x + dx))
-            new_y = max(0, min(self.height - 1, self.player.position.y + dy))
-            new_position = Point(new_x, new_y)
-            
-            target = self.get_entity_at(new_position)
-            if target:
-                if target.entity_type == EntityType.EXIT:
-                    self.complete_level()
-                    break
-                elif target.entity_type == EntityType.LOCK:
-                    register_needed = target.metadata["reg"]
-                    self.add_message(f"SECURITY ALERT: Lock {register_needed.upper()} active.")
-                    self.add_message(f"Hint: Yank Key {register_needed} into register '{register_needed}' first.")
-                    break
-                elif target.entity_type == EntityType.BOSS:
-                    self.add_message(f"WARNING: {target.name} detected.")
-                    self.add_message("standard attacks are useless. Use [bold]:s/target/replace/g[/].")
-                    break
-                elif target.entity_type in [EntityType.ENEMY, EntityType.RUBBLE]:
-                    self.add_message(f"Path blocked by: {target.name}")
+        start_position = self.player.position
+
+        if abs(dx) + abs(dy) != 1:
+            for _ in range(count):
+                new_x = max(0, min(self.width - 1, self.player.position.x + dx))
+                new_y = max(0, min(self.height - 1, self.player.position.y + dy))
+                if not self._enter(Point(new_x, new_y)):
                     break
-            
-            if self.map_data[new_y][new_x] == ".":
-                self.player.position = new_position
+            self._record_player_move(start_position)
+            return
+
+        self._walk(dx, dy, count)
+        self._record_player_move(start_position)
+
+    def jump_player(self, motion: str, count: int = 1, char: Optional[str] = None):
+        """
+        Leaps along the current row toward the target of a jump motion (w, b, 0, $, f, t, F, T).
+        The leap covers the same cells as a counted move: it stops in front of the
+        first wall, lock, boss or minion on the way, which reports itself.
+        """
+        self.aura_active = True
+        start_position = self.player.position
+        target_x = self.motions.target(motion, start_position.x, start_position.y, count, char)
+        if target_x is None:
+            self.publish(EventKind.INFO, "No '{}' in that direction.", char)
+        elif target_x != start_position.x:
+            self._walk(1 if target_x > start_position.x else -1, 0, abs(target_x - start_position.x))
+        self._record_player_move(start_position)
+
+    def _walk(self, dx: int, dy: int, count: int):
+        """Walks the free run in a unit direction in one step, up to `count` cells, then lets the first blocked cell report itself."""
+        position = self.player.position
+        steps = min(count, self.rays.distance(position.x, position.y, dx, dy))
+        if steps:
+            self.player.position = Point(position.x + dx * steps, position.y + dy * steps)
+        if steps < count:
+            blocked_x, blocked_y = self.player.position.x + dx, self.player.position.y + dy
+            if 0 <= blocked_x < self.width and 0 <= blocked_y < self.height:
+                self._enter(Point(blocked_x, blocked_y))
+
+    def _enter(self, new_position: Point) -> bool:
+        """Tries to move the player onto a cell. Returns False if the move stopped there."""
+        target = self.get_entity_at(new_position)
+        if target:
+            if target.entity_type == EntityType.EXIT:
+                self.complete_level()
+                return False
+            elif target.entity_type == EntityType.LOCK:
+                register_needed = target.metadata["reg"]
+                self.publish(EventKind.BLOCKED, "SECURITY ALERT: Lock {} active.", register_needed.upper(), entity=target)
+                self.publish(EventKind.INFO, "Hint: Yank Key {0} into register '{0}' first.", register_needed)
+                return False
+            elif target.entity_type == EntityType.BOSS:
+                self.publish(EventKind.BLOCKED, "WARNING: {} detected. Payload: {}", target.name, escape_markup(target.metadata["payload"]), entity=target)
+                self.publish(EventKind.INFO, "standard attacks are useless. Use [bold]:s/target/replace/g[/].")
+                return False
+            elif target.entity_type in [EntityType.ENEMY, EntityType.RUBBLE]:
+                self.publish(EventKind.BLOCKED, "Path blocked by: {}", target.name, entity=target)
+                return False
+
+        if self.map_data.is_floor(new_position.x, new_position.y):
+            self.player.position = new_position
+            return True
+        self.publish(EventKind.BLOCKED, "Collided with boundary.")
+        return False
+
+    def _record_player_move(self, start_position: Point):
+        if self.player.position != start_position:
+            self.journal.record("player_pos", start_position)
+            self.dirty_rows.add(start_position.y)
+            self.dirty_rows.add(self.player.position.y)
+            distance = abs(self.player.position.x - start_position.x) + abs(self.player.position.y - start_position.y)
+            self.publish(EventKind.MOVED, entity=self.player, amount=distance)
+
+    def apply_player_action(self, action: str, params):
+        """
+        Applies an action emitted by VimParser as one player turn.
+        Opens an undo record, counts the keystroke and translates motions into
+        engine calls. Shared by the app and the headless simulator. Inside
+        batch() the action joins the batch's turn instead. Finishing a macro
+        recording only fills the register; it is not a turn of its own.
+        """
+        if action == "record_macro":
+            self.set_register(params["reg"], params["keys"])
+            self.publish(EventKind.INFO, "Macro recorded into @{}.", params["reg"])
+            return
+
+        if self.batch_depth:
+            if action == "undo":
+                # Undo cannot split the transaction it is part of
+                return
+        else:
+            if action != "undo":
+                self.save_state()
+            self.keystroke_count += 1
+
+        if action == "move":
+            if params["motion"] in JUMP_MOTIONS:
+                self.jump_player(params["motion"], params.get("count", 1), params.get("char"))
             else:
-                self.add_message("Collided with boundary.")
-                break
+                dx, dy = MOTION_VECTORS.get(params["motion"], (0, 0))
+                self.move_player(dx, dy, params.get("count", 1))
+        elif action in ["delete_line", "delete_word", "delete_char"]:
+            self.perform_action("delete")
+        elif action == "yank":
+            self.perform_action("yank", {"reg": params["reg"]})
+        elif action == "put":
+            self.perform_action("put", {"reg": params["reg"]})
+        elif action == "regex_attack":
+            self.perform_action("regex_attack", {"command": params["command"]})
+        elif action == "undo":
+            self.undo()
+
+    @contextmanager
+    def batch(self):
+        """
+        Runs every action applied inside the block as a single turn: one undo
+        record and one keystroke. Used for macro playback; nested batches join
+        the outermost one.
+        """
+        if not self.batch_depth:
+            self.save_state()
+            self.keystroke_count += 1
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+
+    def set_mode(self, new_mode: GameMode):
+        """Switches game mode, anchoring the selection when Visual mode starts."""
+        if new_mode == GameMode.VISUAL:
+            self.set_visual_anchor()
+        self.mode = new_mode
 
     def perform_action(self, action: str, params: Dict = None):
         """Dispatches game actions like yank, put, and regex attacks."""
@@ -122,39 +285,80 @@ class GameEngine:
         self.visual_anchor = Point(self.player.position.x, self.player.position.y)
 
     def save_state(self):
-        """Saves current state for undo functionality."""
-        state = {
-            "player_pos": Point(self.player.position.x, self.player.position.y),
-            "player_hp": self.player.hp,
-            "enemies": copy.deepcopy(self.enemies),
-            "interactables": copy.deepcopy(self.interactables),
-            "map_data": copy.deepcopy(self.map_data),
-            "registers": copy.deepcopy(self.registers),
+        """Opens an undo record; changes made until the next call are journaled into it."""
+        self.journal.begin({
             "keystroke_count": self.keystroke_count,
-            "messages": list(self.messages),
             "level_complete": self.level_complete
-        }
-        self.history_stack.append(state)
-        if len(self.history_stack) > 20: 
-            self.history_stack.pop(0)
+        })
 
     def undo(self):
-        """Reverts the game state to the previous turn."""
-        if not self.history_stack:
-            self.add_message("Already at oldest change.")
+        """Reverts the game state to the previous turn by replaying the journal backwards."""
+        record = self.journal.pop()
+        if record is None:
+            self.publish(EventKind.INFO, "Already at oldest change.")
             return
 
-        state = self.history_stack.pop()
-        self.player.position = state["player_pos"]
-        self.player.hp = state["player_hp"]
-        self.enemies = state["enemies"]
-        self.interactables = state["interactables"]
-        self.map_data = state["map_data"]
-        self.registers = state["registers"]
-        self.keystroke_count = state["keystroke_count"]
-        self.messages = state["messages"]
-        self.level_complete = state["level_complete"]
-        self.add_message("Undid previous action.")
+        for change in reversed(record.changes):
+            kind = change[0]
+            if kind == "player_pos":
+                self.dirty_rows.add(self.player.position.y)
+                self.player.position = change[1]
+                self.dirty_rows.add(change[1].y)
+            elif kind == "entity_pos":
+                self._cell_changed(change[1].position)
+                self.spatial.move(change[1], change[2])
+                self._cell_changed(change[2])
+            elif kind == "hp":
+                change[1].hp = change[2]
+            elif kind == "metadata":
+                if change[3] is MISSING: change[1].metadata.pop(change[2], None)
+                else: change[1].metadata[change[2]] = change[3]
+            elif kind == "register":
+                if change[2] is MISSING: self.registers.pop(change[1], None)
+                else: self.registers[change[1]] = change[2]
+            elif kind == "tile":
+                self.map_data.set(change[1], change[2], change[3])
+                self._cell_changed(Point(change[1], change[2]))
+            elif kind == "add":
+                self._unlink_entity(change[1])
+            elif kind == "remove":
+                entity, owner, index = change[1], change[2], change[3]
+                owner.insert(index, entity)
+                self.entities[entity.id] = entity
+                self.spatial.add(entity)
+                self._cell_changed(entity.position)
+
+        self.keystroke_count = record.meta["keystroke_count"]
+        self.level_complete = record.meta["level_complete"]
+        self.publish(EventKind.INFO, "Undid previous action.")
+
+    def set_register(self, register: str, value: str):
+        """Writes a register, journaling its previous contents."""
+        self.journal.record("register", register, self.registers.get(register, MISSING))
+        self.registers[register] = value
+
+    def set_hp(self, entity: Entity, hit_points: int):
+        """Sets an entity's hit points, journaling the previous value."""
+        self.journal.record("hp", entity, entity.hp)
+        entity.hp = hit_points
+
+    def set_metadata(self, entity: Entity, key: str, value):
+        """Sets an entity metadata value, journaling the previous one."""
+        self.journal.record("metadata", entity, key, entity.metadata.get(key, MISSING))
+        entity.metadata[key] = value
+
+    def set_tile(self, x: int, y: int, char: str):
+        """Edits a map cell, journaling the previous tile."""
+        self.journal.record("tile", x, y, self.map_data.get(x, y))
+        self.map_data.set(x, y, char)
+        self._cell_changed(Point(x, y))
+
+    def move_entity(self, entity: Entity, position: Point):
+        """Moves a non-player entity, keeping the index and journal in sync."""
+        self.journal.record("entity_pos", entity, entity.position)
+        self._cell_changed(entity.position)
+        self.spatial.move(entity, position)
+        self._cell_changed(position)
 
     def handle_delete(self):
         """Handles deletion, weaponizing Visual mode selection."""
@@ -164,20 +368,18 @@ class GameEngine:
             min_y = min(self.player.position.y, self.visual_anchor.y)
             max_y = max(self.player.position.y, self.visual_anchor.y)
 
-            entities_to_remove = []
-            for entity in self.enemies + self.interactables:
-                if min_x <= entity.position.x <= max_x and min_y <= entity.position.y <= max_y:
-                    if entity.entity_type not in [EntityType.EXIT, EntityType.PLAYER]:
-                        entities_to_remove.append(entity)
+            entities_to_remove = [
+                entity for entity in self.spatial.in_rect(min_x, min_y, max_x, max_y)
+                if entity.entity_type not in [EntityType.EXIT, EntityType.PLAYER]
+            ]
             
             if not entities_to_remove:
-                self.add_message("Nothing selected to delete.")
+                self.publish(EventKind.INFO, "Nothing selected to delete.")
             else:
                 for e in entities_to_remove:
-                    if e in self.enemies: self.enemies.remove(e)
-                    if e in self.interactables: self.interactables.remove(e)
+                    self.remove_entity(e)
                     self.spawn_explosion(e.position, e.entity_type)
-                self.add_message(f"Visual strike destroyed {len(entities_to_remove)} targets!")
+                self.publish(EventKind.DESTROYED, "Visual strike destroyed {} targets!", len(entities_to_remove), amount=len(entities_to_remove))
             
             self.mode = GameMode.NORMAL
             self.visual_anchor = None
@@ -187,69 +389,131 @@ class GameEngine:
         register = params.get("reg", '"')
         # Check if standing next to a Key
         px, py = self.player.position.x, self.player.position.y
-        for entity in self.interactables[:]:
-            if entity.entity_type == EntityType.KEY and abs(entity.position.x - px) <= 1 and abs(entity.position.y - py) <= 1:
-                self.registers[register] = entity.metadata["reg"]
-                self.add_message(f"Success: {entity.name} extracted into register '{register}'")
-                self.interactables.remove(entity)
+        for entity in self.spatial.around(px, py):
+            if entity.entity_type == EntityType.KEY:
+                self.set_register(register, entity.metadata["reg"])
+                self.publish(EventKind.YANKED, "Success: {} extracted into register '{}'", entity.name, register, entity=entity)
+                self.remove_entity(entity)
                 return
-        self.add_message("Nothing here to yank.")
+        self.publish(EventKind.INFO, "Nothing here to yank.")
 
     def handle_put(self, params: Dict):
         """Handles using register contents on locks in the environment."""
         register = params.get("reg", '"')
         value = self.registers.get(register)
         if not value: 
-            self.add_message(f"Error: Register '{register}' is currently empty.")
+            self.publish(EventKind.INFO, "Error: Register '{}' is currently empty.", register)
             return
 
         # Check if next to a Lock
         px, py = self.player.position.x, self.player.position.y
-        for entity in self.interactables[:]:
-            if entity.entity_type == EntityType.LOCK and abs(entity.position.x - px) <= 1 and abs(entity.position.y - py) <= 1:
+        for entity in self.spatial.around(px, py):
+            if entity.entity_type == EntityType.LOCK:
                 if entity.metadata["reg"] == value:
-                    self.add_message(f"Access Granted: Lock {entity.metadata['reg'].upper()} disengaged!")
-                    self.interactables.remove(entity)
+                    self.publish(EventKind.UNLOCKED, "Access Granted: Lock {} disengaged!", value.upper(), entity=entity)
+                    self.remove_entity(entity)
                     return
                 else:
-                    self.add_message(f"Failure: Key '{register}' does not match Lock {entity.metadata['reg'].upper()}.")
+                    self.publish(EventKind.INFO, "Failure: Key '{}' does not match Lock {}.", register, entity.metadata["reg"].upper())
 
     def handle_regex_attack(self, command: str):
-        """Executes a regex search-and-replace attack on nearby bosses."""
-        # Format: s/target/replace/g
-        match = re.search(r's/(.+)/(.+)/g', command)
-        if not match:
-            self.add_message("Invalid syntax. Use s/target/replace/g to initiate regex attack.")
+        """
+        Runs :s/pattern/replacement/flags against the payload of every boss on
+        the player's row, or of every boss on the map for :%s. Each match the
+        substitution changes deals DAMAGE_PER_REPLACEMENT.
+        """
+        try:
+            substitution = parse_substitution(command)
+        except RegexError as error:
+            self.publish(EventKind.INFO, "{}", escape_markup(str(error)))
             return
 
-        target_pattern = match.group(1)
-        # Damage nearest Boss if regex matches its corruption string (simulated)
-        for enemy in self.enemies:
-            if enemy.entity_type == EntityType.BOSS:
-                self.add_message(f"SYSTEM PURGE: Targeted {target_pattern} corruption...")
-                enemy.hp -= 5
-                if enemy.hp <= 0:
-                    self.add_message(f"THREAT NEUTRALIZED: {enemy.name} purged.")
-                    self.enemies.remove(enemy)
+        bosses = [
+            enemy for enemy in self.enemies
+            if enemy.entity_type == EntityType.BOSS and (substitution.whole_map or enemy.position.y == self.player.position.y)
+        ]
+        if not bosses:
+            self.publish(EventKind.INFO, "No eligible targets for regex attack in range." if substitution.whole_map
+                         else "No boss on this line. Use :%s to reach the whole map.")
+            return
+
+        for boss in bosses:
+            try:
+                payload, replaced = substitution.apply(boss.metadata["payload"])
+            except RegexError as error:
+                self.publish(EventKind.INFO, "{}", escape_markup(str(error)))
                 return
-        self.add_message("No eligible targets for regex attack in range.")
+            if not replaced:
+                self.publish(EventKind.INFO, "No match in {}: {}", boss.name, escape_markup(boss.metadata["payload"]))
+                continue
+
+            damage = replaced * DAMAGE_PER_REPLACEMENT
+            self.set_metadata(boss, "payload", payload)
+            self.set_hp(boss, boss.hp - damage)
+            self.publish(EventKind.DAMAGED, "SYSTEM PURGE: {} segment(s) rewritten, {} damage to {}.", replaced, damage, boss.name, entity=boss, amount=damage)
+            if boss.hp <= 0:
+                self.publish(EventKind.PURGED, "THREAT NEUTRALIZED: {} purged.", boss.name, entity=boss)
+                self.remove_entity(boss)
 
     def get_entity_at(self, position: Point) -> Optional[Entity]:
         """Returns the entity at a given position, if any."""
-        for entity in self.enemies + self.interactables:
-            if entity.position == position: return entity
-        return None
+        return self.spatial.at(position.x, position.y)
+
+    def add_entity(self, entity: Entity):
+        """Places an entity in the world, gives it an id if it has none, and indexes it by position."""
+        if entity.id < 0:
+            entity.id = self.next_entity_id
+            self.next_entity_id += 1
+        self.entities[entity.id] = entity
+        if entity.entity_type in [EntityType.ENEMY, EntityType.BOSS]:
+            self.enemies.append(entity)
+        else:
+            self.interactables.append(entity)
+        self.spatial.add(entity)
+        self.journal.record("add", entity)
+        self._cell_changed(entity.position)
+
+    def remove_entity(self, entity: Entity):
+        """Removes an entity from the world and from the position index."""
+        for owner in (self.enemies, self.interactables):
+            if entity in owner:
+                self.journal.record("remove", entity, owner, owner.index(entity))
+                break
+        self._unlink_entity(entity)
+
+    def _unlink_entity(self, entity: Entity):
+        if entity in self.enemies: self.enemies.remove(entity)
+        elif entity in self.interactables: self.interactables.remove(entity)
+        self.entities.pop(entity.id, None)
+        self.spatial.remove(entity)
+        self._cell_changed(entity.position)
+
+    def get_entity(self, entity_id: int) -> Optional[Entity]:
+        """Looks up a placed entity by id."""
+        return self.entities.get(entity_id)
+
+    def _cell_changed(self, position: Point):
+        """A cell's tile or entities changed: redraw its row and refresh the motion tables."""
+        self.dirty_rows.add(position.y)
+        self.motions.invalidate(position.y)
+        self.rays.invalidate(position.x, position.y)
+
+    def _is_free(self, x: int, y: int) -> bool:
+        """Whether a move can pass through a cell: open floor with no stopping entity."""
+        if not self.map_data.is_floor(x, y):
+            return False
+        entity = self.spatial.at(x, y)
+        return entity is None or entity.entity_type not in STOPPING_TYPES
 
     def attack(self, attacker: Entity, target: Entity):
         """Executes a melee attack between two entities."""
         damage = 5 if self.aura_active else 2
-        target.hp -= damage
-        self.add_message(f"LINK DAMAGE: {target.name} suffered {damage} damage.")
+        self.set_hp(target, target.hp - damage)
+        self.publish(EventKind.DAMAGED, "LINK DAMAGE: {} suffered {} damage.", target.name, damage, entity=target, amount=damage)
         if target.hp <= 0:
-            self.add_message(f"ERASED: {target.name}")
+            self.publish(EventKind.DESTROYED, "ERASED: {}", target.name, entity=target, amount=1)
             self.spawn_explosion(target.position, target.entity_type)
-            if target in self.enemies: self.enemies.remove(target)
-            elif target in self.interactables: self.interactables.remove(target)
+            self.remove_entity(target)
 
     def spawn_explosion(self, position: Point, entity_type: EntityType):
         """Spawns particle effects at the entity's position."""
@@ -257,31 +521,97 @@ class GameEngine:
         for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
             nx, ny = position.x + dx, position.y + dy
             if 0 <= nx < self.width and 0 <= ny < self.height:
-                if self.map_data[ny][nx] == ".":
-                    self.active_effects.append(Effect(Point(nx, ny), random.choice(["*", "%", "x"]), color, 2))
+                if self.map_data.is_floor(nx, ny):
+                    self.add_effect(Effect(Point(nx, ny), self.rng.choice(["*", "%", "x"]), color, EFFECT_TICKS))
+
+    def add_effect(self, effect: Effect):
+        """Shows a particle effect until `effect.lifespan` clock ticks have passed."""
+        self.effects.setdefault(effect.position.y, []).append(effect)
+        effect.expiry = self.clock.after(effect.lifespan, lambda: self._expire_effect(effect))
+        self.dirty_rows.add(effect.position.y)
+
+    def _expire_effect(self, effect: Effect):
+        row_effects = self.effects.get(effect.position.y)
+        if row_effects and effect in row_effects:
+            row_effects.remove(effect)
+            if not row_effects:
+                del self.effects[effect.position.y]
+            self.dirty_rows.add(effect.position.y)
 
-    def add_message(self, message: str):
-        """Adds a message to the game log, maintaining a maximum size."""
-        self.messages.append(message)
-        if len(self.messages) > 10: self.messages.pop(0)
+    def publish(self, kind: EventKind, template: str = "", *args, entity: Optional[Entity] = None, amount: int = 0) -> GameEvent:
+        """Publishes a game event; `template` and `args` make its log line, formatted only if someone reads it."""
+        return self.events.publish(GameEvent(kind, template, args, entity, amount))
 
     def complete_level(self):
         """Marks the current level as completed."""
         self.level_complete = True
+        self.publish(EventKind.LEVEL_COMPLETE, "Sector {} cleared in {} keystrokes.", self.current_level.num, self.keystroke_count, amount=self.keystroke_count)
+
+    def mark_all_dirty(self):
+        """Forces the next frame to redraw every row."""
+        self.full_redraw = True
+        self.dirty_rows.clear()
 
     def get_render_data(self) -> List[List[str]]:
-        """Prepares a character matrix of the map for rendering."""
-        # Decrement effect lifespans
-        self.active_effects = [e for e in self.active_effects if e.lifespan > 0]
-        for e in self.active_effects: e.lifespan -= 1
+        """
+        Prepares a character matrix of the part of the map the camera shows.
+        Only rows marked dirty since the last call are recomposed, and only
+        across the visible columns, so the cost follows the view size rather
+        than the map size. The returned buffer is reused between frames and
+        must be treated as read-only; `render_window` gives its map bounds and
+        `render_dirty_rows` the window rows that changed (None means all of them).
+        """
+        # Visual selection, aura and mode changes restyle rows without touching the map
+        view_state = (self.mode, self.visual_anchor, self.player.position, self.aura_active)
+        if view_state != self.last_view_state:
+            for state in (self.last_view_state, view_state):
+                if state:
+                    self.dirty_rows.update(self._view_rows(*state))
+            self.last_view_state = view_state
+
+        # A scroll or resize moves every visible cell, so the window is rebuilt
+        self.camera.follow(self.player.position.x, self.player.position.y, self.width, self.height)
+        window = self.camera.window(self.width, self.height)
+        left, top, right, bottom = window
+        if self.full_redraw or window != self.render_window:
+            self.render_buffer = [self._compose_row(y, left, right) for y in range(top, bottom)]
+            self.render_window = window
+            self.render_dirty_rows = None
+        else:
+            self.render_dirty_rows = set()
+            for y in self.dirty_rows:
+                if top <= y < bottom:
+                    self.render_buffer[y - top] = self._compose_row(y, left, right)
+                    self.render_dirty_rows.add(y - top)
+        self.full_redraw = False
+        self.dirty_rows.clear()
+        return self.render_buffer
+
+    def _view_rows(self, mode: GameMode, anchor: Optional[Point], position: Point, aura_active: bool) -> range:
+        """Rows whose styling depends on the player, aura or visual selection."""
+        if mode == GameMode.VISUAL and anchor:
+            return range(min(anchor.y, position.y), max(anchor.y, position.y) + 1)
+        return range(position.y, position.y + 1)
+
+    def _symbol_row(self, y: int) -> List[str]:
+        """One row's tiles with entities on top, as the jump motions see it."""
+        row = self.map_data.row_chars(y)
+        for entity in self.spatial.in_rect(0, y, len(row) - 1, y):
+            row[entity.position.x] = entity.symbol
+        return row
+
+    def _compose_row(self, y: int, left: int = 0, right: Optional[int] = None) -> List[str]:
+        """Builds columns left..right of one rendered row: map tiles, then effects, entities and the player on top."""
+        row = self.map_data.row_chars(y, left, right)
+        right = left + len(row)
 
-        render_map = [row[:] for row in self.map_data]
-        
         # Draw effects first (under entities)
-        for effect in self.active_effects:
-            render_map[effect.position.y][effect.position.x] = effect.char
+        for effect in self.effects.get(y, ()):
+            if left <= effect.position.x < right:
+                row[effect.position.x - left] = effect.char
 
-        for entity in self.interactables + self.enemies:
-            render_map[entity.position.y][entity.position.x] = entity.symbol
-        render_map[self.player.position.y][self.player.position.x] = self.player.symbol
-        return render_map
+        for entity in self.spatial.in_rect(left, y, right - 1, y):
+            row[entity.position.x - left] = entity.symbol
+        if self.player.position.y == y and left <= self.player.position.x < right:
+            row[self.player.position.x - left] = self.player.symbol
+        return row
@@ -0,0 +1,157 @@
+import json
+import queue
+import threading
+from collections import deque
+from enum import Enum, auto
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+HISTORY = 256 # Events of every kind kept for late subscribers and telemetry
+LOG_LINES = 100 # Events that carry a log line, kept for the log widget to catch up from
+
+class EventKind(Enum):
+    INFO = auto() # Hints, errors and anything else that is only a log line
+    MOVED = auto()
+    BLOCKED = auto()
+    YANKED = auto()
+    UNLOCKED = auto()
+    DAMAGED = auto()
+    DESTROYED = auto()
+    PURGED = auto()
+    LEVEL_COMPLETE = auto()
+
+class GameEvent:
+    """
+    Something that happened in the game. The log line is kept as a format
+    template and its arguments and only built when someone reads `text`,
+    so events nobody displays cost no string formatting.
+    """
+    __slots__ = ("kind", "seq", "template", "args", "entity", "amount")
+
+    def __init__(self, kind: EventKind, template: str = "", args: Tuple = (), entity=None, amount: int = 0):
+        self.kind = kind
+        self.seq = 0 # Set by the bus; increases by one per published event
+        self.template = template # Empty for events that are not worth a log line
+        self.args = args
+        self.entity = entity
+        self.amount = amount # Cells moved, damage dealt, targets destroyed or keystrokes used
+
+    @property
+    def text(self) -> str:
+        return self.template.format(*self.args) if self.args else self.template
+
+    def __repr__(self) -> str:
+        return f"GameEvent({self.kind.name}, {self.text!r}, seq={self.seq})"
+
+class EventWorker:
+    """A daemon thread that runs subscriber callbacks in publish order, off the publishing thread."""
+    def __init__(self):
+        self.queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._run, name="event-worker", daemon=True)
+        self.thread.start()
+
+    def put(self, callback: Callable[[GameEvent], None], event: GameEvent):
+        self.queue.put((callback, event))
+
+    def close(self, timeout: float = 1.0):
+        """Runs what is already queued, then stops the thread."""
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            callback, event = item
+            try:
+                callback(event)
+            except Exception as error:
+                print(f"Event subscriber failed: {error}")
+
+class EventBus:
+    """
+    Publishes game events to subscribers, in the publisher's thread or, for
+    subscribers that do not touch the UI, on a shared worker thread. Every
+    event lands in the `history` ring buffer and those with a log line also
+    in `lines`, so readers can poll with `since` instead of subscribing.
+    """
+    def __init__(self, history: int = HISTORY, log_lines: int = LOG_LINES):
+        self.history: Deque[GameEvent] = deque(maxlen=history)
+        self.lines: Deque[GameEvent] = deque(maxlen=log_lines)
+        self.seq = 0
+        self.subscribers: Dict[Optional[EventKind], List[Callable[[GameEvent], None]]] = {}
+        self.routes: Dict[EventKind, Tuple[Callable[[GameEvent], None], ...]] = {kind: () for kind in EventKind}
+        self.worker: Optional[EventWorker] = None
+
+    def subscribe(self, callback: Callable[[GameEvent], None], *kinds: EventKind, threaded: bool = False) -> Callable[[GameEvent], None]:
+        """
+        Calls `callback(event)` for every event of `kinds` (of any kind if none
+        are given). With `threaded`, it runs on the worker thread instead.
+        Returns the handle to pass to `unsubscribe`.
+        """
+        if threaded:
+            if self.worker is None:
+                self.worker = EventWorker()
+            worker, target = self.worker, callback
+            callback = lambda event: worker.put(target, event)
+        for kind in kinds or (None,):
+            self.subscribers.setdefault(kind, []).append(callback)
+        self._route()
+        return callback
+
+    def unsubscribe(self, handle: Callable[[GameEvent], None]):
+        for callbacks in self.subscribers.values():
+            if handle in callbacks:
+                callbacks.remove(handle)
+        self._route()
+
+    def publish(self, event: GameEvent) -> GameEvent:
+        self.seq += 1
+        event.seq = self.seq
+        self.history.append(event)
+        if event.template:
+            self.lines.append(event)
+        for callback in self.routes[event.kind]:
+            callback(event)
+        return event
+
+    def since(self, seq: int) -> List[GameEvent]:
+        """Log-line events published after `seq`, oldest first; older ones may have left the ring buffer."""
+        fresh = []
+        for event in reversed(self.lines):
+            if event.seq <= seq:
+                break
+            fresh.append(event)
+        fresh.reverse()
+        return fresh
+
+    def _route(self):
+        """Flattens the subscriber lists so publishing an event is a single lookup."""
+        catch_all = tuple(self.subscribers.get(None, ()))
+        self.routes = {kind: tuple(self.subscribers.get(kind, ())) + catch_all for kind in EventKind}
+
+    def close(self):
+        """Lets the worker finish the events already handed to it."""
+        if self.worker is not None:
+            self.worker.close()
+            self.worker = None
+
+class EventLogWriter:
+    """A telemetry sink appending every event to a file as a JSON line. Meant to run on the worker thread."""
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+
+    def __call__(self, event: GameEvent):
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write(json.dumps({
+            "seq": event.seq, "kind": event.kind.name, "text": event.text,
+            "entity": getattr(event.entity, "name", None), "amount": event.amount,
+        }) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,58 @@
+from typing import List, Optional
+
+FLOOR = "."
+WALL = "#"
+FLOOR_BYTE = ord(FLOOR)
+TILE_ENCODING = "latin-1" # One byte per tile, so only characters up to U+00FF can be map tiles
+
+def check_tiles(rows: List[str]):
+    """Raises ValueError naming the first tile that does not fit in one byte."""
+    for y, row in enumerate(rows):
+        try:
+            row.encode(TILE_ENCODING)
+        except UnicodeEncodeError as error:
+            raise ValueError(f"map tile {row[error.start]!r} (row {y}, column {error.start}) is not a single-byte character") from None
+
+class TileGrid:
+    """
+    Map tiles packed one byte per cell into a single row-major bytearray.
+    Short template rows are padded with walls. `grid[y]` returns a row as a
+    string for reading; writes go through `set`.
+    """
+    __slots__ = ("width", "height", "tiles")
+
+    def __init__(self, rows: List[str]):
+        self.height = len(rows)
+        self.width = max((len(row) for row in rows), default=0)
+        try:
+            self.tiles = bytearray("".join(row.ljust(self.width, WALL) for row in rows), TILE_ENCODING)
+        except UnicodeEncodeError:
+            check_tiles(rows)
+            raise
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, y: int) -> str:
+        start = y * self.width
+        return self.tiles[start:start + self.width].decode(TILE_ENCODING)
+
+    def get(self, x: int, y: int) -> str:
+        return chr(self.tiles[y * self.width + x])
+
+    def set(self, x: int, y: int, char: str):
+        self.tiles[y * self.width + x] = ord(char)
+
+    def is_floor(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and self.tiles[y * self.width + x] == FLOOR_BYTE
+
+    def row_view(self, y: int) -> memoryview:
+        """A zero-copy view of one row's bytes."""
+        start = y * self.width
+        return memoryview(self.tiles)[start:start + self.width]
+
+    def row_chars(self, y: int, left: int = 0, right: Optional[int] = None) -> List[str]:
+        """Columns left..right of a row as a fresh list of characters, ready to draw entities on."""
+        start = y * self.width
+        right = self.width if right is None else min(right, self.width)
+        return list(self.tiles[start + left:start + right].decode(TILE_ENCODING))
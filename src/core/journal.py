@@ -0,0 +1,45 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+MISSING = object() # Marks a register that did not exist before a write
+
+class JournalRecord:
+    """The inverse of every change made by a single player action."""
+    __slots__ = ("changes", "meta")
+
+    def __init__(self, meta: Dict[str, Any]):
+        self.changes: List[Tuple] = []
+        self.meta = meta
+
+class UndoJournal:
+    """
+    Delta-based undo history.
+    Each action opens a record; the engine logs the old value of whatever it
+    touches, and undo replays those entries backwards. Cost scales with the
+    size of the change, not the size of the level.
+    """
+    def __init__(self, max_depth: int = 5000):
+        self.records: Deque[JournalRecord] = deque(maxlen=max_depth)
+        self.current: Optional[JournalRecord] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def begin(self, meta: Dict[str, Any]):
+        """Opens a new record; subsequent changes are logged into it."""
+        self.current = JournalRecord(meta)
+        self.records.append(self.current)
+
+    def record(self, *change):
+        """Logs the inverse of a change into the open record, if any."""
+        if self.current is not None:
+            self.current.changes.append(change)
+
+    def pop(self) -> Optional[JournalRecord]:
+        """Closes recording and returns the most recent record."""
+        self.current = None
+        return self.records.pop() if self.records else None
+
+    def clear(self):
+        self.records.clear()
+        self.current = None
@@ -0,0 +1,137 @@
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional, Set
+
+FLOOR = "."
+WALL = "#"
+
+class RowTable:
+    """Jump targets for one map row, as sorted column lists."""
+    __slots__ = ("words", "start", "end", "symbols")
+
+    def __init__(self, symbols: List[str]):
+        # A word is a run of entity symbols; floor and walls both separate words
+        self.words = [
+            x for x, char in enumerate(symbols)
+            if char not in (FLOOR, WALL) and (x == 0 or symbols[x - 1] in (FLOOR, WALL))
+        ]
+        open_cells = [x for x, char in enumerate(symbols) if char != WALL]
+        self.start = open_cells[0] if open_cells else 0
+        self.end = open_cells[-1] if open_cells else 0
+        self.symbols: Dict[str, List[int]] = {}
+        for x, char in enumerate(symbols):
+            if char != FLOOR:
+                self.symbols.setdefault(char, []).append(x)
+
+    def target(self, motion: str, x: int, count: int = 1, char: Optional[str] = None) -> Optional[int]:
+        """The column a jump motion from column x lands on, or None if it has nowhere to go."""
+        if motion == "0":
+            return self.start
+        if motion == "$":
+            return self.end
+        if motion == "w":
+            # Past the last word, w stops at the end of the line like Vim
+            i = bisect_right(self.words, x) + count - 1
+            return self.words[i] if i < len(self.words) else max(self.end, x)
+        if motion == "b":
+            i = bisect_left(self.words, x) - count
+            return self.words[i] if i >= 0 else min(self.start, x)
+
+        columns = self.symbols.get(char, [])
+        if motion in ("f", "t"):
+            i = bisect_right(columns, x + (motion == "t")) + count - 1
+            if i >= len(columns):
+                return None
+            return columns[i] - (motion == "t")
+        if motion in ("F", "T"):
+            i = bisect_left(columns, x - (motion == "T")) - count
+            if i < 0:
+                return None
+            return columns[i] + (motion == "T")
+        return None
+
+class MotionTables:
+    """
+    Per-row word, line and symbol tables for the jump motions (w, b, 0, $, f, t, F, T).
+    `row_symbols(y)` returns what a row shows without the player: tiles with
+    entities on top. Rows are rebuilt lazily after `invalidate`, so removing an
+    entity costs one row, and every lookup is a bisect.
+    """
+    def __init__(self, row_symbols: Callable[[int], List[str]]):
+        self.row_symbols = row_symbols
+        self.rows: List[Optional[RowTable]] = []
+        self.stale: Set[int] = set()
+
+    def build(self, height: int):
+        self.rows = [RowTable(self.row_symbols(y)) for y in range(height)]
+        self.stale.clear()
+
+    def invalidate(self, y: int):
+        """Marks a row whose tiles or entities changed."""
+        self.stale.add(y)
+
+    def row(self, y: int) -> RowTable:
+        if y in self.stale:
+            self.stale.discard(y)
+            self.rows[y] = RowTable(self.row_symbols(y))
+        return self.rows[y]
+
+    def target(self, motion: str, x: int, y: int, count: int = 1, char: Optional[str] = None) -> Optional[int]:
+        """The column a jump motion from (x, y) lands on, or None if it has nowhere to go."""
+        return self.row(y).target(motion, x, count, char)
+
+class RayTables:
+    """
+    For every cell and direction, how many cells a straight move can enter
+    before it reaches one it cannot (a wall, the end of a short row, or a
+    blocking entity), so counted hjkl moves land without stepping.
+    Left/right runs are kept per row and up/down runs per column. A changed
+    cell drops its row and column, which are rebuilt on their next lookup.
+    """
+    def __init__(self, is_free: Callable[[int, int], bool]):
+        self.is_free = is_free
+        self.width = 0
+        self.height = 0
+        self.right: List[Optional[List[int]]] = []
+        self.left: List[Optional[List[int]]] = []
+        self.down: List[Optional[List[int]]] = []
+        self.up: List[Optional[List[int]]] = []
+
+    def build(self, width: int, height: int):
+        """Resets the tables for a new map; rows and columns are computed on demand."""
+        self.width = width
+        self.height = height
+        self.right = [None] * height
+        self.left = [None] * height
+        self.down = [None] * width
+        self.up = [None] * width
+
+    def invalidate(self, x: int, y: int):
+        """Marks a cell whose tile or entities changed."""
+        if 0 <= y < self.height:
+            self.right[y] = self.left[y] = None
+        if 0 <= x < self.width:
+            self.down[x] = self.up[x] = None
+
+    def distance(self, x: int, y: int, dx: int, dy: int) -> int:
+        """Free cells in a row from (x, y) in a unit direction (dx, dy)."""
+        if dy == 0:
+            if self.right[y] is None:
+                free = [self.is_free(cell_x, y) for cell_x in range(self.width)]
+                self.right[y] = self._runs(free)
+                self.left[y] = self._runs(free[::-1])[::-1]
+            return (self.right if dx > 0 else self.left)[y][x]
+        if self.down[x] is None:
+            free = [self.is_free(x, cell_y) for cell_y in range(self.height)]
+            self.down[x] = self._runs(free)
+            self.up[x] = self._runs(free[::-1])[::-1]
+        return (self.down if dy > 0 else self.up)[x][y]
+
+    @staticmethod
+    def _runs(free: List[bool]) -> List[int]:
+        """For each index, the number of consecutive free cells right after it."""
+        runs = [0] * len(free)
+        run = 0
+        for i in range(len(free) - 1, -1, -1):
+            runs[i] = run
+            run = run + 1 if free[i] else 0
+        return runs
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Deque, Dict, List, Optional
+
+WINDOW = 512 # Samples kept per span name for the rolling percentiles
+MAX_TRACE_EVENTS = 200000
+PERCENTILES = (50, 95, 99)
+
+# Returned by span() while profiling is off; entering and leaving it does nothing
+NULL_SPAN = nullcontext()
+
+class Span:
+    """Times one `with` block and reports it to its profiler."""
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, time.perf_counter() - self.started, self.started)
+        return False
+
+class Profiler:
+    """
+    Timing spans with rolling p50/p95/p99 per name.
+    While `enabled` is false, `span` hands back a shared no-op context, so
+    instrumented code pays one attribute check. With `tracing` on, every span
+    is also kept as a Chrome trace event ("X" phase) for `dump_trace`; the
+    file opens in chrome://tracing or Perfetto.
+    """
+    def __init__(self, enabled: bool = False, tracing: bool = False, window: int = WINDOW):
+        self.enabled = enabled or tracing
+        self.tracing = tracing
+        self.window = window
+        self.samples: Dict[str, Deque[float]] = {}
+        self.counts: Dict[str, int] = {}
+        self.trace: List[dict] = []
+        self.origin = time.perf_counter()
+
+    def span(self, name: str):
+        """A context manager timing its block under `name`."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def record(self, name: str, seconds: float, started: Optional[float] = None):
+        """Adds a duration measured elsewhere, e.g. from a key event to the frame it caused."""
+        if not self.enabled:
+            return
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        if self.tracing and len(self.trace) < MAX_TRACE_EVENTS:
+            if started is None:
+                started = time.perf_counter() - seconds
+            self.trace.append({
+                "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                "ts": (started - self.origin) * 1e6, "dur": seconds * 1e6,
+            })
+
+    def percentiles(self, name: str) -> Dict[int, float]:
+        """Rolling p50/p95/p99 of a span in milliseconds (nearest rank)."""
+        ordered = sorted(self.samples.get(name, ()))
+        if not ordered:
+            return {}
+        return {p: ordered[min(len(ordered) - 1, len(ordered) * p // 100)] * 1e3 for p in PERCENTILES}
+
+    def summary(self) -> List[tuple]:
+        """(name, calls, p50, p95, p99) for every span, slowest p95 first."""
+        rows = []
+        for name in self.samples:
+            ranks = self.percentiles(name)
+            rows.append((name, self.counts[name], ranks[50], ranks[95], ranks[99]))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def reset(self):
+        """Drops the samples and trace collected so far."""
+        self.samples.clear()
+        self.counts.clear()
+        self.trace.clear()
+
+    def dump_trace(self, path: str) -> int:
+        """Writes the collected spans as a Chrome trace JSON file. Returns the number of events."""
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": self.trace, "displayTimeUnit": "ms"}, trace_file)
+        return len(self.trace)
@@ -0,0 +1,75 @@
+import heapq
+import itertools
+from typing import Callable, List, Optional
+
+TICK_SECONDS = 0.05 # Length of one tick when the app drives the clock
+
+class Timer:
+    """Handle for a scheduled callback; `cancel` it to stop it from running."""
+    __slots__ = ("due", "interval", "callback")
+
+    def __init__(self, due: int, interval: int, callback: Callable[[], None]):
+        self.due = due
+        self.interval = interval # Repeat period in ticks, 0 for one-shot
+        self.callback: Optional[Callable[[], None]] = callback
+
+    def cancel(self):
+        self.callback = None
+
+    @property
+    def active(self) -> bool:
+        return self.callback is not None
+
+class Scheduler:
+    """
+    A tick clock with callbacks kept in a heap ordered by due tick.
+    `advance` pops only what is due, so a tick costs O(due timers) however
+    many are pending. Cancelled timers stay in the heap until their tick and
+    are dropped then. Nothing runs unless something advances the clock: the
+    app does it on a fixed interval, headless sessions never need to.
+    """
+    def __init__(self):
+        self.tick = 0
+        self.queue: List[tuple] = []
+        self.order = itertools.count() # Ties run in scheduling order
+
+    def after(self, ticks: int, callback: Callable[[], None]) -> Timer:
+        """Runs `callback` once, `ticks` ticks from now (at least one)."""
+        return self._push(Timer(self.tick + max(1, ticks), 0, callback))
+
+    def every(self, ticks: int, callback: Callable[[], None]) -> Timer:
+        """Runs `callback` every `ticks` ticks until the timer is cancelled."""
+        ticks = max(1, ticks)
+        return self._push(Timer(self.tick + ticks, ticks, callback))
+
+    def advance(self, ticks: int = 1) -> int:
+        """Moves the clock forward and runs every timer that came due. Returns how many ran."""
+        self.tick += ticks
+        ran = 0
+        queue = self.queue
+        while queue and queue[0][0] <= self.tick:
+            _, _, timer = heapq.heappop(queue)
+            if timer.callback is None:
+                continue
+            callback = timer.callback
+            if timer.interval:
+                timer.due += timer.interval
+                self._push(timer)
+            else:
+                timer.callback = None
+            callback()
+            ran += 1
+        return ran
+
+    def clear(self):
+        """Drops every pending timer."""
+        for _, _, timer in self.queue:
+            timer.callback = None
+        self.queue.clear()
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def _push(self, timer: Timer) -> Timer:
+        heapq.heappush(self.queue, (timer.due, next(self.order), timer))
+        return timer
@@ -0,0 +1,157 @@
+"""
+Headless replay of recorded keystroke logs.
+
+Key streams go through VimParser.handle_key into GameEngine exactly as they do
+in VimMasterpiece, but without Textual, so thousands of runs can be validated
+for leaderboards and regression tests across a process pool.
+
+Usage: python -m src.core.simulator runs.jsonl [--processes N]
+Each line of the input is a run: {"id": ..., "level": 0, "seed": 0, "keys": ["l", "l", ...]}
+where `keys` are the key names as pressed in the app, `level` is a curriculum index
+and an optional `key_map` holds the player's remaps. Keys the app keeps for itself
+(overlays, themes) are dropped here the same way, including the key that dismisses
+a milestone narrative or the help overlay.
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+from src.core.engine import GameEngine
+from src.core.vim_logic import VimParser, decode_keys, normalize_key
+from src.data.models import GameMode, LevelConfig
+from src.data.narrative import MILESTONES
+
+# Keys the app consumes before they reach the parser (help overlay, theme cycling, perf overlay)
+UI_ONLY_KEYS = {"?", "T", "f12"}
+HELP_KEY = "?"
+
+class HeadlessSession:
+    """
+    Drives one level through VimParser and GameEngine with no UI attached.
+    `index` is the level's place in the app's curriculum; milestone sectors open
+    with the narrative overlay up, so their first key is swallowed like in the app.
+    """
+    def __init__(self, level: LevelConfig, seed: int = 0, key_map: Optional[Dict[str, str]] = None, index: Optional[int] = None):
+        self.engine = GameEngine()
+        self.engine.rng = random.Random(seed)
+        self.engine.load_level(level)
+        self.parser = VimParser(self.on_mode_change, self.on_action, key_map)
+        self.keys_fed = 0
+        self.overlay_open = index in MILESTONES # Narrative or help overlay on screen
+
+    def on_mode_change(self, new_mode: GameMode):
+        self.engine.set_mode(new_mode)
+
+    def on_action(self, action: str, params: dict):
+        if self.engine.level_complete:
+            return
+        if action == "play_macro":
+            self.play_macro(params)
+        else:
+            self.engine.apply_player_action(action, params)
+
+    def play_macro(self, params: dict):
+        keys = decode_keys(self.engine.registers.get(params["reg"], ""))
+        with self.engine.batch():
+            self.parser.play(keys, params["count"], lambda: self.engine.mode, lambda: self.engine.level_complete)
+
+    def feed(self, keys: Iterable[str]):
+        """Sends keys to the parser until the level is cleared or the keys run out."""
+        for key in keys:
+            if self.engine.level_complete:
+                break
+            self.keys_fed += 1
+            name = normalize_key(key)
+            if self.overlay_open:
+                # Any key closes an open overlay and goes no further
+                self.overlay_open = False
+            elif name == HELP_KEY:
+                self.overlay_open = True
+            elif name not in UI_ONLY_KEYS:
+                self.parser.handle_key(key, self.engine.mode)
+
+def replay(run: Dict, level: LevelConfig, index: Optional[int] = None) -> Dict:
+    """
+    Replays a single run and reports its outcome. Engine errors are reported, not raised.
+    Pass the curriculum `index` to model the milestone narrative the app shows on load.
+    """
+    session = HeadlessSession(level, run.get("seed", 0), run.get("key_map"), index)
+    error = None
+    try:
+        session.feed(run["keys"])
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    engine = session.engine
+    return {
+        "id": run.get("id"),
+        "level_num": level.num,
+        "completed": engine.level_complete,
+        "keystrokes": engine.keystroke_count,
+        "keys_fed": session.keys_fed,
+        "final_hp": engine.player.hp,
+        "error": error,
+    }
+
+_worker_levels: List[LevelConfig] = []
+
+def _init_worker(levels: List[LevelConfig]):
+    global _worker_levels
+    _worker_levels = levels
+
+def _replay_in_worker(run: Dict) -> Dict:
+    index = run.get("level", 0)
+    return replay(run, _worker_levels[index], index)
+
+def simulate_batch(runs: List[Dict], levels: Optional[List[LevelConfig]] = None, processes: Optional[int] = None) -> Dict:
+    """
+    Replays runs across a process pool.
+    The level sequence is shipped to every worker. The default curriculum is
+    seeded, so workers that build sectors lazily get the same maps as the parent.
+    """
+    if levels is None:
+        from src.data.levels import LEVELS
+        levels = LEVELS
+
+    started = time.perf_counter()
+    if processes == 1:
+        _init_worker(levels)
+        results = [_replay_in_worker(run) for run in runs]
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(levels,)) as pool:
+            chunksize = max(1, len(runs) // ((processes or multiprocessing.cpu_count()) * 4))
+            results = pool.map(_replay_in_worker, runs, chunksize=chunksize)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "results": results,
+        "runs": len(results),
+        "completed": sum(1 for result in results if result["completed"]),
+        "errors": sum(1 for result in results if result["error"]),
+        "seconds": elapsed,
+        "replays_per_second": len(results) / elapsed if elapsed else 0.0,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description="Replay recorded keystroke logs without the UI.")
+    arg_parser.add_argument("runs", help="JSON Lines file with one run per line")
+    arg_parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    arg_parser.add_argument("--output", help="write per-run results as JSON Lines to this file")
+    args = arg_parser.parse_args(argv)
+
+    with open(args.runs, "r") as runs_file:
+        runs = [json.loads(line) for line in runs_file if line.strip()]
+    report = simulate_batch(runs, processes=args.processes)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            for result in report["results"]:
+                output_file.write(json.dumps(result) + "\n")
+    print(f"{report['runs']} runs, {report['completed']} completed, {report['errors']} errors in {report['seconds']:.2f}s "
+          f"({report['replays_per_second']:.0f} replays/s)")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Optimal-par solver for dungeon levels.
+
+Searches the state graph of the commands the engine supports (hjkl with
+counts, yank/put through registers, the regex purge and Visual-mode
+deletion) with A*, and returns the minimum number of strokes together with
+one key sequence that achieves it. Strokes are counted the way GameEngine
+counts them: one per action the parser emits, so `5j` or `"ay` is one stroke
+and entering or leaving Visual mode is free.
+
+The w/b/0/$/f/t/F jumps are left out: like counted moves they walk the free
+run and stop at the first blocker, so every cell a jump reaches, a counted
+move reaches for the same stroke.
+"""
+import heapq
+import itertools
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.data.models import EntityType, LevelConfig
+from src.mechanics.regex_combat import DAMAGE_PER_REPLACEMENT, DEFAULT_PAYLOAD, RegexError, parse_substitution
+
+# The regex purge: rewrites every corrupt segment of every boss at once
+# (":" enters Command mode, "enter" submits)
+PURGE_COMMAND = "%s/[^:]+/DATA/g"
+PURGE_KEYS = [":"] + list(PURGE_COMMAND) + ["enter"]
+BOSS_HP = 10
+UNREACHABLE = 1 << 30 # Estimate for cells with no way to the exit; walls are never removed
+
+class Solution(NamedTuple):
+    strokes: int
+    keys: List[str]
+
+class State(NamedTuple):
+    position: int
+    anchor: int # Visual anchor cell, -1 outside Visual mode
+    removed: int # Bitmask of entity ids no longer on the map
+    held: int # Bitmask of key values ('a' = bit 0) stored in registers
+
+class Board:
+    """Static layout of a level: tiles, entities and their ids."""
+    def __init__(self, level: LevelConfig):
+        rows = [list(row) for row in level.map_template]
+        self.height = len(rows)
+        self.width = len(rows[0])
+        self.tiles: List[List[str]] = []
+        self.entity_at: Dict[Tuple[int, int], int] = {}
+        self.kinds: List[EntityType] = []
+        self.cells: List[Tuple[int, int]] = []
+        self.regs: List[str] = []
+        self.bosses: List[int] = []
+        self.payload = level.boss_payload or DEFAULT_PAYLOAD
+        self.start = (1, 1)
+
+        # Mirrors GameEngine.load_level
+        for y, row in enumerate(rows):
+            for x, char in enumerate(row):
+                kind = None
+                if char == "@":
+                    self.start = (x, y)
+                elif char in "G B":
+                    kind = EntityType.BOSS if char == "B" else EntityType.ENEMY
+                elif char == ">":
+                    kind = EntityType.EXIT
+                elif char == "R":
+                    kind = EntityType.RUBBLE
+                elif char.islower() and char != "b":
+                    kind = EntityType.KEY
+                elif char.isupper() and char not in "RGB B":
+                    kind = EntityType.LOCK
+                if kind is not None or char == "@":
+                    row[x] = "."
+                if kind is not None:
+                    entity_id = len(self.kinds)
+                    self.entity_at.setdefault((x, y), entity_id)
+                    self.kinds.append(kind)
+                    self.cells.append((x, y))
+                    self.regs.append(char.lower())
+                    if kind == EntityType.BOSS:
+                        self.bosses.append(entity_id)
+            self.tiles.append(row)
+
+    def blocker(self, x: int, y: int, removed: int) -> Optional[EntityType]:
+        """The type of a live entity on a cell, if any."""
+        entity_id = self.entity_at.get((x, y))
+        if entity_id is None or removed >> entity_id & 1:
+            return None
+        return self.kinds[entity_id]
+
+    def walkable(self, x: int, y: int) -> bool:
+        row = self.tiles[y]
+        return x < len(row) and row[x] == "."
+
+    def around(self, x: int, y: int, removed: int) -> List[int]:
+        """Live entity ids within one cell, in the row-major order the engine scans them."""
+        found = []
+        for cell_y in range(y - 1, y + 2):
+            for cell_x in range(x - 1, x + 2):
+                entity_id = self.entity_at.get((cell_x, cell_y))
+                if entity_id is not None and not removed >> entity_id & 1:
+                    found.append(entity_id)
+        return found
+
+class ParSolver:
+    """A* over level states. `max_states` bounds the search so callers can fall back on huge maps."""
+    MOTIONS = {"l": (1, 0), "h": (-1, 0), "j": (0, 1), "k": (0, -1)}
+    BLOCKING = (EntityType.LOCK, EntityType.BOSS, EntityType.ENEMY, EntityType.RUBBLE)
+    STOPPING = BLOCKING + (EntityType.EXIT,)
+
+    def __init__(self, level: LevelConfig, max_states: int = 200000):
+        self.board = Board(level)
+        self.max_states = max_states
+        self.exit = next((cell for cell, kind in zip(self.board.cells, self.board.kinds) if kind == EntityType.EXIT), None)
+        self.moves: Dict[Tuple[int, int], List[Tuple[List[str], Optional[int]]]] = {}
+        self.blocking_mask = 0 # Entities whose removal frees a cell
+        for entity_id, kind in enumerate(self.board.kinds):
+            if kind in self.BLOCKING:
+                self.blocking_mask |= 1 << entity_id
+        self.exit_distances: Dict[int, List[int]] = {}
+        if self.exit is not None:
+            self.wall_distances = self._exit_distances((1 << len(self.board.kinds)) - 1)
+        # The purge leaves nothing to replace, so it only matters the first time it hits a boss
+        self.purgeable = 0
+        if self._purge_damage() >= BOSS_HP:
+            for boss in self.board.bosses:
+                self.purgeable |= 1 << boss
+
+    def solve(self) -> Optional[Solution]:
+        """Returns an optimal solution, or None if the level is unsolvable or the search budget ran out."""
+        if self.exit is None:
+            return None
+        board = self.board
+        start = State(self._index(*board.start), -1, 0, 0)
+        tie = itertools.count()
+        # Among states with the same estimate the deepest goes first, so the search
+        # heads for a solution instead of widening the whole last layer
+        frontier = [(self._estimate(start), 0, next(tie), 0, start)]
+        best: Dict[State, int] = {start: 0}
+        parents: Dict[State, Tuple[Optional[State], List[str]]] = {start: (None, [])}
+
+        while frontier:
+            _, _, _, cost, state = heapq.heappop(frontier)
+            if cost > best.get(state, cost):
+                continue
+            if len(best) > self.max_states:
+                return None
+            for keys, step_cost, successor in self._successors(state):
+                if successor is None:
+                    # Entering the exit takes one straight motion, so this state is aligned with it
+                    # (estimate 1) and the goal cost equals the f value just popped, the minimum.
+                    return Solution(cost + step_cost, self._path(parents, state) + keys)
+                new_cost = cost + step_cost
+                if new_cost < best.get(successor, new_cost + 1):
+                    best[successor] = new_cost
+                    parents[successor] = (state, keys)
+                    heapq.heappush(frontier, (new_cost + self._estimate(successor), -new_cost, next(tie), new_cost, successor))
+        return None
+
+    def _successors(self, state: State):
+        """Yields (keys, stroke cost, next state). A None state means the level is complete."""
+        board = self.board
+        x, y = self._cell(state.position)
+
+        for keys, landing in self._moves(state.position, state.removed):
+            if landing is None:
+                # Walking out in Visual mode is never cheaper than the same walk in Normal mode
+                if state.anchor < 0:
+                    yield keys, 1, None
+            else:
+                yield keys, 1, State(landing, state.anchor, state.removed, state.held)
+
+        nearby = board.around(x, y, state.removed)
+        key = next((e for e in nearby if board.kinds[e] == EntityType.KEY), None)
+        if key is not None:
+            reg = board.regs[key]
+            yield ['"', reg, "y"], 1, state._replace(removed=state.removed | 1 << key, held=state.held | self._bit(reg))
+        unlocked = set()
+        for lock in nearby:
+            reg = board.regs[lock]
+            # The engine unlocks the first lock it finds that matches the register's value
+            if board.kinds[lock] == EntityType.LOCK and state.held & self._bit(reg) and reg not in unlocked:
+                unlocked.add(reg)
+                yield ['"', reg, "p"], 1, state._replace(removed=state.removed | 1 << lock)
+
+        if self.purgeable & ~state.removed:
+            # Command mode drops out of Visual mode
+            yield PURGE_KEYS, 1, state._replace(anchor=-1, removed=state.removed | self.purgeable)
+
+        if state.anchor != state.position:
+            yield ["v"], 0, state._replace(anchor=state.position)
+        if state.anchor >= 0:
+            ax, ay = self._cell(state.anchor)
+            removed = state.removed
+            for entity_id, (ex, ey) in enumerate(board.cells):
+                if (min(x, ax) <= ex <= max(x, ax) and min(y, ay) <= ey <= max(y, ay)
+                        and board.kinds[entity_id] != EntityType.EXIT):
+                    removed |= 1 << entity_id
+            if removed != state.removed:
+                yield ["d", "d"], 1, state._replace(anchor=-1, removed=removed)
+
+    def _purge_damage(self) -> int:
+        """Damage the purge deals to a boss that has not been hit yet."""
+        try:
+            _, replaced = parse_substitution(PURGE_COMMAND).apply(self.board.payload)
+        except RegexError:
+            return 0
+        return replaced * DAMAGE_PER_REPLACEMENT
+
+    def _moves(self, position: int, removed: int) -> List[Tuple[List[str], Optional[int]]]:
+        """(keys, landing cell) for every counted move from a cell, cached per cell and live blockers; None lands in the exit."""
+        cache_key = (position, removed & self.blocking_mask)
+        moves = self.moves.get(cache_key)
+        if moves is None:
+            x, y = self._cell(position)
+            moves = self.moves[cache_key] = [
+                (self._count_keys(count) + [motion], landing)
+                for motion, (dx, dy) in self.MOTIONS.items()
+                for count, landing in self._ray(x, y, dx, dy, removed)
+            ]
+        return moves
+
+    def _ray(self, x: int, y: int, dx: int, dy: int, removed: int):
+        """Yields (count, landing cell) for each count that moves the player; landing None means the exit was entered."""
+        board = self.board
+        count = 0
+        while True:
+            new_x = max(0, min(board.width - 1, x + dx))
+            new_y = max(0, min(board.height - 1, y + dy))
+            if (new_x, new_y) == (x, y):
+                return
+            count += 1
+            kind = board.blocker(new_x, new_y, removed)
+            if kind == EntityType.EXIT:
+                yield count, None
+                return
+            if kind in self.BLOCKING:
+                return
+            if not board.walkable(new_x, new_y):
+                return
+            x, y = new_x, new_y
+            yield count, self._index(x, y)
+
+    @staticmethod
+    def _count_keys(count: int) -> List[str]:
+        return [*str(count)] if count > 1 else []
+
+    def _estimate(self, state: State) -> int:
+        """
+        Admissible and consistent: the straight motions to the exit through the
+        cells free now, unless clearing a blocker first (one stroke at least)
+        and then going through walls only could be shorter. A Visual-mode state
+        only pays off through its `dd`, so it costs one more.
+        """
+        through_walls = self.wall_distances[state.position]
+        if state.anchor >= 0:
+            return 1 + through_walls
+        distances = self.exit_distances.get(state.removed & self.blocking_mask)
+        if distances is None:
+            distances = self.exit_distances[state.removed & self.blocking_mask] = self._exit_distances(state.removed)
+        return min(distances[state.position], through_walls + 1)
+
+    def _exit_distances(self, removed: int) -> List[int]:
+        """For every cell, the straight motions that reach the exit from it with `removed` entities gone (UNREACHABLE if none do)."""
+        board = self.board
+        distances = [UNREACHABLE] * (board.width * board.height)
+        distances[self._index(*self.exit)] = 0
+        frontier = [self.exit]
+        steps = 0
+        while frontier:
+            steps += 1
+            reached = []
+            for x, y in frontier:
+                for dx, dy in self.MOTIONS.values():
+                    # Motions are reversible, so walk out from the cell along every free run into it
+                    cell_x, cell_y = x + dx, y + dy
+                    while (0 <= cell_x < board.width and 0 <= cell_y < board.height and board.walkable(cell_x, cell_y)
+                           and board.blocker(cell_x, cell_y, removed) not in self.STOPPING):
+                        index = self._index(cell_x, cell_y)
+                        if distances[index] == UNREACHABLE:
+                            distances[index] = steps
+                            reached.append((cell_x, cell_y))
+                        cell_x, cell_y = cell_x + dx, cell_y + dy
+            frontier = reached
+        return distances
+
+    def _path(self, parents, state: State) -> List[str]:
+        keys: List[str] = []
+        while state is not None:
+            parent, step = parents[state]
+            keys[:0] = step
+            state = parent
+        return keys
+
+    def _index(self, x: int, y: int) -> int:
+        return y * self.board.width + x
+
+    def _cell(self, position: int) -> Tuple[int, int]:
+        return position % self.board.width, position // self.board.width
+
+    @staticmethod
+    def _bit(reg: str) -> int:
+        return 1 << (ord(reg) - 97)
+
+def solve_par(level: LevelConfig, max_states: int = 200000) -> Optional[Solution]:
+    """Returns the optimal stroke count and key sequence for a level, or None if none was found."""
+    return ParSolver(level, max_states).solve()
@@ -0,0 +1,85 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.data.models import Entity
+
+class SpatialIndex:
+    """
+    Grid-bucketed index of entities by map position.
+    Point lookups are a single dict hit; rectangle queries only visit the
+    buckets that overlap the rectangle instead of every entity on the map.
+    """
+    def __init__(self, bucket_size: int = 8):
+        self.bucket_size = bucket_size
+        self.cells: Dict[Tuple[int, int], List[Entity]] = {}
+        self.buckets: Dict[Tuple[int, int], List[Entity]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(entities) for entities in self.cells.values())
+
+    def clear(self):
+        """Drops every indexed entity."""
+        self.cells.clear()
+        self.buckets.clear()
+
+    def rebuild(self, entities: Iterable[Entity]):
+        """Re-indexes the given entities from scratch."""
+        self.clear()
+        for entity in entities:
+            self.add(entity)
+
+    def add(self, entity: Entity):
+        """Indexes an entity at its current position."""
+        x, y = entity.position.x, entity.position.y
+        self.cells.setdefault((x, y), []).append(entity)
+        self.buckets.setdefault(self._bucket_key(x, y), []).append(entity)
+
+    def remove(self, entity: Entity):
+        """Removes an entity from the index. Unknown entities are ignored."""
+        x, y = entity.position.x, entity.position.y
+        self._discard(self.cells, (x, y), entity)
+        self._discard(self.buckets, self._bucket_key(x, y), entity)
+
+    def move(self, entity: Entity, new_position):
+        """Moves an indexed entity, keeping the index in sync with its position."""
+        self.remove(entity)
+        entity.position = new_position
+        self.add(entity)
+
+    def at(self, x: int, y: int) -> Optional[Entity]:
+        """Returns the first entity occupying a cell, if any."""
+        entities = self.cells.get((x, y))
+        return entities[0] if entities else None
+
+    def around(self, x: int, y: int, radius: int = 1) -> Iterator[Entity]:
+        """Yields entities within a Chebyshev radius of a cell, in row-major order."""
+        cells = self.cells
+        for cell_y in range(y - radius, y + radius + 1):
+            for cell_x in range(x - radius, x + radius + 1):
+                entities = cells.get((cell_x, cell_y))
+                if entities:
+                    yield from list(entities)
+
+    def in_rect(self, min_x: int, min_y: int, max_x: int, max_y: int) -> List[Entity]:
+        """Returns entities inside an inclusive rectangle."""
+        size = self.bucket_size
+        found = []
+        for bucket_y in range(min_y // size, max_y // size + 1):
+            for bucket_x in range(min_x // size, max_x // size + 1):
+                for entity in self.buckets.get((bucket_x, bucket_y), ()):
+                    if min_x <= entity.position.x <= max_x and min_y <= entity.position.y <= max_y:
+                        found.append(entity)
+        return found
+
+    def _bucket_key(self, x: int, y: int) -> Tuple[int, int]:
+        return (x // self.bucket_size, y // self.bucket_size)
+
+    @staticmethod
+    def _discard(table: Dict[Tuple[int, int], List[Entity]], key: Tuple[int, int], entity: Entity):
+        entities = table.get(key)
+        if not entities:
+            return
+        for index, candidate in enumerate(entities):
+            if candidate is entity:
+                del entities[index]
+                break
+        if not entities:
+            del table[key]
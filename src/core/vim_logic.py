@@ -1,110 +1,322 @@
-from typing import Tuple, Optional, List, Dict, Callable
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
 from src.data.models import GameMode
 
+# Motions every parser starts with; the engine resolves each name to a movement
+DEFAULT_MOTIONS = ["h", "j", "k", "l", "w", "b", "0", "$"]
+
+# Motions that take a target character (T is left to the app's theme toggle)
+DEFAULT_FIND_MOTIONS = ["f", "t", "F"]
+
+# Key names Textual shortens instead of using the Unicode name
+KEY_NAME_CHARS = {"slash": "/", "backslash": "\\", "at": "@", "minus": "-", "plus": "+", "underscore": "_"}
+
+# Macro playback limits: nesting depth, and keys fed per top-level @ (guards against qa@aq)
+MAX_MACRO_DEPTH = 16
+MAX_MACRO_KEYS = 100000
+
+# Characters already resolved by normalize_key
+_KEY_CHARS: Dict[str, str] = dict(KEY_NAME_CHARS)
+
+def normalize_key(key: str) -> str:
+    """
+    Maps the names Textual gives printable keys ("quotation_mark", "colon",
+    "dollar_sign") back to the characters themselves. Named keys such as
+    "escape" or "enter" are returned unchanged.
+    """
+    char = _KEY_CHARS.get(key)
+    if char is None:
+        char = key
+        if len(key) > 1:
+            try:
+                found = unicodedata.lookup(key.replace("_", " "))
+                if found.isprintable():
+                    char = found
+            except KeyError:
+                pass
+        _KEY_CHARS[key] = char
+    return char
+
+def encode_keys(keys: List[str]) -> str:
+    """Stores a key sequence as register text: named keys become <enter>, a literal < becomes <lt>."""
+    return "".join("<lt>" if key == "<" else f"<{key}>" if len(key) > 1 else key for key in keys)
+
+def decode_keys(text: str) -> List[str]:
+    """Splits register text written by encode_keys back into keys."""
+    keys = []
+    i = 0
+    while i < len(text):
+        end = text.find(">", i) if text[i] == "<" else -1
+        if end > i + 1:
+            name = text[i + 1:end]
+            keys.append("<" if name == "lt" else name)
+            i = end + 1
+        else:
+            keys.append(text[i])
+            i += 1
+    return keys
+
+@dataclass
+class Binding:
+    """
+    What a complete key sequence does.
+    `kind` selects the parser handler: "action" emits `name` with the params
+    built by `params`, "mode" switches to `mode`, "register" selects a register,
+    "record" starts or stops macro recording and "play" replays a macro.
+    Bindings with `takes_char` consume one more key as their argument.
+    """
+    kind: str
+    name: str = ""
+    params: Callable[["VimParser", int, Optional[str]], Any] = lambda parser, count, char: {}
+    mode: Optional[GameMode] = None
+    takes_char: bool = False
+
+@dataclass
+class KeyNode:
+    """A trie node: either a complete binding or a prefix that waits for more keys."""
+    binding: Optional[Binding] = None
+    children: Dict[str, "KeyNode"] = field(default_factory=dict)
+
+class Keymap:
+    """Trie of key sequences. Remaps are compiled into a separate trie so the defaults stay intact."""
+    def __init__(self):
+        self.root = KeyNode()
+
+    def bind(self, keys: str, binding: Binding):
+        node = self.root
+        for key in keys:
+            node = node.children.setdefault(key, KeyNode())
+        node.binding = binding
+        node.children.clear()
+
+    def compile(self, key_map: Optional[Dict[str, str]] = None) -> KeyNode:
+        """
+        Builds the dispatch trie. Each `key_map` entry makes the typed key do
+        what the bound key does by default at every depth, so {"a": "h"} also
+        turns "da" into "dh". Register names and search characters are not remapped.
+        """
+        remaps = {typed: bound for typed, bound in (key_map or {}).items() if typed != bound}
+        return self._compile(self.root, remaps)
+
+    def _compile(self, node: KeyNode, remaps: Dict[str, str]) -> KeyNode:
+        children = {key: self._compile(child, remaps) for key, child in node.children.items()}
+        compiled = KeyNode(node.binding, dict(children))
+        for typed, bound in remaps.items():
+            if bound in children:
+                compiled.children[typed] = children[bound]
+            elif typed in children:
+                # The typed key now belongs to something this node does not bind
+                del compiled.children[typed]
+        return compiled
+
+def register_params(parser: "VimParser", count: int, char: Optional[str]) -> Dict:
+    return {"reg": parser.active_register or '"', "count": count}
+
 class VimParser:
     """
     Parses keyboard input and translates it into Vim-like commands and actions.
-    Maintains internal state for counts, operators, and registers.
+    Keys walk a trie compiled from the default bindings and the `key_map`
+    remaps; counts, registers and operator-pending prefixes are parser state.
     """
-    def __init__(self, mode_change_callback: Callable, action_callback: Callable):
+    def __init__(self, mode_change_callback: Callable, action_callback: Callable, key_map: Optional[Dict[str, str]] = None):
         self.mode_change_callback = mode_change_callback
         self.action_callback = action_callback
+        self.key_map = dict(key_map or {})
+        self.keymap = Keymap()
+        self.handlers = {
+            "action": self._run_action, "mode": self._run_mode, "register": self._run_register,
+            "record": self._run_record, "play": self._run_play,
+        }
+        self.recording: Optional[str] = None # Register a macro is being recorded into
+        self.recorded: List[str] = []
+        self.playing = 0 # Nesting depth of macro playback
+        self.keys_left = 0
+        self.command_keys = {"enter": self._submit_command, "backspace": self._erase_command}
+        self._bind_defaults()
+        self.compile()
         self.reset()
 
+    def _bind_defaults(self):
+        for motion in DEFAULT_MOTIONS:
+            self.register_motion(motion)
+        for motion in DEFAULT_FIND_MOTIONS:
+            self.register_motion(motion, takes_char=True)
+        self.register_operator("d", {"d": "delete_line", "w": "delete_word"})
+        self.register_action("y", "yank", register_params)
+        self.register_action("p", "put", register_params)
+        self.register_action("u", "undo")
+        self.keymap.bind(":", Binding("mode", mode=GameMode.COMMAND))
+        self.keymap.bind("v", Binding("mode", mode=GameMode.VISUAL))
+        self.keymap.bind('"', Binding("register", takes_char=True))
+        self.keymap.bind("q", Binding("record"))
+        self.keymap.bind("@", Binding("play", takes_char=True))
+
+    def register_motion(self, keys: str, motion: Optional[str] = None, takes_char: bool = False):
+        """Binds keys to the "move" action. Motions that take a character (f, t) receive it as `char`."""
+        motion = motion or keys
+        if takes_char:
+            params = lambda parser, count, char: {"motion": motion, "count": count, "char": char}
+        else:
+            params = lambda parser, count, char: {"motion": motion, "count": count}
+        self.register_action(keys, "move", params, takes_char)
+
+    def register_operator(self, key: str, actions: Dict[str, str]):
+        """Binds an operator: `key` followed by each key in `actions` emits that action with the count."""
+        for target, action in actions.items():
+            self.register_action(key + target, action, lambda parser, count, char: count)
+
+    def register_action(self, keys: str, action: str, params: Optional[Callable] = None, takes_char: bool = False):
+        """Binds a key sequence to an action callback. `params(parser, count, char)` builds its params."""
+        binding = Binding("action", action, takes_char=takes_char)
+        if params is not None:
+            binding.params = params
+        self.keymap.bind(keys, binding)
+        self.compile()
+
+    def set_key_map(self, key_map: Optional[Dict[str, str]]):
+        """Replaces the remaps, dropping any half-typed command."""
+        self.key_map = dict(key_map or {})
+        self.compile()
+        self.reset()
+
+    def compile(self):
+        """Rebuilds the dispatch trie after bindings or remaps change."""
+        self.root = self.keymap.compile(self.key_map)
+        self.node = self.root
+
     def handle_key(self, key: str, mode: GameMode) -> str:
         """Processes a single keypress based on the current game mode."""
+        key = normalize_key(key)
+        if self.recording is not None and not self.playing:
+            self.recorded.append(key)
         if key == "escape":
             self.reset()
             self.mode_change_callback(GameMode.NORMAL)
             return ""
 
         if mode == GameMode.COMMAND:
-            if key == "enter":
-                self.action_callback("regex_attack", {"command": self.buffer})
-                self.reset()
-                self.mode_change_callback(GameMode.NORMAL)
-                return ""
-            elif key == "backspace":
-                self.buffer = self.buffer[:-1]
-            else:
-                self.buffer += key
+            edit = self.command_keys.get(key)
+            if edit is not None:
+                return edit()
+            self.buffer += key
             return ":" + self.buffer
 
-        # Register support
-        if key == '"' and not self.active_register:
-            self.waiting_for_reg = True
-            return '"'
-        
-        if self.waiting_for_reg:
-            self.active_register = key
-            self.waiting_for_reg = False
-            return f'"{key}'
-
-        if self.pending_search:
-            self.action_callback("search_jump", {"type": self.pending_search, "char": key})
-            self.reset()
-            return ""
+        if self.pending is not None:
+            binding, self.pending = self.pending, None
+            return self.handlers[binding.kind](binding, key)
 
         if key.isdigit() and not (key == "0" and not self.count_str):
             self.count_str += key
-            return self.count_str
+            return self.format_buffer()
 
-        count = int(self.count_str) if self.count_str else 1
-        
-        # Action Operators
-        if key == "u":
-            self.action_callback("undo", {})
-            self.reset()
-        elif key == "y":
-            self.action_callback("yank", {"reg": self.active_register or '"', "count": count})
-            self.reset()
-        elif key == "p":
-            self.action_callback("put", {"reg": self.active_register or '"', "count": count})
-            self.reset()
-        elif key == "d":
-            if self.operator == "d":
-                self.action_callback("delete_line", count)
-                self.reset()
-            else:
-                self.operator = "d"
-        elif key == "w":
-            if self.operator == "d":
-                self.action_callback("delete_word", count)
-                self.reset()
-            else:
-                self.action_callback("move", {"motion": "w", "count": count})
-                self.reset()
-
-        # Motions
-        elif key in ["h", "j", "k", "l", "0", "$"]:
-            self.action_callback("move", {"motion": key, "count": count})
-            self.reset()
-        
-        # Modes
-        elif key == ":":
-            self.mode_change_callback(GameMode.COMMAND)
+        node = self.node.children.get(key)
+        if node is None:
+            # Unbound key: drop the count and any half-typed operator, like Vim
             self.reset()
-        elif key == "v":
-            self.mode_change_callback(GameMode.VISUAL)
+            return ""
+        if node.binding is None:
+            self.node = node
+            self.operator += key
+            return self.format_buffer()
+        if node.binding.takes_char:
+            self.pending = node.binding
+            self.operator += key
+            return self.format_buffer()
+        return self.handlers[node.binding.kind](node.binding, None)
+
+    def _run_action(self, binding: Binding, char: Optional[str]) -> str:
+        count = int(self.count_str) if self.count_str else 1
+        params = binding.params(self, count, char)
+        self.reset()
+        self.action_callback(binding.name, params)
+        return ""
+
+    def _run_mode(self, binding: Binding, char: Optional[str]) -> str:
+        self.reset()
+        self.mode_change_callback(binding.mode)
+        return ""
+
+    def _run_register(self, binding: Binding, char: Optional[str]) -> str:
+        self.active_register = char
+        self.operator = ""
+        return self.format_buffer()
+
+    def _run_record(self, binding: Binding, char: Optional[str]) -> str:
+        if char is None and self.recording is not None:
+            # The q that stopped the recording is not part of the macro
+            register, keys = self.recording, encode_keys(self.recorded[:-1])
+            self.recording = None
+            self.recorded = []
             self.reset()
-        
+            self.action_callback("record_macro", {"reg": register, "keys": keys})
+            return ""
+        if char is None:
+            # Wait for the register name
+            self.pending = binding
+            self.operator += "q"
+            return self.format_buffer()
+        self.reset()
+        self.recording = char
+        self.recorded = []
         return self.format_buffer()
 
+    def _run_play(self, binding: Binding, char: Optional[str]) -> str:
+        count = int(self.count_str) if self.count_str else 1
+        self.reset()
+        self.action_callback("play_macro", {"reg": char, "count": count})
+        return ""
+
+    def play(self, keys: List[str], count: int, get_mode: Callable[[], GameMode], stop: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Feeds a macro's keys back through handle_key `count` times.
+        Stops early once `stop()` is true. Returns False if playback was cut
+        short by the nesting or key limits.
+        """
+        if self.playing >= MAX_MACRO_DEPTH:
+            return False
+        if not self.playing:
+            self.keys_left = MAX_MACRO_KEYS
+        self.playing += 1
+        try:
+            for _ in range(count):
+                for key in keys:
+                    if stop is not None and stop():
+                        return True
+                    if self.keys_left <= 0:
+                        return False
+                    self.keys_left -= 1
+                    self.handle_key(key, get_mode())
+            return True
+        finally:
+            self.playing -= 1
+            self.reset()
+
+    def _submit_command(self) -> str:
+        command = self.buffer
+        self.reset()
+        self.action_callback("regex_attack", {"command": command})
+        self.mode_change_callback(GameMode.NORMAL)
+        return ""
+
+    def _erase_command(self) -> str:
+        self.buffer = self.buffer[:-1]
+        return ":" + self.buffer
+
     def reset(self):
         """Resets the parser state to its default values."""
         self.buffer = ""
         self.count_str = ""
-        self.operator = None
-        self.pending_search = None
+        self.operator = ""
+        self.node = self.root
+        self.pending: Optional[Binding] = None
         self.active_register = None
-        self.waiting_for_reg = False
 
     def format_buffer(self) -> str:
         """Returns a string representation of the current parser buffer for display."""
-        formatted_buffer = ""
-        if self.active_register: 
+        formatted_buffer = f"recording @{self.recording} " if self.recording is not None else ""
+        if self.active_register:
             formatted_buffer += f'"{self.active_register}'
         formatted_buffer += self.count_str
-        if self.operator: 
-            formatted_buffer += self.operator
+        formatted_buffer += self.operator
         return formatted_buffer
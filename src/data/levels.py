@@ -1,8 +1,22 @@
-from typing import List
-from src.data.procgen import DungeonGenerator
+import random
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Set
+from src.data.models import LevelConfig
+from src.data.pack import PACK_FILE, LevelPack, read_pack
 
-def gen_curriculum() -> List[LevelConfig]:
-    """Generates the game curriculum consisting of 30 levels."""
+CURRICULUM_SEED = 1337 # Base seed; each procedural sector derives its own from it
+TOTAL_LEVELS = 30
+DUNGEON_WIDTH = 25 # Default size of procedural sectors; larger maps scroll with the camera
+DUNGEON_HEIGHT = 12
+# Past this many open cells the par search runs out of states after seconds of work (about 40x20),
+# so bigger sectors keep the formula par instead of stalling to find the same answer
+SOLVE_CELL_LIMIT = 800
+
+# Corruption variants in procedural boss payloads; later sectors mix in more of them
+CORRUPTION_VARIANTS = ["CORRUPT", "C0RRUPT", "CORRUPTED", "corrupt", "CoRRuPT"]
+
+def tutorial_levels() -> List[LevelConfig]:
+    """Builds the ten hand-written levels that open the curriculum."""
     levels = []
     
     # Milestone I: Foundation (1-5)
@@ -23,15 +37,15 @@ def gen_curriculum() -> List[LevelConfig]:
                       "4. Type [bold #7aa2f7]\"ap[/] to Put (paste) the key into the lock.\n\n" +
                       "The register name ([bold]a[/]) must match the key symbol."))
     
-    levels.append(LevelConfig(7, "The Vault", "Multiple registers. \"ay the a-key. \"by the b-key.", ["#@..a..b..A..B..>#"], {"y","p"}, 10,
-        hint="Yank 'a' into [bold]\"a[/] and 'b' into [bold]\"b[/]. Unlock in order.",
+    levels.append(LevelConfig(7, "The Vault", "Multiple registers. \"ay the a-key. \"cy the c-key.", ["#@..a..c..A..C..>#"], {"y","p"}, 10,
+        hint="Yank 'a' into [bold]\"a[/] and 'c' into [bold]\"c[/]. Unlock in order.",
         detailed_help="[bold #bb9af7]MULTI-REGISTER MASTERY[/]\n\n" +
                       "You can store different keys in different registers simultaneously.\n" +
                       "1. Yank 'a' into '\"a' ([bold]\"ay[/]).\n" +
-                      "2. Yank 'b' into '\"b' ([bold]\"by[/]).\n" +
-                      "3. Use [bold]\"ap[/] near Lock A and [bold]\"bp[/] near Lock B."))
+                      "2. Yank 'c' into '\"c' ([bold]\"cy[/]).\n" +
+                      "3. Use [bold]\"ap[/] near Lock A and [bold]\"cp[/] near Lock C."))
 
-    levels.append(LevelConfig(8, "The Sniper", "Jump to character [f] followed by target.", ["#@...X.......>#"], {"f","t"}, 3, hint="Type [bold]f[/] then [bold]X[/] to jump directly to X."))
+    levels.append(LevelConfig(8, "The Sniper", "Jump to character [f] followed by target.", ["#@...x.......>#"], {"f","t"}, 3, hint="Type [bold]f[/] then [bold]x[/] to jump directly to x."))
     levels.append(LevelConfig(9, "The Corridor", "Corrupted data ahead. Resolve the integrity breach.", ["#@.........>#"], {"all"}, 2, hint="Prepare for combat. Use all learned techniques."))
     levels.append(LevelConfig(10, "BOSS: CORRUPTED DATA", "TYPE [:] then [s/CORRUPT/DATA/g] to purge the Boss [B].", ["#@...B.....>#"], {"command"}, 5,
         hint="Type [bold]:[/], then [bold]s/CORRUPT/DATA/g[/], then [bold]Enter[/].",
@@ -40,30 +54,149 @@ def gen_curriculum() -> List[LevelConfig]:
                       "1. Type [bold]:[/] to enter Command Mode.\n" +
                       "2. Type [bold]s/TARGET/REPLACEMENT/g[/].\n" +
                       "3. Press [bold]Enter[/].\n\n" +
-                      "Example: To purge CORRUPT data, use [bold]:s/CORRUPT/DATA/g[/]."))
+                      "Example: To purge CORRUPT data, use [bold]:s/CORRUPT/DATA/g[/].\n\n" +
+                      "TARGET is a regular expression: [bold]C.RRUPT[/] also matches C0RRUPT.\n" +
+                      "[bold]:s[/] strikes bosses on your row, [bold]:%s[/] strikes every boss on the map.\n" +
+                      "Each replaced segment deals 2 damage."))
 
-    # Milestones 11-30 are procedurally generated
-    generator = DungeonGenerator(width=25, height=12)
-    for level_number in range(11, 31):
-        # Generate the map dynamically
-        map_template = generator.generate(difficulty=level_number)
-        
-        hint = "Procedural Sector. Use everything you've learned."
-        if level_number % 5 == 0:
-            hint = "WARNING: Boss detected. Prepare your regex."
-        elif level_number % 3 == 0:
-            hint = "PUZZLE CACHE: Locate the key and yank it to open the lock."
-            
-        levels.append(LevelConfig(
-            num=level_number, 
-            name=f"Sector {level_number}", 
-            instructions=f"Proceed to the next portal. Threat Level {level_number}.", 
-            map_template=map_template, 
-            unlocked_commands={"all"}, 
-            par_keystrokes=level_number * 2 + 10,
-            hint=hint
-        ))
-    
     return levels
 
-LEVELS = gen_curriculum()
+def boss_payload(level_number: int, seed: int = CURRICULUM_SEED) -> str:
+    """Five corrupt segments and two clean ones; the variety grows with the level so one literal pattern stops being enough."""
+    rng = random.Random(seed * 100 + level_number)
+    variants = CORRUPTION_VARIANTS[:1 + (level_number - 10) // 5]
+    segments = [rng.choice(variants) for _ in range(5)] + ["DATA", "DATA"]
+    rng.shuffle(segments)
+    return ":".join(segments)
+
+def procedural_sector(level_number: int, seed: int = CURRICULUM_SEED, width: int = DUNGEON_WIDTH, height: int = DUNGEON_HEIGHT, solve: bool = True) -> LevelConfig:
+    """
+    Generates one procedural sector (levels 11-30). The same seed and size always yield the same map.
+    With `solve` False the par is left at the formula; solve_sector_par can settle it later.
+    """
+    # Imported here: a game running the prebuilt pack never generates or solves a level
+    from src.data.procgen import DungeonGenerator
+
+    # Generate the map dynamically
+    generator = DungeonGenerator(width=width, height=height, seed=seed * 100 + level_number)
+    map_template = generator.generate(difficulty=level_number)
+    
+    hint = "Procedural Sector. Use everything you've learned."
+    if level_number % 5 == 0:
+        hint = "WARNING: Boss detected. Prepare your regex."
+    elif level_number % 3 == 0:
+        hint = "PUZZLE CACHE: Locate the key and yank it to open the lock."
+        
+    level = LevelConfig(
+        num=level_number, 
+        name=f"Sector {level_number}", 
+        instructions=f"Proceed to the next portal. Threat Level {level_number}.", 
+        map_template=map_template, 
+        unlocked_commands={"all"}, 
+        par_keystrokes=level_number * 2 + 10,
+        hint=hint,
+        boss_payload=boss_payload(level_number, seed)
+    )
+
+    if solve:
+        solve_sector_par(level)
+    return level
+
+def solve_sector_par(level: LevelConfig) -> bool:
+    """
+    Replaces a sector's formula par with the true optimum and returns whether it did.
+    The formula stays when the sector is too big to search or the search gives up.
+    """
+    from src.core.solver import solve_par
+    if sum(len(row) - row.count("#") for row in level.map_template) > SOLVE_CELL_LIMIT:
+        return False
+    solution = solve_par(level)
+    if solution is None:
+        return False
+    level.par_keystrokes = solution.strokes
+    return True
+
+class Curriculum(Sequence):
+    """
+    The 30-level curriculum as a lazy sequence.
+    Levels are built the first time they are indexed and memoized, so startup
+    pays for no procedural generation and replays see reproducible maps. When
+    `pack_file` holds a pack built with the same seed and size, levels are
+    read from it instead of generated. With `solve` False sectors are built
+    with the formula par and their index is kept in `unsolved`, so the par
+    search can run later, e.g. on a worker thread while the sector is played.
+    """
+    def __init__(self, seed: int = CURRICULUM_SEED, width: int = DUNGEON_WIDTH, height: int = DUNGEON_HEIGHT, pack_file: Optional[str] = PACK_FILE, solve: bool = True):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.built: Dict[int, LevelConfig] = {}
+        self.tutorial: Optional[List[LevelConfig]] = None
+        self.pack_file = pack_file
+        self.pack: Optional[LevelPack] = None # Read on first use; stays None if missing or built for other settings
+        self.pack_tried = False # Only ever tried once
+        self.solve = solve
+        self.unsolved: Set[int] = set() # Sectors still on the formula par
+
+    def __len__(self) -> int:
+        return TOTAL_LEVELS
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("level index out of range")
+
+        level = self.built.get(index)
+        if level is None:
+            level_number = index + 1
+            if self.pack_file and not self.pack_tried:
+                self._open_pack()
+            if self.pack is not None:
+                level = self.pack[index]
+            elif level_number <= 10:
+                if self.tutorial is None:
+                    self.tutorial = tutorial_levels()
+                level = self.tutorial[index]
+            else:
+                level = procedural_sector(level_number, self.seed, self.width, self.height, self.solve)
+                if not self.solve:
+                    self.unsolved.add(index)
+            self.built[index] = level
+        return level
+
+    def needs_build(self, index: int) -> bool:
+        """Whether indexing `index` would generate a sector, which takes seconds on big maps."""
+        return index not in self.built and index >= 10 and self.pack is None
+
+    def settle_par(self, index: int) -> bool:
+        """Runs the par search deferred for a sector; returns whether its par changed."""
+        if index not in self.unsolved:
+            return False
+        self.unsolved.discard(index)
+        return solve_sector_par(self.built[index])
+
+    def __getstate__(self) -> dict:
+        # The mmap cannot be pickled; the copy maps the pack file again
+        state = self.__dict__.copy()
+        state["pack"] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        if self.pack_tried and self.pack_file:
+            self._open_pack()
+
+    def _open_pack(self):
+        self.pack_tried = True
+        pack = read_pack(self.pack_file)
+        if pack is not None and len(pack) == TOTAL_LEVELS and pack.matches(self.seed, self.width, self.height):
+            self.pack = pack
+
+def gen_curriculum(seed: int = CURRICULUM_SEED) -> List[LevelConfig]:
+    """Generates the whole game curriculum consisting of 30 levels up front."""
+    return list(Curriculum(seed))
+
+LEVELS = Curriculum()
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Tuple, Dict, Optional, Set
+from typing import Any, List, Tuple, Dict, Optional, Set
 from enum import Enum, auto
 
 class GameMode(Enum):
@@ -25,20 +25,36 @@ class EntityType(Enum):
 @dataclass(frozen=True)
 class Point:
     """A point on the 2D game grid."""
+    __slots__ = ("x", "y") # No per-instance dict; dataclass(slots=True) needs Python 3.10
     x: int
     y: int
 
-@dataclass
+    def __reduce__(self):
+        # Frozen slotted instances cannot be restored attribute by attribute
+        return (Point, (self.x, self.y))
+
 class Entity:
-    """A game entity with a name, symbol, and position."""
-    name: str
-    symbol: str
-    position: Point
-    hp: int = 1
-    max_hp: int = 1
-    entity_type: EntityType = EntityType.ENEMY
-    aura: bool = False # New: For Vim Aura
-    metadata: Dict = field(default_factory=dict) # e.g. {"reg": "a"} for locks/keys
+    """
+    A game entity with a name, symbol, and position.
+    Slotted rather than a dataclass so thousands of them stay small; `id` is
+    assigned by the engine when the entity is placed, and entities compare by identity.
+    """
+    __slots__ = ("id", "name", "symbol", "position", "hp", "max_hp", "entity_type", "aura", "metadata")
+
+    def __init__(self, name: str, symbol: str, position: Point, hp: int = 1, max_hp: int = 1,
+                 entity_type: EntityType = EntityType.ENEMY, aura: bool = False, metadata: Optional[Dict] = None):
+        self.id = -1
+        self.name = name
+        self.symbol = symbol
+        self.position = position
+        self.hp = hp
+        self.max_hp = max_hp
+        self.entity_type = entity_type
+        self.aura = aura # For Vim Aura
+        self.metadata = metadata if metadata is not None else {} # e.g. {"reg": "a"} for locks/keys
+
+    def __repr__(self) -> str:
+        return f"Entity(id={self.id}, name={self.name!r}, symbol={self.symbol!r}, position={self.position!r}, hp={self.hp})"
 
 @dataclass
 class LevelConfig:
@@ -53,10 +69,12 @@ class LevelConfig:
     narrative_intro: Optional[str] = None # Cyberpunk narrative
     hint: str = "" # Short contextual hint
     detailed_help: str = "" # Full tutorial text (triggered by ?)
-@dataclass
+    boss_payload: str = "" # Corruption string bosses carry for regex combat; empty uses the default
+@dataclass(eq=False)
 class Effect:
     """A temporary visual effect on the map (particles)."""
     position: Point
     char: str
     color: str
-    lifespan: int # Number of turns before it disappears
+    lifespan: int # Clock ticks before it disappears
+    expiry: Any = None # The scheduler timer that removes it
@@ -34,3 +34,6 @@ MILESTONE_30 = r"""
 [#c0caf5]You have become a Vim Master.[/]
 [#c0caf5]The world is truly yours...[/]
 """
+
+# Milestones by curriculum index, shown as the sector loads; the next key only dismisses them
+MILESTONES = {0: MILESTONE_1, 9: MILESTONE_10, 29: MILESTONE_30}
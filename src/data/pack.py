@@ -0,0 +1,206 @@
+"""
+Level packs: levels serialized with their par already solved, so the game
+loads them instead of generating and solving them.
+
+A pack is a binary file read through mmap. A fixed header and an index of
+(offset, length) entries come first, so opening a pack of any size reads a
+few bytes and `pack[i]` decodes one record. Layout, little-endian:
+
+    header   magic "VLPK", version u16, flags u16, level count u32,
+             seed i64 (NO_SEED unless it is a generated curriculum),
+             sector width u16, sector height u16
+    index    one (offset u64, length u32) per level
+    records  num i32, par i32, width u16, height u16, tile bytes u32,
+             the map rows joined by newlines and raw-deflated, then each
+             of STRING_FIELDS as a u32 byte length and UTF-8 text
+             (NULL_STRING marks None)
+
+The shipped pack holds the default curriculum. Rebuild it after changing the
+tutorial levels, the generator or the solver, or pack levels of your own
+from JSON (a list of LevelConfig fields, or an object with a "levels" list):
+
+    python -m src.data.pack
+    python -m src.data.pack --from community.json community.pack
+    python -m src.data.pack --info community.pack
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections.abc import Sequence
+from dataclasses import asdict
+from typing import Iterable, List, Optional
+
+from src.core.grid import check_tiles
+from src.data.models import LevelConfig
+
+PACK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "curriculum.pack")
+PACK_MAGIC = b"VLPK"
+PACK_VERSION = 2 # Bump when the layout changes; packs of another version are not opened
+NO_SEED = -1 # Header seed of packs that are not a generated curriculum
+
+HEADER = struct.Struct("<4sHHIqHH")
+INDEX_ENTRY = struct.Struct("<QI")
+LEVEL_HEAD = struct.Struct("<iiHHI")
+STRING_LENGTH = struct.Struct("<I")
+NULL_STRING = 0xFFFFFFFF
+
+# Text fields of a record, in file order; unlocked_commands is stored sorted and newline-joined
+STRING_FIELDS = ("name", "instructions", "objective", "narrative_intro", "hint", "detailed_help", "boss_payload", "unlocked_commands")
+
+def level_to_dict(level: LevelConfig) -> dict:
+    data = asdict(level)
+    data["unlocked_commands"] = sorted(level.unlocked_commands)
+    return data
+
+def level_from_dict(data: dict) -> LevelConfig:
+    return LevelConfig(**dict(data, unlocked_commands=set(data.get("unlocked_commands", ()))))
+
+def encode_level(level: LevelConfig) -> bytes:
+    """One level as a pack record. Raises ValueError for map tiles the game cannot store."""
+    try:
+        check_tiles(level.map_template)
+    except ValueError as error:
+        raise ValueError(f"level {level.num}: {error}") from None
+    tiles = zlib.compressobj(9, zlib.DEFLATED, -15)
+    packed = tiles.compress("\n".join(level.map_template).encode("utf-8")) + tiles.flush()
+    width = max((len(row) for row in level.map_template), default=0)
+    parts = [LEVEL_HEAD.pack(level.num, level.par_keystrokes, width, len(level.map_template), len(packed)), packed]
+    for name in STRING_FIELDS:
+        value = getattr(level, name)
+        if name == "unlocked_commands":
+            value = "\n".join(sorted(value))
+        if value is None:
+            parts.append(STRING_LENGTH.pack(NULL_STRING))
+        else:
+            text = value.encode("utf-8")
+            parts += [STRING_LENGTH.pack(len(text)), text]
+    return b"".join(parts)
+
+def decode_level(record: bytes) -> LevelConfig:
+    num, par, _, height, tile_bytes = LEVEL_HEAD.unpack_from(record)
+    position = LEVEL_HEAD.size + tile_bytes
+    rows = zlib.decompress(record[LEVEL_HEAD.size:position], -15).decode("utf-8")
+    values = {}
+    for name in STRING_FIELDS:
+        (length,) = STRING_LENGTH.unpack_from(record, position)
+        position += STRING_LENGTH.size
+        if length == NULL_STRING:
+            values[name] = None
+        else:
+            values[name] = record[position:position + length].decode("utf-8")
+            position += length
+    commands = values.pop("unlocked_commands")
+    map_template = rows.split("\n") if height else []
+    try:
+        check_tiles(map_template)
+    except ValueError as error:
+        raise ValueError(f"level {num}: {error}") from None
+    return LevelConfig(num=num, map_template=map_template, par_keystrokes=par,
+                       unlocked_commands=set(commands.split("\n")) if commands else set(), **values)
+
+class LevelPack(Sequence):
+    """
+    An open pack file. The file is memory-mapped and nothing is decoded up
+    front: indexing reads one index entry and decodes that level, so only
+    the pages of the levels actually played are ever read.
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as pack_file:
+            self.data = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.count, self.seed, self.width, self.height = HEADER.unpack_from(self.data)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {PACK_VERSION} level pack")
+        if len(self.data) < HEADER.size + self.count * INDEX_ENTRY.size:
+            self.data.close()
+            raise ValueError(f"{path} is truncated")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> LevelConfig:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("level index out of range")
+        offset, length = INDEX_ENTRY.unpack_from(self.data, HEADER.size + index * INDEX_ENTRY.size)
+        return decode_level(self.data[offset:offset + length])
+
+    def matches(self, seed: int, width: int, height: int) -> bool:
+        """Whether the pack holds exactly the curriculum these settings would generate."""
+        return (self.seed, self.width, self.height) == (seed, width, height)
+
+    def close(self):
+        self.data.close()
+
+def read_pack(path: str = PACK_FILE) -> Optional[LevelPack]:
+    """Opens a pack, or returns None if there is none or it is not a pack of this version."""
+    try:
+        return LevelPack(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+def write_pack(levels: Iterable[LevelConfig], seed: int = NO_SEED, width: int = 0, height: int = 0, path: str = PACK_FILE) -> int:
+    """Writes levels as a pack; `seed` and the sector size record which curriculum it is, if any. Returns the level count."""
+    records = [encode_level(level) for level in levels]
+    offset = HEADER.size + len(records) * INDEX_ENTRY.size
+    with open(path, "wb") as pack_file:
+        pack_file.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(records), seed, width, height))
+        for record in records:
+            pack_file.write(INDEX_ENTRY.pack(offset, len(record)))
+            offset += len(record)
+        for record in records:
+            pack_file.write(record)
+    return len(records)
+
+def read_levels_json(path: str) -> List[LevelConfig]:
+    """Levels from a JSON list of LevelConfig fields, or from an object holding one under "levels"."""
+    with open(path, encoding="utf-8") as levels_file:
+        raw = json.load(levels_file)
+    if isinstance(raw, dict):
+        raw = raw["levels"]
+    return [level_from_dict(data) for data in raw]
+
+def build_pack(path: str = PACK_FILE) -> int:
+    """Generates the default curriculum from scratch, par included, and writes it as the pack. Returns the level count."""
+    from src.data.levels import CURRICULUM_SEED, DUNGEON_HEIGHT, DUNGEON_WIDTH, Curriculum
+    levels = Curriculum(CURRICULUM_SEED, DUNGEON_WIDTH, DUNGEON_HEIGHT, pack_file=None)
+    return write_pack(levels, CURRICULUM_SEED, DUNGEON_WIDTH, DUNGEON_HEIGHT, path)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build, convert or inspect level packs.")
+    parser.add_argument("output", nargs="?", default=PACK_FILE, help="pack to write (or to inspect with --info)")
+    parser.add_argument("--from", dest="source", help="JSON levels to pack instead of the generated curriculum")
+    parser.add_argument("--info", action="store_true", help="print the header and first levels of the pack")
+    args = parser.parse_args(argv)
+
+    if args.info:
+        pack = read_pack(args.output)
+        if pack is None:
+            print(f"{args.output} is not a version {PACK_VERSION} level pack")
+            return 1
+        seed = "none" if pack.seed == NO_SEED else pack.seed
+        print(f"{args.output}: {len(pack)} levels, seed {seed}, sectors {pack.width}x{pack.height}, {os.path.getsize(args.output)} bytes")
+        for index in range(min(len(pack), 10)):
+            level = pack[index]
+            width = max((len(row) for row in level.map_template), default=0)
+            print(f"{level.num:>6}  {level.name:<24} par {level.par_keystrokes:>3}  {width}x{len(level.map_template)}")
+        return 0
+
+    if args.source:
+        try:
+            count = write_pack(read_levels_json(args.source), path=args.output)
+        except ValueError as error:
+            print(f"{args.source}: {error}")
+            return 1
+    else:
+        count = build_pack(args.output)
+    print(f"Wrote {count} levels to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,87 @@
 import random
-from typing import List, Tuple
+import string
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+# Registers whose key or lock glyph means something else to the engine ('b' is not loaded as a key; B, G and R are entities)
+KEY_REGISTERS = [char for char in string.ascii_lowercase if char not in "bgr"]
+
+# Tiles the player cannot walk through without destroying or unlocking them
+BLOCKING = set("#RGB") | set(string.ascii_uppercase)
+
+# Layouts tried before the scattered rubble and minions are dropped. A fixed
+# count rather than a time limit, so a seed yields the same map on any machine.
+MAX_ATTEMPTS = 200
+
+class FreeCells:
+    """The set of interior cells still available for placement, with O(1) random sampling and removal."""
+    def __init__(self, cells: List[Tuple[int, int]]):
+        self.cells = list(cells)
+        self.index: Dict[Tuple[int, int], int] = {cell: i for i, cell in enumerate(self.cells)}
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __contains__(self, cell: Tuple[int, int]) -> bool:
+        return cell in self.index
+
+    def discard(self, cell: Tuple[int, int]):
+        """Removes a cell by swapping it with the last one."""
+        i = self.index.pop(cell, None)
+        if i is None:
+            return
+        last = self.cells.pop()
+        if i < len(self.cells):
+            self.cells[i] = last
+            self.index[last] = i
+
+    def take(self, rng: random.Random) -> Tuple[int, int]:
+        """Removes and returns a random free cell."""
+        cell = self.cells[rng.randrange(len(self.cells))]
+        self.discard(cell)
+        return cell
 
 class DungeonGenerator:
     """Procedurally generates levels for the Vim Masterpiece game."""
-    
-    def __init__(self, width: int = 20, height: int = 10):
+
+    def __init__(self, width: int = 20, height: int = 10, seed: Optional[int] = None):
         self.width = width
         self.height = height
+        self.random = random.Random(seed)
+
+    def generate(self, difficulty: int, max_attempts: int = MAX_ATTEMPTS) -> List[str]:
+        """
+        Generates a random, solvable map based on difficulty level (11-30).
+        Unsolvable layouts are rejected and regenerated up to `max_attempts` times;
+        after that the scattered rubble and minions are dropped, which leaves a
+        layout that can always be solved.
+        Raises ValueError if the features cannot fit on the grid at all.
+        """
+        # Determine features based on difficulty
+        num_rubble = min(15, difficulty // 2)
+        num_enemies = min(10, difficulty // 3)
+        num_bosses = 1 if difficulty % 5 == 0 else 0 # Boss every 5 levels
+        needs_key_lock = difficulty % 3 == 0 # Puzzle every 3 levels
+
+        interior = (self.width - 2) * (self.height - 2)
+        required = 2 + num_rubble + num_enemies + num_bosses + (3 if needs_key_lock else 0)
+        if self.width < 4 or self.height < 3 or required > interior:
+            raise ValueError(f"A {self.width}x{self.height} map cannot hold the {required} tiles difficulty {difficulty} needs")
+
+        for _ in range(max_attempts):
+            grid = self._build(num_rubble, num_enemies, num_bosses, needs_key_lock)
+            if self.is_solvable(grid):
+                return ["".join(row) for row in grid]
 
-    def generate(self, difficulty: int) -> List[str]:
-        """Generates a random map based on difficulty level (11-30)."""
+        grid = self._build(0, 0, num_bosses, needs_key_lock)
+        if not self.is_solvable(grid):
+            raise ValueError(f"Could not generate a solvable {self.width}x{self.height} map for difficulty {difficulty}")
+        return ["".join(row) for row in grid]
+
+    def _build(self, num_rubble: int, num_enemies: int, num_bosses: int, needs_key_lock: bool) -> List[List[str]]:
         # Initialize with empty space
         grid = [["." for _ in range(self.width)] for _ in range(self.height)]
-        
+
         # Add perimeter walls
         for x in range(self.width):
             grid[0][x] = "#"
@@ -20,56 +89,116 @@ class DungeonGenerator:
         for y in range(self.height):
             grid[y][0] = "#"
             grid[y][self.width - 1] = "#"
-            
+
+        free = FreeCells([(x, y) for y in range(1, self.height - 1) for x in range(1, self.width - 1)])
+
         # Place player at top left
         grid[1][1] = "@"
-        
+        free.discard((1, 1))
+
         # Place exit at bottom right
         exit_x, exit_y = self.width - 2, self.height - 2
         grid[exit_y][exit_x] = ">"
+        free.discard((exit_x, exit_y))
 
-        # Determine features based on difficulty
-        num_rubble = min(15, difficulty // 2)
-        num_enemies = min(10, difficulty // 3)
-        num_bosses = 1 if difficulty % 5 == 0 else 0 # Boss every 5 levels
-        needs_key_lock = difficulty % 3 == 0 # Puzzle every 3 levels
+        if needs_key_lock:
+            # Pick a random register
+            reg_char = self.random.choice(KEY_REGISTERS)
+
+            # Seal the exit: the lock takes one open side, a wall the other
+            sides = [cell for cell in [(exit_x - 1, exit_y), (exit_x, exit_y - 1)] if cell in free]
+            if sides:
+                lock_cell = self.random.choice(sides)
+                grid[lock_cell[1]][lock_cell[0]] = reg_char.upper()
+                free.discard(lock_cell)
+                for x, y in sides:
+                    if (x, y) != lock_cell:
+                        grid[y][x] = "#"
+                        free.discard((x, y))
+
+            # Hide key somewhere random
+            self._scatter(grid, free, reg_char, 1)
 
         # Scatter rubble
-        self._scatter(grid, "R", num_rubble)
-        
+        self._scatter(grid, free, "R", num_rubble)
+
         # Scatter enemies
-        self._scatter(grid, "G", num_enemies)
-        
+        self._scatter(grid, free, "G", num_enemies)
+
         if num_bosses > 0:
-            self._scatter(grid, "B", num_bosses)
-            
-        if needs_key_lock:
-            # Pick a random register a-z
-            reg_char = chr(random.randint(97, 122))
-            key_char = reg_char
-            lock_char = reg_char.upper()
-            
-            # Place Lock somewhere blocking the exit (simplified to near exit)
-            if self._is_empty(grid, exit_x - 1, exit_y):
-                grid[exit_y][exit_x - 1] = lock_char
-            elif self._is_empty(grid, exit_x, exit_y - 1):
-                grid[exit_y - 1][exit_x] = lock_char
-                
-            # Hide key somewhere random
-            self._scatter(grid, key_char, 1)
+            self._scatter(grid, free, "B", num_bosses)
 
-        # Convert to list of strings
-        return ["".join(row) for row in grid]
+        return grid
+
+    def _scatter(self, grid: List[List[str]], free: FreeCells, char: str, count: int):
+        if count > len(free):
+            raise ValueError(f"Cannot place {count} '{char}' tiles on {len(free)} free cells")
+        for _ in range(count):
+            x, y = free.take(self.random)
+            grid[y][x] = char
+
+    def is_solvable(self, grid: List[List[str]]) -> bool:
+        """
+        Checks that the exit can be reached without destroying anything.
+        Locks only open once their key has been reached: the key must be within
+        yank range of the explored area, and the lock within put range of it.
+        Each round floods on from the locks it opened alone, so every cell is
+        visited once, and only key and lock cells are tested for range.
+        """
+        start = self._find(grid, "@")
+        exit_cell = self._find(grid, ">")
+        if start is None or exit_cell is None:
+            return False
+
+        keys: Dict[Tuple[int, int], str] = {} # Keys not yet in range
+        locks: Set[Tuple[int, int]] = set() # Locks not yet opened
+        for y, row in enumerate(grid):
+            for x, tile in enumerate(row):
+                if tile.isalpha():
+                    if tile in KEY_REGISTERS:
+                        keys[(x, y)] = tile
+                    elif tile.isupper():
+                        locks.add((x, y))
+
+        opened: Set[Tuple[int, int]] = set()
+        reached: Set[Tuple[int, int]] = set()
+        held: Set[str] = set()
+        self._flood(grid, [start], opened, reached)
+        while exit_cell not in reached:
+            for cell in [cell for cell in keys if self._in_reach(cell, reached)]:
+                held.add(keys.pop(cell))
+            unlocked = [(x, y) for x, y in locks if grid[y][x].lower() in held and self._in_reach((x, y), reached)]
+            if not unlocked:
+                return False
+            locks.difference_update(unlocked)
+            opened.update(unlocked)
+            self._flood(grid, unlocked, opened, reached)
+        return True
+
+    def _flood(self, grid: List[List[str]], sources: List[Tuple[int, int]], opened: Set[Tuple[int, int]], reached: Set[Tuple[int, int]]):
+        """Adds `sources` and everything walkable from them to `reached`."""
+        queue = deque(cell for cell in sources if cell not in reached)
+        reached.update(queue)
+        while queue:
+            x, y = queue.popleft()
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if (nx, ny) in reached or not (0 <= nx < self.width and 0 <= ny < self.height):
+                    continue
+                if grid[ny][nx] in BLOCKING and (nx, ny) not in opened:
+                    continue
+                reached.add((nx, ny))
+                queue.append((nx, ny))
+
+    @staticmethod
+    def _in_reach(cell: Tuple[int, int], reached: Set[Tuple[int, int]]) -> bool:
+        """Whether a cell is within one step, diagonals included, of the explored area (yank/put range)."""
+        x, y = cell
+        return any((x + dx, y + dy) in reached for dy in (-1, 0, 1) for dx in (-1, 0, 1))
 
-    def _is_empty(self, grid: List[List[str]], x: int, y: int) -> bool:
-        return 0 < x < self.width - 1 and 0 < y < self.height - 1 and grid[y][x] == "."
-
-    def _scatter(self, grid: List[List[str]], char: str, count: int):
-        placed = 0
-        while placed < count:
-            x = random.randint(1, self.width - 2)
-            y = random.randint(1, self.height - 2)
-            # Don't place on player or exit start positions
-            if (x, y) not in [(1,1), (self.width-2, self.height-2)] and grid[y][x] == ".":
-                grid[y][x] = char
-                placed += 1
+    @staticmethod
+    def _find(grid: List[List[str]], char: str) -> Optional[Tuple[int, int]]:
+        for y, row in enumerate(grid):
+            for x, cell in enumerate(row):
+                if cell == char:
+                    return (x, y)
+        return None
@@ -0,0 +1,140 @@
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+
+# Higher priority sounds win when several are merged into one playback
+SOUND_PRIORITY = {"key": 0, "hit": 1}
+
+# Windows system sounds used by the WAV backend when no file is configured
+WINDOWS_ALIASES = {"key": "SystemDefault", "hit": "SystemHand"}
+
+class AudioBackend(ABC):
+    """Plays a named sound. Backends are only ever called from the audio worker thread."""
+    @abstractmethod
+    def play(self, sound: str):
+        ...
+
+class NullBackend(AudioBackend):
+    """Discards every sound."""
+    def play(self, sound: str):
+        pass
+
+class BellBackend(AudioBackend):
+    """Rings the terminal bell."""
+    def __init__(self, ring: Optional[Callable[[], None]] = None):
+        self.ring = ring or self._write_bell
+
+    def play(self, sound: str):
+        self.ring()
+
+    @staticmethod
+    def _write_bell():
+        sys.__stdout__.write("\a")
+        sys.__stdout__.flush()
+
+class WavBackend(AudioBackend):
+    """Plays WAV files through winsound on Windows or the first available command-line player elsewhere."""
+    PLAYERS = [["aplay", "-q"], ["paplay"], ["afplay"]]
+
+    def __init__(self, sound_files: Dict[str, str]):
+        self.sound_files = sound_files
+        self.player = None
+        self.winsound = None
+        if sys.platform == "win32":
+            import winsound
+            self.winsound = winsound
+        else:
+            self.player = next((command for command in self.PLAYERS if shutil.which(command[0])), None)
+
+    def play(self, sound: str):
+        path = self.sound_files.get(sound)
+        if self.winsound:
+            if path and os.path.exists(path):
+                self.winsound.PlaySound(path, self.winsound.SND_FILENAME)
+            else:
+                self.winsound.PlaySound(WINDOWS_ALIASES.get(sound, "SystemDefault"), self.winsound.SND_ALIAS)
+        elif self.player and path and os.path.exists(path):
+            subprocess.run(self.player + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def create_backend(name: str, sound_files: Optional[Dict[str, str]] = None, ring: Optional[Callable[[], None]] = None) -> AudioBackend:
+    """Builds the backend configured by `sound_backend`; unknown names fall back to silence."""
+    if name == "bell":
+        return BellBackend(ring)
+    if name == "wav":
+        return WavBackend(sound_files or {})
+    return NullBackend()
+
+class AudioSystem:
+    """
+    Non-blocking sound playback.
+    `play` only enqueues; a daemon worker thread drains the queue, merging
+    sounds that piled up while the previous one played into the single most
+    important one, and dropping sounds that arrive faster than `min_interval`.
+    """
+    def __init__(self, backend: AudioBackend, min_interval: float = 0.05, max_pending: int = 16):
+        self.backend = backend
+        self.min_interval = min_interval
+        self.pending: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max_pending)
+        self.worker: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+        self.last_played = 0.0
+
+    @classmethod
+    def from_config(cls, config, ring: Optional[Callable[[], None]] = None) -> "AudioSystem":
+        """Creates the audio system described by the `sound_enabled` and `sound_backend` settings."""
+        if not config.get("sound_enabled"):
+            return cls(NullBackend())
+        return cls(create_backend(config.get("sound_backend"), config.get("sound_files"), ring))
+
+    def play(self, sound: str):
+        """Queues a sound without waiting on the backend. Drops it if the queue is full."""
+        if isinstance(self.backend, NullBackend) or self.stopped.is_set():
+            return
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._run, name="audio", daemon=True)
+            self.worker.start()
+        try:
+            self.pending.put_nowait(sound)
+        except queue.Full:
+            pass
+
+    def close(self):
+        """Stops the worker thread once it has finished the current sound."""
+        self.stopped.set()
+        if self.worker is not None:
+            try:
+                self.pending.put_nowait(None)
+            except queue.Full:
+                pass
+
+    def _run(self):
+        while not self.stopped.is_set():
+            sound = self.pending.get()
+            if sound is None:
+                return
+            # Merge everything that queued up behind this sound
+            while True:
+                try:
+                    queued = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if queued is None:
+                    return
+                if SOUND_PRIORITY.get(queued, 0) >= SOUND_PRIORITY.get(sound, 0):
+                    sound = queued
+
+            now = time.monotonic()
+            if now - self.last_played < self.min_interval and SOUND_PRIORITY.get(sound, 0) == 0:
+                continue
+            self.last_played = now
+            try:
+                self.backend.play(sound)
+            except Exception:
+                # A broken audio device must never take the game down
+                self.backend = NullBackend()
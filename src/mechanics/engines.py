@@ -1,36 +1,29 @@
-import json
-import os
-from typing import List, Dict, Optional
+import time
+from typing import Dict, Optional
 
-SCORE_FILE = "vimgame_scores.json"
+from src.mechanics.scores import LEGACY_SCORE_FILE, SCORE_DB, Attempt, ScoreStore
 
 class ScoringEngine:
-    """Manages player performance scores and ratings."""
-    def __init__(self):
+    """
+    Manages player performance scores and ratings.
+    Attempts are written by the ScoreStore worker; `best_scores` is kept in
+    memory so recording a clear never touches the disk on the caller's thread.
+    """
+    def __init__(self, path: str = SCORE_DB, legacy_file: Optional[str] = LEGACY_SCORE_FILE):
         self.keystrokes = 0
-        self.best_scores: Dict[str, int] = self.load_existing_scores()
+        self.store = ScoreStore(path, legacy_file)
+        self.best_scores: Dict[int, int] = self.store.bests()
 
-    def load_existing_scores(self) -> Dict[str, int]:
-        """Loads historical best scores from the local file."""
-        if os.path.exists(SCORE_FILE):
-            try:
-                with open(SCORE_FILE, "r") as score_file:
-                    return json.load(score_file)
-            except Exception as error:
-                print(f"Failed to load scores: {error}")
-                return {}
-        return {}
+    def record_attempt(self, level_num: int, strokes: int, seconds: float, par_keystrokes: int) -> str:
+        """Queues a cleared level for the score store and returns its rating."""
+        rank = self.get_rating(strokes, par_keystrokes)
+        self.store.record(Attempt(level_num, time.time(), strokes, seconds, rank))
+        if level_num not in self.best_scores or strokes < self.best_scores[level_num]:
+            self.best_scores[level_num] = strokes
+        return rank
 
-    def save_best(self, level_num: int, strokes: int):
-        """Updates the best score for a level if the current performance is better."""
-        level_id = str(level_num)
-        if level_id not in self.best_scores or strokes < self.best_scores[level_id]:
-            self.best_scores[level_id] = strokes
-            try:
-                with open(SCORE_FILE, "w") as score_file:
-                    json.dump(self.best_scores, score_file)
-            except Exception as error:
-                print(f"Failed to save best score: {error}")
+    def close(self):
+        self.store.close()
 
     def get_rating(self, current_strokes: int, par_keystrokes: int) -> str:
         """Returns a human-readable rating based on performance relative to par."""
@@ -0,0 +1,161 @@
+"""
+Regex combat: Vim-style :s and :%s substitutions applied to a boss's corruption payload.
+
+Patterns typed by the player use Python's re syntax and are compiled once
+through an LRU cache. Python's re cannot be interrupted, so every pattern is
+analysed before it runs: nested quantifiers and alternation under a quantifier
+(the exponential cases) are refused, and the remaining polynomial cost is
+bounded against the payload length, which is itself capped.
+"""
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+try:
+    from re import _parser as sre_parse # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# The payload a boss carries when its level does not define one
+DEFAULT_PAYLOAD = "CORRUPT:DATA:CORRUPT:CORRUPT:DATA:CORRUPT:CORRUPT"
+DAMAGE_PER_REPLACEMENT = 2
+MAX_PAYLOAD = 128 # A substitution may not grow a payload past this
+MAX_PATTERN = 64
+MAX_REGEX_STEPS = 2_000_000 # Worst-case backtracking steps allowed for one payload
+PATTERN_CACHE_SIZE = 128
+
+SYNTAX_HINT = "Invalid syntax. Use s/target/replace/g to initiate regex attack."
+
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, "POSSESSIVE_REPEAT", None)} - {None}
+_ATOMIC_GROUP = getattr(sre_parse, "ATOMIC_GROUP", None) # Python 3.11+
+
+class RegexError(ValueError):
+    """A substitution that cannot be run; the message is shown to the player."""
+
+class Substitution(NamedTuple):
+    pattern: str
+    replacement: str # Python template syntax (\1, \g<0>)
+    whole_map: bool # :%s rather than :s
+    replace_all: bool # g flag
+    ignore_case: bool # i flag
+
+    def apply(self, payload: str) -> Tuple[str, int]:
+        """Runs the substitution on a payload. Returns the new payload and how many matches changed."""
+        compiled, degree = compile_pattern(self.pattern, self.ignore_case)
+        if (len(payload) + 1) ** (degree + 1) > MAX_REGEX_STEPS:
+            raise RegexError("Pattern rejected: too many open-ended quantifiers for this payload.")
+
+        replaced = 0
+        def expand(match):
+            nonlocal replaced
+            text = match.expand(self.replacement)
+            if text != match.group(0):
+                replaced += 1
+            return text
+
+        try:
+            result = compiled.sub(expand, payload, count=0 if self.replace_all else 1)
+        except (re.error, IndexError) as error:
+            raise RegexError(f"Bad replacement: {error}")
+        if len(result) > MAX_PAYLOAD:
+            raise RegexError("Payload overflow: the replacement grows the payload too far.")
+        return result, replaced
+
+def parse_substitution(command: str) -> Substitution:
+    """Parses `s/pattern/replacement/flags` or `%s/...`. The delimiter may be any punctuation, as in Vim."""
+    whole_map = command.startswith("%")
+    body = command[1:] if whole_map else command
+    if len(body) < 2 or body[0] != "s" or body[1].isalnum() or body[1] in " \\":
+        raise RegexError(SYNTAX_HINT)
+
+    parts = _split(body[2:], body[1])
+    if len(parts) not in (2, 3) or not parts[0]:
+        raise RegexError(SYNTAX_HINT)
+    flags = parts[2] if len(parts) == 3 else ""
+    if set(flags) - set("gi"):
+        raise RegexError(f"Unknown flags '{flags}'. Supported: g (every match), i (ignore case).")
+    if len(parts[0]) > MAX_PATTERN:
+        raise RegexError(f"Pattern too long (max {MAX_PATTERN} characters).")
+    return Substitution(parts[0], _template(parts[1]), whole_map, "g" in flags, "i" in flags)
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern: str, ignore_case: bool = False) -> Tuple["re.Pattern", int]:
+    """
+    Compiles a player pattern once and measures its cost: the number of
+    open-ended quantifiers that can backtrack against each other. Matching then
+    takes at most about n ** (degree + 1) steps on a payload of length n.
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+        compiled = re.compile(pattern, flags)
+    except re.error as error:
+        raise RegexError(f"Regex error: {error}")
+    return compiled, _degree(parsed, False)
+
+def _degree(subpattern, under_repeat: bool) -> int:
+    degree = 0
+    for op, av in subpattern:
+        if op in _REPEATS:
+            low, high, item = av
+            if high > 1:
+                inner = _degree(item, True)
+                if inner:
+                    raise RegexError("Pattern rejected: nested quantifiers can backtrack forever.")
+                degree += high != low
+            else:
+                degree += _degree(item, under_repeat)
+        elif op == sre_parse.BRANCH:
+            if under_repeat:
+                raise RegexError("Pattern rejected: alternation inside a quantifier. Try a character class.")
+            degree += max(_degree(branch, under_repeat) for branch in av[1])
+        elif op == sre_parse.SUBPATTERN:
+            degree += _degree(av[-1], under_repeat)
+        elif _ATOMIC_GROUP is not None and op == _ATOMIC_GROUP:
+            degree += _degree(av, under_repeat)
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            degree += _degree(av[1], under_repeat)
+        elif op == sre_parse.GROUPREF_EXISTS:
+            degree += max(_degree(branch, under_repeat) for branch in av[1:] if branch)
+        elif op == sre_parse.GROUPREF and under_repeat:
+            raise RegexError("Pattern rejected: backreference inside a quantifier.")
+    return degree
+
+def _split(text: str, delimiter: str) -> List[str]:
+    """Splits on unescaped delimiters; an escaped delimiter becomes the plain character."""
+    parts = [""]
+    i = 0
+    while i < len(text):
+        if text[i] == "\\" and i + 1 < len(text) and text[i + 1] == delimiter:
+            parts[-1] += delimiter
+            i += 2
+            continue
+        if text[i] == delimiter:
+            parts.append("")
+        else:
+            parts[-1] += text[i]
+        i += 1
+    return parts
+
+def _template(replacement: str) -> str:
+    """Converts a Vim replacement to a Python template: & is the whole match, \\& a literal &."""
+    result = ""
+    i = 0
+    while i < len(replacement):
+        if replacement.startswith("\\&", i):
+            result += "&"
+            i += 2
+        elif replacement[i] == "&":
+            result += "\\g<0>"
+            i += 1
+        elif replacement[i] == "\\" and i + 1 < len(replacement):
+            result += replacement[i:i + 2]
+            i += 2
+        else:
+            result += replacement[i]
+            i += 1
+    return result
+
+def escape_markup(text: str) -> str:
+    """Escapes player-typed text for the message log, which renders Rich markup."""
+    return text.replace("[", "\\[")
@@ -0,0 +1,156 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+SCORE_DB = "vimgame_scores.db"
+LEGACY_SCORE_FILE = "vimgame_scores.json" # Best-per-level file written by older versions
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    level INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    keystrokes INTEGER NOT NULL,
+    seconds REAL,
+    rank TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_best ON attempts (level, keystrokes);
+CREATE INDEX IF NOT EXISTS attempts_history ON attempts (level, recorded_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+class Attempt(NamedTuple):
+    level: int
+    recorded_at: float # Unix time
+    keystrokes: int
+    seconds: Optional[float] # None for attempts migrated from the legacy file
+    rank: Optional[str]
+
+class ScoreStore:
+    """
+    Every cleared level, kept in SQLite in WAL mode.
+    `record` only enqueues; a daemon worker owns the write connection and
+    commits whatever queued up in one transaction, so callers never wait on
+    disk. Queries open their own connection per thread, which WAL lets read
+    alongside the writer; they see attempts once the worker has committed them.
+    """
+    def __init__(self, path: str = SCORE_DB, legacy_file: Optional[str] = LEGACY_SCORE_FILE):
+        self.path = path
+        self.pending: "queue.Queue[Optional[Attempt]]" = queue.Queue()
+        self.local = threading.local()
+        self.closed = False
+        # Create the schema and migrate up front so the first query never races the worker
+        connection = self._connect()
+        with connection:
+            connection.executescript(SCHEMA)
+            if legacy_file:
+                self._migrate(connection, legacy_file)
+        connection.close()
+        self.worker = threading.Thread(target=self._run, name="scores", daemon=True)
+        self.worker.start()
+
+    def record(self, attempt: Attempt):
+        """Queues an attempt for the worker to write."""
+        if not self.closed:
+            self.pending.put(attempt)
+
+    def flush(self):
+        """Blocks until every queued attempt is committed. Meant for shutdown and tests."""
+        self.pending.join()
+
+    def close(self):
+        """Writes what is still queued, then stops the worker."""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(None)
+        self.worker.join()
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    def bests(self) -> Dict[int, int]:
+        """The fewest keystrokes per level."""
+        rows = self._reader().execute("SELECT level, MIN(keystrokes) FROM attempts GROUP BY level")
+        return dict(rows.fetchall())
+
+    def best(self, level: int) -> Optional[Attempt]:
+        """The attempt with the fewest keystrokes on a level (the earliest one on ties)."""
+        row = self._reader().execute(
+            "SELECT level, recorded_at, keystrokes, seconds, rank FROM attempts "
+            "WHERE level = ? ORDER BY keystrokes, recorded_at LIMIT 1", (level,)
+        ).fetchone()
+        return Attempt(*row) if row else None
+
+    def history(self, level: int, limit: int = 20) -> List[Attempt]:
+        """A level's most recent attempts, newest first."""
+        rows = self._reader().execute(
+            "SELECT level, recorded_at, keystrokes, seconds, rank FROM attempts "
+            "WHERE level = ? ORDER BY recorded_at DESC, id DESC LIMIT ?", (level, limit)
+        )
+        return [Attempt(*row) for row in rows]
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps commits atomic; NORMAL only risks the last commits on power loss, never corruption
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = self._connect()
+        return connection
+
+    def _migrate(self, connection: sqlite3.Connection, legacy_file: str):
+        """Imports the legacy best-per-level file once; the file itself is left untouched."""
+        if connection.execute("SELECT 1 FROM meta WHERE key = 'legacy_migrated'").fetchone():
+            return
+        if os.path.exists(legacy_file):
+            try:
+                with open(legacy_file, "r") as score_file:
+                    best_scores = json.load(score_file)
+                recorded_at = os.path.getmtime(legacy_file)
+                connection.executemany(
+                    "INSERT INTO attempts (level, recorded_at, keystrokes) VALUES (?, ?, ?)",
+                    [(int(level), recorded_at, int(strokes)) for level, strokes in best_scores.items()]
+                )
+            except (OSError, ValueError, AttributeError) as error:
+                print(f"Failed to migrate scores: {error}")
+                return
+        connection.execute("INSERT INTO meta (key, value) VALUES ('legacy_migrated', ?)", (str(time.time()),))
+
+    def _run(self):
+        connection = self._connect()
+        try:
+            while True:
+                attempt = self.pending.get()
+                batch = [attempt]
+                # Commit everything that queued up behind this attempt together
+                while attempt is not None:
+                    try:
+                        attempt = self.pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(attempt)
+                attempts = [queued for queued in batch if queued is not None]
+                try:
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO attempts (level, recorded_at, keystrokes, seconds, rank) VALUES (?, ?, ?, ?, ?)",
+                            attempts
+                        )
+                except sqlite3.Error as error:
+                    print(f"Failed to save scores: {error}")
+                for _ in batch:
+                    self.pending.task_done()
+                if len(attempts) < len(batch):
+                    return
+        finally:
+            connection.close()
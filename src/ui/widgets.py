@@ -1,52 +1,175 @@
+from textual.widget import Widget
 from textual.widgets import Static, Label, Header, Footer
+from textual.geometry import Region
+from textual.strip import Strip
+from rich.markup import escape
+from rich.segment import Segment
+from rich.style import Style
 from textual.containers import Container, Vertical, Horizontal
 from textual.app import ComposeResult
-from typing import List, Optional, Dict
+from textual.message import Message
+from typing import List, Optional, Dict, Set, Tuple
 from src.data.models import Point, GameMode
 
-class VimMap(Static):
-    """Luxury map renderer with character-specific styling and Aura support."""
-    def render_map(self, map_data: List[List[str]], player_position: Point, aura_active: bool, mode: GameMode, visual_anchor: Optional[Point] = None):
-        """Renders the game map with colors and player positioning, including Visual selection."""
-        rows = []
-        
-        min_x, max_x, min_y, max_y = -1, -1, -1, -1
+REGISTER_PREVIEW = 16 # Characters of a register (e.g. a recorded macro) shown in the stats panel
+
+SELECTION_STYLE = Style.parse("on #3b4261")
+PLAYER_STYLE = Style.parse("bold #7aa2f7")
+PLAYER_AURA_STYLE = PLAYER_STYLE + Style.parse("on #2ac3de")
+PLAYER_AURA_PULSE_STYLE = PLAYER_STYLE + Style.parse("on #7dcfff") # The aura's other pulse phase
+TILE_STYLES = {
+    "enemy": Style.parse("bold #f7768e"),
+    "boss": Style.parse("bold italic #f7768e on #1f2335"),
+    "exit": Style.parse("bold #9ece6a"),
+    "rubble": Style.parse("#565f89"),
+    "key": Style.parse("bold #e0af68"),
+    "lock": Style.parse("bold #bb9af7"),
+    "floor": Style.parse("#1a1b26"),
+}
+SELECTED_TILE_STYLES = {kind: SELECTION_STYLE + style for kind, style in TILE_STYLES.items()}
+SELECTED_TILE_STYLES["floor"] = SELECTION_STYLE + Style.parse("#c0caf5")
+
+class VimMap(Widget):
+    """
+    Luxury map renderer with character-specific styling and Aura support.
+    Built on the line API: each map row becomes a Strip of run-length merged
+    Segments using pre-built styles, and rows are only built when Textual asks for them.
+    `map_data` is the camera's window onto the map; `origin` is its top-left map cell.
+    """
+    class Resized(Message):
+        """Posted when the widget's size changes, so the camera can be resized."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.map_data: List[List[str]] = []
+        self.player_position = Point(0, 0)
+        self.aura_active = False
+        self.aura_phase = False # Flipped by pulse() to make the aura glow
+        self.selection: Optional[Tuple[int, int, int, int]] = None # min_x, max_x, min_y, max_y
+        self.strip_cache: Dict[int, Strip] = {}
+        self.map_width = 0 # Nominal cell width of the widest row, used for centering
+        self.glyphs: Dict[Tuple[str, bool], Tuple[str, Style]] = {}
+
+    def render_map(self, map_data: List[List[str]], player_position: Point, aura_active: bool, mode: GameMode, visual_anchor: Optional[Point] = None, dirty_rows: Optional[Set[int]] = None, origin: Point = Point(0, 0)):
+        """
+        Updates the map, player and Visual selection shown by the widget.
+        Positions are in map cells and are shifted by `origin` into the window.
+        When `dirty_rows` is given only those window lines are invalidated and
+        repainted; None means the whole window changed.
+        """
+        self.map_data = map_data
+        self.player_position = Point(player_position.x - origin.x, player_position.y - origin.y)
+        self.aura_active = aura_active
+        self.selection = None
         if mode == GameMode.VISUAL and visual_anchor:
-            min_x = min(player_position.x, visual_anchor.x)
-            max_x = max(player_position.x, visual_anchor.x)
-            min_y = min(player_position.y, visual_anchor.y)
-            max_y = max(player_position.y, visual_anchor.y)
-
-        for row_index, row in enumerate(map_data):
-            row_str = ""
-            for col_index, char in enumerate(row):
-                is_player = (col_index == player_position.x and row_index == player_position.y)
-                is_selected = mode == GameMode.VISUAL and min_x <= col_index <= max_x and min_y <= row_index <= max_y
-                
-                # Base styling
-                style_prefix = "on #3b4261 " if is_selected else ""
-                
-                if is_player:
-                    style = f"bold #7aa2f7 {style_prefix}on #2ac3de" if aura_active else f"bold #7aa2f7 {style_prefix}"
-                    row_str += f"[{style}]@[/]"
-                elif char == "G": row_str += f"[{style_prefix}bold #f7768e]G[/]"
-                elif char == "B": row_str += f"[{style_prefix}bold italic #f7768e on #1f2335]B[/]" # Boss
-                elif char == ">": row_str += f"[{style_prefix}bold #9ece6a]>[/]"
-                elif char == "R": row_str += f"[{style_prefix}#565f89]R[/]"
-                elif char.islower(): row_str += f"[{style_prefix}bold #e0af68]{char}[/]" # Key
-                elif char.isupper(): row_str += f"[{style_prefix}bold #bb9af7]{char}[/]" # Lock
-                else: 
-                    if is_selected: row_str += f"[{style_prefix}#c0caf5]. [/]"
-                    else: row_str += "[#1a1b26]. [/]"
-            rows.append(row_str)
-        self.update("\n".join(rows))
+            self.selection = (
+                min(player_position.x, visual_anchor.x) - origin.x,
+                max(player_position.x, visual_anchor.x) - origin.x,
+                min(player_position.y, visual_anchor.y) - origin.y,
+                max(player_position.y, visual_anchor.y) - origin.y
+            )
+
+        if dirty_rows is None:
+            self.strip_cache.clear()
+            self.map_width = max((len(row) * 2 for row in map_data), default=0)
+            self.refresh()
+        elif dirty_rows:
+            top = self.top_offset()
+            for row_index in dirty_rows:
+                self.strip_cache.pop(row_index, None)
+                self.refresh(Region(0, top + row_index, self.size.width, 1))
+
+    def viewport_size(self) -> Tuple[int, int]:
+        """How many map cells fit in the widget; floor tiles are two columns wide."""
+        return self.size.width // 2, self.size.height
+
+    def on_resize(self, event):
+        self.post_message(self.Resized())
+
+    def top_offset(self) -> int:
+        return max(0, (self.size.height - len(self.map_data)) // 2)
+
+    def render_line(self, y: int) -> Strip:
+        """Renders one line of the widget, centering the map in the available space."""
+        width = self.size.width
+        row_index = y - self.top_offset()
+        if not 0 <= row_index < len(self.map_data):
+            return Strip.blank(width, self.rich_style)
+        strip = self.row_strip(row_index)
+        left = max(0, (width - self.map_width) // 2)
+        if left:
+            strip = Strip([Segment(" " * left, self.rich_style), *strip], left + strip.cell_length)
+        return strip.adjust_cell_length(width, self.rich_style)
+
+    def row_strip(self, row_index: int) -> Strip:
+        """Returns the cached Strip for a map row, building it on first use."""
+        strip = self.strip_cache.get(row_index)
+        if strip is None:
+            strip = self.strip_cache[row_index] = self.build_row(row_index)
+        return strip
+
+    def build_row(self, row_index: int) -> Strip:
+        """Builds a map row, merging neighbouring cells that share a style into one Segment."""
+        min_x, max_x, min_y, max_y = self.selection or (-1, -1, -1, -1)
+        row_selected = self.selection is not None and min_y <= row_index <= max_y
+        player_x = self.player_position.x if row_index == self.player_position.y else -1
+        glyphs = self.glyphs
+
+        segments = []
+        run_text: List[str] = []
+        run_style = None
+        cell_length = 0
+        for col_index, char in enumerate(self.map_data[row_index]):
+            is_selected = row_selected and min_x <= col_index <= max_x
+            if col_index == player_x:
+                text, style = "@", self.player_style(is_selected)
+            else:
+                glyph = glyphs.get((char, is_selected))
+                if glyph is None:
+                    glyph = glyphs[(char, is_selected)] = self.classify(char, is_selected)
+                text, style = glyph
+            cell_length += len(text)
+            if style is run_style:
+                run_text.append(text)
+            else:
+                if run_text:
+                    segments.append(Segment("".join(run_text), run_style))
+                run_text = [text]
+                run_style = style
+        if run_text:
+            segments.append(Segment("".join(run_text), run_style))
+        return Strip(segments, cell_length)
+
+    def pulse(self):
+        """Advances the aura glow; only the player's line is repainted, and only while the aura is on."""
+        self.aura_phase = not self.aura_phase
+        if self.aura_active and 0 <= self.player_position.y < len(self.map_data):
+            self.strip_cache.pop(self.player_position.y, None)
+            self.refresh(Region(0, self.top_offset() + self.player_position.y, self.size.width, 1))
+
+    def player_style(self, is_selected: bool) -> Style:
+        if self.aura_active:
+            return PLAYER_AURA_PULSE_STYLE if self.aura_phase else PLAYER_AURA_STYLE
+        return PLAYER_STYLE + SELECTION_STYLE if is_selected else PLAYER_STYLE
+
+    @staticmethod
+    def classify(char: str, is_selected: bool) -> Tuple[str, Style]:
+        """Maps a map character to the text and style it is drawn with."""
+        if char == "G": kind = "enemy"
+        elif char == "B": kind = "boss"
+        elif char == ">": kind = "exit"
+        elif char == "R": kind = "rubble"
+        elif char.islower(): kind = "key"
+        elif char.isupper(): kind = "lock"
+        else:
+            kind, char = "floor", ". "
+        return char, (SELECTED_TILE_STYLES[kind] if is_selected else TILE_STYLES[kind])
 
 
 class SoundBubble(Static):
-    """Temporary ASCII 'sound' effect for keypresses."""
+    """Temporary ASCII 'sound' effect for keypresses; the app's clock clears it."""
     def display(self, text: str):
         self.update(f"[bold #414868]<{text}>[/]")
-        self.set_timer(0.3, self.clear)
 
     def clear(self):
         self.update("")
@@ -72,14 +195,22 @@ class NarrativeOverlay(Static):
 
 class StatsDisplay(Static):
     """Displays player statistics and register contents."""
+    last_inputs = None
+
     def update_stats(self, level_num: int, hit_points: int, strokes: int, par_keystrokes: int, game_mode: str, registers: Dict[str, str]):
-        """Updates the visual statistics display."""
+        """Updates the visual statistics display, skipping the redraw when nothing changed."""
+        inputs = (level_num, hit_points, strokes, par_keystrokes, game_mode, tuple(registers.items()))
+        if inputs == self.last_inputs:
+            return
+        self.last_inputs = inputs
         content = f"[bold #7aa2f7]LEVEL {level_num}[/]\n"
         content += f"[#c0caf5]HP:[/] [bold #f7768e]{hit_points}[/]\n"
         content += f"[#c0caf5]MODE:[/] [bold #9ece6a]{game_mode}[/]\n\n"
         content += f"[bold #bb9af7]REGISTERS[/]\n"
         for key, value in registers.items():
-            content += f"[#565f89]\"{key}:[/] {value}\n"
+            if len(value) > REGISTER_PREVIEW:
+                value = value[:REGISTER_PREVIEW - 1] + "…"
+            content += f"[#565f89]\"{key}:[/] {escape(value)}\n"
         content += f"\n[bold #bb9af7]VIM GOLF[/]\n"
         content += f"[#c0caf5]STROKES:[/] {strokes}\n"
         content += f"[#c0caf5]PAR:[/] {par_keystrokes}"
@@ -96,7 +227,12 @@ class HelpPanel(Static):
         color: #e0af68;
     }
     """
+    last_hint = None
+
     def update_hint(self, hint: str):
+        if hint == self.last_hint:
+            return
+        self.last_hint = hint
         self.update(f"[bold #e0af68]HINT:[/]\n{hint}\n\n[#565f89]Press '?' for detail[/]")
 
 class HelpOverlay(Static):
@@ -119,6 +255,33 @@ class HelpOverlay(Static):
     def hide(self):
         self.styles.display = "none"
 
+class PerfOverlay(Static):
+    """Live latency table fed by the Profiler: rolling percentiles per timing span."""
+    DEFAULT_CSS = """
+    PerfOverlay {
+        dock: top;
+        width: auto;
+        height: auto;
+        offset-x: 1;
+        padding: 0 1;
+        background: #16161e 90%;
+        border: round #414868;
+        layer: top;
+        display: none;
+    }
+    """
+    def show_summary(self, rows: List[tuple]):
+        """Renders (name, calls, p50, p95, p99) rows, times in milliseconds."""
+        content = f"[bold #7aa2f7]{'span':<16} {'calls':>6} {'p50':>7} {'p95':>7} {'p99':>7}[/]\n"
+        for name, calls, p50, p95, p99 in rows:
+            color = "#f7768e" if p95 > 16 else "#e0af68" if p95 > 4 else "#9ece6a"
+            content += f"{escape(name):<16} {calls:>6} {p50:>7.2f} [{color}]{p95:>7.2f}[/] {p99:>7.2f}\n"
+        self.update(content.rstrip("\n") if rows else "[#565f89]No samples yet[/]")
+        self.styles.display = "block"
+
+    def hide(self):
+        self.styles.display = "none"
+
 class CommandBar(Label):
     """A sleek command bar that mimics the Vim command line."""
     pass
@@ -10,7 +10,7 @@ from src.data.models import LevelConfig, GameMode, Point
 
 def test_engine():
     print("Testing Procedural Generation...")
-    generator = DungeonGenerator(width=15, height=10)
+    generator = DungeonGenerator(width=15, height=10, seed=1)
     map_template = generator.generate(difficulty=15)
     
     assert len(map_template) == 10
@@ -41,12 +41,13 @@ def test_engine():
 
     print("Testing Visual Mode Deletion...")
     # Clear existing procgen enemies for a clean test
-    engine.enemies.clear()
+    for existing in list(engine.enemies):
+        engine.remove_entity(existing)
     
     # Add a fake enemy right next to player
     from src.data.models import Entity, EntityType
     enemy = Entity("TestEnemy", "G", Point(start_pos.x + 1, start_pos.y), 5, 5, EntityType.ENEMY)
-    engine.enemies.append(enemy)
+    engine.add_entity(enemy)
     
     engine.mode = GameMode.VISUAL
     engine.set_visual_anchor()
@@ -64,5 +65,796 @@ def test_engine():
 
     print("ALL TESTS PASSED SUCCESSFULLY!")
 
+def test_spatial_index():
+    print("Testing Spatial Index...")
+    engine = GameEngine()
+    engine.load_level(LevelConfig(1, "Index", "Test", ["#@.a.A.>#", "#..G....#"]))
+    key = engine.get_entity_at(Point(3, 0))
+    assert key is not None and key.symbol == "a"
+    assert engine.get_entity_at(Point(2, 0)) is None
+    assert [e.symbol for e in engine.spatial.in_rect(0, 0, 8, 1)].count("G") == 1
+
+    engine.player.position = Point(2, 0)
+    engine.handle_yank({"reg": "a"})
+    assert engine.get_entity_at(Point(3, 0)) is None
+    assert len(engine.spatial) == len(engine.enemies) + len(engine.interactables)
+    print("Spatial Index passed.")
+
+def test_undo_journal():
+    print("Testing Undo Journal...")
+    engine = GameEngine()
+    engine.load_level(LevelConfig(1, "Journal", "Test", ["#@a.G..>#"]))
+
+    engine.save_state()
+    engine.handle_yank({"reg": "a"})
+    engine.save_state()
+    engine.move_player(1, 0, 5)
+    engine.mode = GameMode.VISUAL
+    engine.set_visual_anchor()
+    engine.player.position = Point(5, 0)
+    engine.save_state()
+    engine.handle_delete()
+    assert not engine.enemies and engine.registers == {"a": "a"}
+
+    engine.undo()
+    assert [e.symbol for e in engine.enemies] == ["G"]
+    assert engine.get_entity_at(Point(4, 0)) is engine.enemies[0]
+    engine.undo()
+    assert engine.player.position == Point(1, 0)
+    engine.undo()
+    assert engine.registers == {}
+    assert engine.get_entity_at(Point(2, 0)).symbol == "a"
+    engine.undo()
+    assert engine.messages[-1] == "Already at oldest change."
+    print("Undo Journal passed.")
+
+def test_incremental_render():
+    print("Testing Incremental Render...")
+    engine = GameEngine()
+    engine.load_level(LevelConfig(1, "Render", "Test", ["#@.a.#", "#.G..#", "#...>#"]))
+    assert engine.get_render_data()[0][1] == "@"
+    assert engine.render_dirty_rows is None
+
+    engine.move_player(0, 1, 1)
+    engine.move_player(1, 0, 3) # blocked by G
+    frame = [row[:] for row in engine.get_render_data()]
+    assert engine.render_dirty_rows == {0, 1}
+
+    engine.mode = GameMode.VISUAL
+    engine.set_visual_anchor()
+    engine.player.position = Point(3, 2)
+    engine.handle_delete()
+    engine.get_render_data()
+    engine.get_render_data()
+    frame = [row[:] for row in engine.get_render_data()]
+
+    engine.mark_all_dirty()
+    assert engine.get_render_data() == frame
+    assert "G" not in "".join(frame[1])
+    print("Incremental Render passed.")
+
+def run_in_app(scenario):
+    """Runs `scenario(app, pilot)` against a headless VimMasterpiece, keeping its score file out of the tree."""
+    import asyncio
+    import tempfile
+    from src.app import VimMasterpiece
+
+    async def main():
+        app = VimMasterpiece()
+        async with app.run_test(size=(120, 40)) as pilot:
+            await pilot.pause()
+            await scenario(app, pilot)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            asyncio.run(main())
+        finally:
+            os.chdir(cwd)
+
+def test_row_strip_cache():
+    print("Testing Row Strip Cache...")
+    from src.ui.widgets import VimMap
+
+    async def scenario(app, pilot):
+        vim_map = app.query_one("#map")
+        built = []
+        build_row = vim_map.build_row
+        vim_map.build_row = lambda row_index: built.append(row_index) or build_row(row_index)
+
+        def row_text(row_index):
+            return "".join(segment.text for segment in vim_map.row_strip(row_index))
+
+        def expected(row):
+            return "".join("@" if char == "@" else VimMap.classify(char, False)[0] for char in row)
+
+        await pilot.press("space") # Dismiss the intro
+        app.engine.load_level(LevelConfig(99, "Strips", "", ["#########", "#@..a...#", "#.G...A.#", "#......>#", "#########"]))
+        app.update_ui()
+        await pilot.pause(0.1)
+        frame = app.engine.get_render_data()
+        assert [row_text(y) for y in range(len(frame))] == [expected(row) for row in frame]
+
+        # A step along a row rebuilds that row alone; every other row comes from the cache
+        built.clear()
+        row = app.engine.player.position.y - app.engine.render_window[1]
+        await pilot.press("l")
+        await pilot.pause(0.1)
+        frame = app.engine.get_render_data()
+        assert [row_text(y) for y in range(len(frame))] == [expected(row) for row in frame]
+        assert set(built) == {row}
+
+    run_in_app(scenario)
+    print("Row Strip Cache passed.")
+
+def test_frame_coalescing():
+    print("Testing Frame Coalescing...")
+
+    async def scenario(app, pilot):
+        flushes = []
+        flush_ui = app.flush_ui
+        app.flush_ui = lambda: flushes.append(set(app.dirty_parts)) or flush_ui()
+        await pilot.press("space") # Dismiss the intro
+        await pilot.pause(0.1)
+
+        # However many updates land inside one frame interval, they are drawn together
+        flushes.clear()
+        for _ in range(50):
+            app.update_ui("map")
+        app.update_ui("stats")
+        app.update_ui("log", "map")
+        await pilot.pause(app.FRAME_INTERVAL * 3)
+        assert flushes == [{"map", "stats", "log"}] and not app.frame_pending
+
+        # A later update schedules one more frame with only what it marked
+        app.update_ui("stats")
+        assert app.frame_pending and len(flushes) == 1
+        await pilot.pause(app.FRAME_INTERVAL * 3)
+        assert flushes[1:] == [{"stats"}]
+
+    run_in_app(scenario)
+    print("Frame Coalescing passed.")
+
+def test_background_sector():
+    print("Testing Background Sector...")
+    from src.data.levels import Curriculum
+
+    async def scenario(app, pilot):
+        await pilot.press("space") # Dismiss the intro
+        app.levels = Curriculum(width=40, height=20, solve=False)
+        app.engine.current_level_index = 10
+
+        # The sector is generated in a worker; until it is in, the old one stays loaded and keys are ignored
+        app.load_level()
+        assert app.loading and app.engine.current_level.num == 1
+        for _ in range(100):
+            if not app.loading and not app.levels.unsolved and not app.workers:
+                break
+            await pilot.pause(0.05)
+        level = app.engine.current_level
+        assert level.num == 11 and app.engine.width == 40 and app.engine.keystroke_count == 0
+        # Then its par is searched while it is played
+        assert level.par_keystrokes < 11 * 2 + 10
+
+    run_in_app(scenario)
+    print("Background Sector passed.")
+
+def test_audio_is_non_blocking():
+    print("Testing Audio System...")
+    import time
+    from src.mechanics.audio import AudioBackend, AudioSystem, create_backend, NullBackend
+
+    class SlowBackend(AudioBackend):
+        def __init__(self):
+            self.played = []
+        def play(self, sound):
+            time.sleep(0.05)
+            self.played.append(sound)
+
+    backend = SlowBackend()
+    audio = AudioSystem(backend, min_interval=0)
+    started = time.perf_counter()
+    for _ in range(200):
+        audio.play("key")
+    audio.play("hit")
+    assert time.perf_counter() - started < 0.05
+    audio.close()
+    audio.worker.join(timeout=2)
+    assert len(backend.played) < 10
+    assert isinstance(create_backend("none"), NullBackend)
+    print("Audio System passed.")
+
+def test_score_store():
+    print("Testing Score Store...")
+    import json
+    import tempfile
+    import time
+    from src.mechanics.engines import ScoringEngine
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "scores.db")
+        legacy = os.path.join(directory, "scores.json")
+        with open(legacy, "w") as score_file:
+            json.dump({"1": 8, "2": 12}, score_file)
+
+        # Recording only enqueues; the worker commits behind the caller
+        scoring = ScoringEngine(path, legacy)
+        assert scoring.best_scores == {1: 8, 2: 12}
+        started = time.perf_counter()
+        for strokes in (9, 6, 7):
+            scoring.record_attempt(1, strokes, 1.5, 6)
+        assert time.perf_counter() - started < 0.05
+        assert scoring.best_scores[1] == 6
+        scoring.store.flush()
+        assert [attempt.keystrokes for attempt in scoring.store.history(1)] == [7, 6, 9, 8]
+        assert scoring.store.best(1).rank == "S - VIM MASTER"
+        assert scoring.store.best(3) is None
+        scoring.close()
+
+        # The legacy file is imported once, and attempts survive a restart
+        scoring = ScoringEngine(path, legacy)
+        assert scoring.best_scores == {1: 6, 2: 12} and len(scoring.store.history(1)) == 4
+        scoring.close()
+    print("Score Store passed.")
+
+def test_config_reload():
+    print("Testing Config Reload...")
+    import json
+    import tempfile
+    import threading
+    from src.core.config import DEFAULT_CONFIG, ConfigManager
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, ".vimgamerc")
+
+        # Defaults are copied, never shared
+        config = ConfigManager(path)
+        config.config["key_map"]["h"] = "x"
+        assert DEFAULT_CONFIG["key_map"]["h"] == "h" and config.get("key_map")["h"] == "h"
+
+        calls = []
+        config.subscribe(lambda settings, changed: calls.append(("keys", changed)), "key_map")
+        config.subscribe(lambda settings, changed: calls.append(("sound", changed)), "sound_enabled", "sound_backend")
+        with open(path, "w") as config_file:
+            json.dump({"key_map": {"a": "h"}, "sound_backend": 3}, config_file) # A bad value keeps its default
+        assert config.reload() == {"key_map"} and calls == [("keys", {"key_map"})]
+        assert config.settings.key_map == {"a": "h"} and config.settings.sound_backend == "bell"
+        assert config.reload() == set()
+
+        # The watcher picks up edits on its own
+        reloaded = threading.Event()
+        config.subscribe(lambda settings, changed: reloaded.set(), "sound_enabled")
+        config.watch(interval=0.01)
+        with open(path, "w") as config_file:
+            json.dump({"key_map": {"a": "h"}, "sound_enabled": False}, config_file)
+        assert reloaded.wait(2) and not config.get("sound_enabled")
+        assert calls[-1] == ("sound", {"sound_enabled"})
+        config.stop()
+        config.watcher.join(timeout=2)
+    print("Config Reload passed.")
+
+def test_profiler():
+    print("Testing Profiler...")
+    import json
+    import tempfile
+    from src.core.profiler import NULL_SPAN, Profiler
+
+    # Disabled spans are the shared no-op and record nothing
+    profiler = Profiler()
+    assert profiler.span("handle_key") is NULL_SPAN
+    with profiler.span("handle_key"):
+        pass
+    profiler.record("key_to_frame", 0.5)
+    assert profiler.summary() == []
+
+    profiler = Profiler(tracing=True)
+    for ms in range(1, 101):
+        profiler.record("frame", ms / 1e3)
+    with profiler.span("handle_key"):
+        with profiler.span("engine.move"):
+            pass
+    ranks = profiler.percentiles("frame")
+    assert (round(ranks[50]), round(ranks[95]), round(ranks[99])) == (51, 96, 100)
+    assert [row[0] for row in profiler.summary()][0] == "frame"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.json")
+        assert profiler.dump_trace(path) == 102
+        with open(path) as trace_file:
+            events = json.load(trace_file)["traceEvents"]
+        outer, inner = events[-1], events[-2]
+        assert (outer["name"], inner["name"]) == ("handle_key", "engine.move")
+        assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    print("Profiler passed.")
+
+def test_camera():
+    print("Testing Camera...")
+    from src.core.camera import Camera
+
+    camera = Camera(10, 6, scrolloff=2)
+    assert not camera.follow(7, 3, 100, 50) # Inside the margins: no scroll
+    assert camera.follow(8, 3, 100, 50) and camera.left == 1
+    assert camera.follow(0, 49, 100, 50) and camera.window(100, 50) == (0, 44, 10, 50) # Clamped to the map
+    assert Camera(10, 6, scrolloff=99).follow(50, 20, 100, 50) # A huge scrolloff centers the player
+    assert Camera(200, 200).window(100, 50) == (0, 0, 100, 50)
+
+    # Only the visible window is composed, and positions are shifted into it
+    grid = ["#" * 300] + ["#" + "." * 298 + "#" for _ in range(198)] + ["#" * 300]
+    grid[1] = "#@" + "." * 296 + ">#"
+    engine = GameEngine()
+    engine.load_level(LevelConfig(99, "Camera", "", grid))
+    engine.camera.resize(40, 20)
+    engine.camera.scrolloff = 5
+    view = engine.get_render_data()
+    assert len(view) == 20 and len(view[0]) == 40 and engine.render_dirty_rows is None
+    engine.apply_player_action("move", {"motion": "j", "count": 150})
+    view = engine.get_render_data()
+    left, top, right, bottom = engine.render_window
+    assert (left, top, bottom - top) == (0, 151 - 14, 20) and view[14][1] == "@"
+    engine.apply_player_action("move", {"motion": "k", "count": 1})
+    engine.get_render_data()
+    assert engine.render_dirty_rows == {13, 14} # Within the margins only the touched rows are redrawn
+    print("Camera passed.")
+
+def test_compact_storage():
+    print("Testing Compact Storage...")
+    from src.core.grid import TileGrid
+    from src.data.models import Entity, EntityType
+
+    grid = TileGrid(["#@..#", "#.."])
+    assert (grid.width, grid.height, len(grid.tiles)) == (5, 2, 10)
+    assert grid[1] == "#..##" and grid.get(3, 1) == "#" # Short rows are walled off
+    grid.set(2, 0, "x")
+    assert grid.row_chars(0, 1, 4) == ["@", "x", "."] and bytes(grid.row_view(0)) == b"#@x.#"
+    assert grid.is_floor(3, 0) and not grid.is_floor(2, 0) and not grid.is_floor(5, 0)
+
+    # Entities are slotted, numbered when placed, and found by id until removed
+    engine = GameEngine()
+    engine.load_level(LevelConfig(99, "Ids", "", ["#@.G.a.>#"]))
+    assert not hasattr(Point(0, 0), "__dict__") and not hasattr(engine.player, "__dict__")
+    minion = engine.get_entity_at(Point(3, 0))
+    assert sorted(engine.entities) == [0, 1, 2] and engine.get_entity(minion.id) is minion
+    engine.save_state()
+    engine.remove_entity(minion)
+    extra = Entity("Minion", "G", Point(2, 0), 5, 5, EntityType.ENEMY)
+    engine.add_entity(extra)
+    assert engine.get_entity(minion.id) is None and extra.id == 3
+    engine.undo()
+    assert engine.get_entity(minion.id) is minion and engine.get_entity(extra.id) is None
+    print("Compact Storage passed.")
+
+def test_effect_clock():
+    print("Testing Effect Clock...")
+    from src.core.scheduler import Scheduler
+    from src.data.models import Effect
+
+    clock = Scheduler()
+    fired = []
+    pulse = clock.every(3, lambda: fired.append(("pulse", clock.tick)))
+    cancelled = clock.after(2, lambda: fired.append("cancelled"))
+    clock.after(2, lambda: fired.append(("once", clock.tick)))
+    cancelled.cancel()
+    clock.advance(6)
+    pulse.cancel()
+    clock.advance(6)
+    assert fired == [("once", 6), ("pulse", 6), ("pulse", 6)] and len(clock) == 0
+
+    # Rendering never ages effects; only the clock does, and only touched rows are redrawn
+    engine = GameEngine(Scheduler())
+    engine.load_level(LevelConfig(99, "Fx", "", ["#@...#", "#....#", "#...>#"]))
+    engine.add_effect(Effect(Point(3, 1), "*", "#fff", 2))
+    engine.add_effect(Effect(Point(2, 2), "%", "#fff", 4))
+    for _ in range(3):
+        assert engine.get_render_data()[1][3] == "*"
+    engine.clock.advance(2)
+    assert engine.dirty_rows == {1}
+    view = engine.get_render_data()
+    assert view[1][3] == "." and view[2][2] == "%" and engine.render_dirty_rows == {1}
+    engine.clock.advance(2)
+    assert engine.get_render_data()[2][2] == "." and engine.effects == {}
+    print("Effect Clock passed.")
+
+def test_event_bus():
+    print("Testing Event Bus...")
+    import threading
+    from src.core.events import EventBus, EventKind, GameEvent
+
+    bus = EventBus(history=4, log_lines=3)
+    blocked, everything, worker_threads = [], [], []
+    bus.subscribe(blocked.append, EventKind.BLOCKED)
+    handle = bus.subscribe(everything.append)
+    bus.subscribe(lambda event: worker_threads.append(threading.current_thread()), EventKind.MOVED, threaded=True)
+    bus.publish(GameEvent(EventKind.MOVED, amount=3))
+    bus.publish(GameEvent(EventKind.BLOCKED, "Path blocked by: {}", ("Minion",)))
+    bus.unsubscribe(handle)
+    for n in range(3):
+        bus.publish(GameEvent(EventKind.INFO, "line {}", (n,)))
+    bus.close()
+    assert [event.kind for event in everything] == [EventKind.MOVED, EventKind.BLOCKED]
+    assert blocked[0].text == "Path blocked by: Minion" and blocked[0].seq == 2
+    assert worker_threads and worker_threads[0] is not threading.current_thread()
+    # Ring buffers: the oldest events fall out, and only events with a log line reach `lines`
+    assert [event.seq for event in bus.history] == [2, 3, 4, 5]
+    assert [event.text for event in bus.since(3)] == ["line 1", "line 2"] and bus.since(5) == []
+
+    engine = GameEngine()
+    engine.load_level(LevelConfig(99, "Bus", "", ["#@.G.>#"]))
+    kinds = []
+    engine.events.subscribe(lambda event: kinds.append((event.kind, event.amount)))
+    engine.apply_player_action("move", {"motion": "l", "count": 3})
+    engine.apply_player_action("undo", {})
+    assert kinds[:2] == [(EventKind.BLOCKED, 0), (EventKind.MOVED, 1)]
+    # Undo no longer rewinds the log; it appends to it
+    assert engine.messages[-2:] == ["Path blocked by: Minion", "Undid previous action."]
+    engine.remove_entity(engine.enemies[0])
+    engine.apply_player_action("move", {"motion": "l", "count": 9})
+    assert kinds[-2:] == [(EventKind.LEVEL_COMPLETE, 1), (EventKind.MOVED, 3)]
+    assert engine.messages[-1] == "Sector 99 cleared in 1 keystrokes."
+    print("Event Bus passed.")
+
+def test_headless_replay():
+    print("Testing Headless Replay...")
+    from src.core.simulator import simulate_batch
+    levels = [
+        LevelConfig(1, "Replay", "Test", ["#@.......>#"]),
+        LevelConfig(2, "Replay", "Test", ["#@.a.A.>#"]),
+    ]
+    # The first sector opens with the intro narrative up; its dismissing key never reaches the parser
+    runs = [
+        {"id": "walk", "level": 0, "keys": ["space", "8", "l"]},
+        {"id": "short", "level": 0, "keys": ["space", "l", "l"]},
+        {"id": "unlock", "level": 1, "keys": ["l", '"', "a", "y", "l", "l", '"', "a", "p", "l", "l", "l"]},
+    ]
+    report = simulate_batch(runs, levels=levels, processes=1)
+    results = {result["id"]: result for result in report["results"]}
+    assert results["walk"]["completed"] and results["walk"]["keystrokes"] == 1
+    assert not results["short"]["completed"] and results["short"]["keystrokes"] == 2
+    assert results["unlock"]["completed"] and results["unlock"]["final_hp"] == 20
+    assert report["errors"] == 0
+    print("Headless Replay passed.")
+
+def test_overlay_replay():
+    print("Testing Overlay Replay...")
+    from src.core.simulator import HeadlessSession
+    level = LevelConfig(1, "Overlay", "Test", ["#@.......>#"])
+
+    # Milestone sectors swallow the key that closes the narrative, like the app does
+    session = HeadlessSession(level, index=0)
+    session.feed(["l", "l"])
+    assert session.engine.player.position == Point(2, 0) and session.keys_fed == 2
+    assert HeadlessSession(level, index=1).overlay_open is False
+
+    # ? opens help and the next key only closes it, whatever it is
+    session = HeadlessSession(level)
+    session.feed(["?", "l", "l", "question_mark", "question_mark", "f12", "T", "l"])
+    assert session.engine.player.position == Point(3, 0) and session.engine.keystroke_count == 2
+    assert not session.overlay_open
+    print("Overlay Replay passed.")
+
+def test_procgen_solvability():
+    print("Testing ProcGen Solvability...")
+    generator = DungeonGenerator(width=12, height=6)
+    for difficulty in range(11, 31):
+        map_template = generator.generate(difficulty=difficulty, max_attempts=20)
+        assert generator.is_solvable([list(row) for row in map_template])
+
+    assert not generator.is_solvable([list(row) for row in ["#####", "#@#>#", "#####"]])
+    assert not generator.is_solvable([list(row) for row in ["######", "#@.A>#", "######"]])
+    assert generator.is_solvable([list(row) for row in ["#######", "#@a.A>#", "#######"]])
+
+    try:
+        DungeonGenerator(width=5, height=4).generate(difficulty=30)
+        assert False, "expected an impossible request to be rejected"
+    except ValueError:
+        pass
+    print("ProcGen Solvability passed.")
+
+def test_lazy_curriculum():
+    print("Testing Lazy Curriculum...")
+    from src.data.levels import Curriculum
+    curriculum = Curriculum(seed=7)
+    assert len(curriculum) == 30 and not curriculum.built
+    sector = curriculum[14]
+    assert sector.num == 15 and list(curriculum.built) == [14]
+    assert curriculum[14] is sector
+    assert Curriculum(seed=7)[14].map_template == sector.map_template
+    assert curriculum[-1].num == 30
+
+    # Built without the search, a sector plays on the formula par until it is settled
+    deferred = Curriculum(seed=7, solve=False)
+    assert deferred[14].par_keystrokes == 15 * 2 + 10 and deferred.unsolved == {14}
+    assert deferred.settle_par(14) and deferred[14].par_keystrokes == sector.par_keystrokes
+    assert not deferred.unsolved and not deferred.settle_par(14)
+    print("Lazy Curriculum passed.")
+
+def test_level_pack():
+    print("Testing Level Pack...")
+    import json
+    import pickle
+    import tempfile
+    from src.core.grid import TileGrid
+    from src.data.levels import Curriculum
+    from src.data.pack import HEADER, NO_SEED, level_to_dict, main, read_pack, write_pack
+
+    # The shipped pack must be exactly what the generator and solver produce today
+    pack = read_pack()
+    generated = list(Curriculum(pack_file=None))
+    assert pack is not None and list(pack) == generated and pack[-1] == generated[-1]
+
+    curriculum = Curriculum()
+    assert curriculum[14] == generated[14] and curriculum.pack is not None
+    other = Curriculum(seed=7)
+    assert other[14].map_template != generated[14].map_template and other.pack is None
+    # Copies map the pack again instead of trying to pickle the mmap
+    copy = pickle.loads(pickle.dumps(curriculum))
+    assert copy.pack is not None and copy[20] == generated[20]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "levels.pack")
+        # Ragged rows, None fields and an empty command set all survive the round trip
+        odd = LevelConfig(5000, "Odd", "", ["#@..>#", "##", ""], narrative_intro=None, detailed_help="\u00e9\n[bold]x[/]")
+        library = [LevelConfig(n, f"Community {n}", "", ["#" * 20, "#@" + "." * 16 + ">#", "#" * 20], {"h", "l"}, n % 9) for n in range(2000)]
+        assert write_pack(library + [odd], path=path) == 2001
+        big = read_pack(path)
+        assert len(big) == 2001 and big.seed == NO_SEED and not big.matches(1337, 25, 12)
+        assert big[1234] == library[1234] and big[-1] == odd
+        try:
+            big[2001]
+            assert False
+        except IndexError:
+            pass
+        big.close()
+        # Too short for a curriculum, so it is passed over
+        write_pack(generated[:2], 7, 25, 12, path)
+        assert read_pack(path).matches(7, 25, 12)
+        assert Curriculum(seed=7, pack_file=path)[1] == Curriculum(seed=7, pack_file=None)[1]
+
+        # The converter packs JSON levels
+        source = os.path.join(directory, "community.json")
+        with open(source, "w") as levels_file:
+            json.dump({"levels": [level_to_dict(odd), level_to_dict(generated[9])]}, levels_file)
+        assert main(["--from", source, path]) == 0 and list(read_pack(path)) == [odd, generated[9]]
+
+        # Tiles are one byte each, so wider glyphs are refused with the level and cell named
+        snowman = LevelConfig(77, "Snow", "", ["#@.\u2603>#"])
+        with open(source, "w") as levels_file:
+            json.dump([level_to_dict(snowman)], levels_file)
+        assert main(["--from", source, path]) == 1 and list(read_pack(path)) == [odd, generated[9]]
+        for build in (lambda: write_pack([snowman], path=path), lambda: TileGrid(snowman.map_template)):
+            try:
+                build()
+                assert False
+            except ValueError as error:
+                assert "column 3" in str(error)
+
+        with open(path, "r+b") as stale:
+            stale.write(HEADER.pack(b"VLPK", 99, 0, 2, NO_SEED, 0, 0))
+        with open(os.path.join(directory, "empty.pack"), "wb"):
+            pass
+        for broken in ("levels.pack", "empty.pack", "missing.pack"):
+            assert read_pack(os.path.join(directory, broken)) is None
+    print("Level Pack passed.")
+
+def test_par_solver():
+    print("Testing Par Solver...")
+    from src.core.simulator import replay
+    from src.core.solver import solve_par
+    from src.data.levels import procedural_sector
+    from src.data.models import LevelConfig
+
+    # Yank the key, open the lock, then walk to the exit
+    level = LevelConfig(99, "Solver", "", ["#######", "#@a...#", "#####A#", "#####>#", "#######"])
+    solution = solve_par(level)
+    assert solution.strokes == 4 and solution.keys[:3] == ['"', "a", "y"]
+    result = replay({"keys": solution.keys}, level)
+    assert result["completed"] and result["keystrokes"] == solution.strokes
+
+    sector = procedural_sector(15, seed=7)
+    result = replay({"keys": solve_par(sector).keys}, sector)
+    assert result["completed"] and result["keystrokes"] == sector.par_keystrokes
+
+    # $ stops at the wall like in the engine, so the way round is the par
+    detour = LevelConfig(99, "Detour", "", ["#@.#>#", "#....#", "######"])
+    solution = solve_par(detour)
+    assert solution.strokes == 3 and replay({"keys": solution.keys}, detour)["completed"]
+
+    walled = LevelConfig(99, "Walled", "", ["#####", "#@..#", "#####", "#.>.#", "#####"])
+    assert solve_par(walled) is None
+
+    # Sectors too big to search keep the formula instead of spending the whole budget
+    from src.data.levels import solve_sector_par
+    huge = procedural_sector(15, seed=7, width=100, height=50)
+    assert huge.par_keystrokes == 15 * 2 + 10 and not solve_sector_par(huge)
+    print("Par Solver passed.")
+
+def test_parser_bindings():
+    print("Testing Parser Bindings...")
+    from src.core.vim_logic import VimParser
+    actions, modes = [], []
+    parser = VimParser(modes.append, lambda action, params: actions.append((action, params)), {"a": "h", "h": "l"})
+
+    for key in ["5", "j", "quotation_mark", "q", "y", "d", "d", "a", "h"]:
+        parser.handle_key(key, GameMode.NORMAL)
+    assert actions == [
+        ("move", {"motion": "j", "count": 5}),
+        ("yank", {"reg": "q", "count": 1}),
+        ("delete_line", 1),
+        ("move", {"motion": "h", "count": 1}),
+        ("move", {"motion": "l", "count": 1}),
+    ]
+
+    # Operators and motions registered later dispatch like the defaults
+    parser.register_operator("c", {"c": "change_line"})
+    parser.register_motion("e")
+    assert parser.handle_key("2", GameMode.NORMAL) == "2"
+    assert parser.handle_key("c", GameMode.NORMAL) == "2c"
+    parser.handle_key("c", GameMode.NORMAL)
+    parser.handle_key("e", GameMode.NORMAL)
+    assert actions[-2:] == [("change_line", 2), ("move", {"motion": "e", "count": 1})]
+
+    parser.handle_key("colon", GameMode.NORMAL)
+    for key in ["s", "slash", "x", "enter"]:
+        parser.handle_key(key, GameMode.COMMAND)
+    assert modes == [GameMode.COMMAND, GameMode.NORMAL]
+    assert actions[-1] == ("regex_attack", {"command": "s/x"})
+    print("Parser Bindings passed.")
+
+def test_macro_playback():
+    print("Testing Macro Playback...")
+    from src.core.simulator import HeadlessSession
+    from src.core.vim_logic import MAX_MACRO_DEPTH, decode_keys, encode_keys
+    assert decode_keys(encode_keys(["l", "enter", "<", "colon"])) == ["l", "enter", "<", "colon"]
+
+    session = HeadlessSession(LevelConfig(99, "Macro", "", ["#" * 30, "#@" + "." * 27 + "#", "#" * 30]))
+    engine = session.engine
+    session.feed(["q", "a", "l", "q"])
+    assert engine.registers["a"] == "l" and engine.player.position == Point(2, 1)
+    # Only the motion is a turn; stopping the recording costs nothing and cannot be undone
+    assert engine.keystroke_count == 1 and len(engine.journal) == 1
+
+    # 20@a replays as one turn: one stroke, one undo record
+    records = len(engine.journal)
+    session.feed(["2", "0", "@", "a"])
+    assert engine.player.position == Point(22, 1)
+    assert engine.keystroke_count == 2 and len(engine.journal) == records + 1
+    session.feed(["u"])
+    assert engine.player.position == Point(2, 1) and engine.keystroke_count == 1
+
+    # A macro that calls itself stops at the nesting limit instead of recursing forever
+    session.feed(["q", "b", "l", "@", "b", "q", "@", "b"])
+    assert engine.player.position.x == 3 + MAX_MACRO_DEPTH
+    print("Macro Playback passed.")
+
+def test_jump_motions():
+    print("Testing Jump Motions...")
+    engine = GameEngine()
+    engine.load_level(LevelConfig(99, "Jumps", "", ["#@..a..G..c..>#"]))
+    def jump(motion, count=1, char=None):
+        engine.apply_player_action("move", {"motion": motion, "count": count, "char": char})
+        return engine.player.position.x
+
+    assert jump("w") == 4
+    # Jumps walk the same free run as counted moves and stop in front of what blocks it
+    assert jump("w") == 6 and engine.messages[-1] == "Path blocked by: Minion"
+    assert jump("f", char="c") == 6 and engine.messages[-1] == "Path blocked by: Minion"
+
+    # Removing the minion refreshes its row's tables, and undo restores them
+    engine.save_state()
+    engine.remove_entity(engine.get_entity_at(Point(7, 0)))
+    assert jump("w") == 10
+    engine.undo()
+    engine.undo()
+    assert engine.player.position.x == 6 and jump("w") == 6
+
+    # With the way clear, finds leap straight to their target
+    engine.remove_entity(engine.get_entity_at(Point(7, 0)))
+    assert jump("f", char="c") == 10
+    assert jump("F", char="a") == 4
+    assert jump("t", char="c") == 9
+    assert jump("0") == 1 and jump("b") == 1
+    assert jump("w", 2) == 10
+    jump("$")
+    assert engine.level_complete
+
+    # $ never carries the player past a wall or a lock on the way to the end of the row
+    for row, stop, message in (("#@..#..>#", 3, "Collided with boundary."), ("#@..A..>#", 3, "SECURITY ALERT: Lock A active.")):
+        engine.load_level(LevelConfig(99, "Walls", "", [row]))
+        assert jump("$") == stop and not engine.level_complete
+        assert message in engine.messages
+    print("Jump Motions passed.")
+
+def test_ray_moves():
+    print("Testing Ray Moves...")
+    engine = GameEngine()
+    engine.load_level(LevelConfig(99, "Rays", "", ["##########", "#@...G...#", "#.a......#", "#.......>#", "##########"]))
+    move = lambda motion, count: engine.apply_player_action("move", {"motion": motion, "count": count})
+
+    move("l", 9999)
+    assert engine.player.position == Point(4, 1) and engine.messages[-1] == "Path blocked by: Minion"
+    move("j", 9999) # Keys do not block
+    assert engine.player.position == Point(4, 3) and engine.messages[-1] == "Collided with boundary."
+    move("k", 9999)
+
+    # Removing the minion reopens the row; undoing the removal closes it again
+    engine.save_state()
+    engine.remove_entity(engine.get_entity_at(Point(5, 1)))
+    move("l", 9999)
+    assert engine.player.position == Point(8, 1)
+    engine.undo()
+    engine.undo()
+    move("l", 9999)
+    assert engine.player.position == Point(4, 1)
+
+    move("j", 2)
+    move("l", 9999)
+    assert engine.level_complete and engine.player.position == Point(7, 3)
+    print("Ray Moves passed.")
+
+def test_regex_combat():
+    print("Testing Regex Combat...")
+    from src.mechanics.regex_combat import RegexError, compile_pattern, parse_substitution
+    engine = GameEngine()
+    engine.load_level(LevelConfig(99, "Regex", "", ["#@..B..#", "#..B...#", "#.....>#"]))
+    attack = lambda command: engine.apply_player_action("regex_attack", {"command": command})
+    row_boss = engine.get_entity_at(Point(4, 0))
+    far_boss = engine.get_entity_at(Point(3, 1))
+
+    # Without g only the first match is rewritten
+    attack("s/CORRUPT/DATA/")
+    assert row_boss.hp == 8 and far_boss.hp == 10
+    assert row_boss.metadata["payload"].startswith("DATA:DATA:CORRUPT")
+
+    # Undo restores both the payload and the hp
+    engine.undo()
+    assert row_boss.hp == 10 and row_boss.metadata["payload"].startswith("CORRUPT:DATA")
+
+    # Five corrupt segments, two damage each: exactly lethal, but only for the boss on this row
+    attack("s/CORRUPT/DATA/g")
+    assert engine.get_entity_at(Point(4, 0)) is None and far_boss.hp == 10
+    attack("s/C.RRUPT/DATA/gi")
+    assert engine.messages[-1] == "No boss on this line. Use :%s to reach the whole map."
+    attack("%s/C.RRUPT/&/g") # Matches that do not change deal no damage
+    assert far_boss.hp == 10 and "No match" in engine.messages[-1]
+    attack("%s#[^:]+#DATA#g")
+    assert engine.get_entity_at(Point(3, 1)) is None
+
+    # Catastrophic patterns are refused before they run, and compiled patterns are reused
+    for pattern in ("(a+)+b", "(a|aa)*b", "(.*)*"):
+        try:
+            parse_substitution(f"s/{pattern}/x/").apply("a" * 30)
+            assert False, pattern
+        except RegexError:
+            pass
+    hits = compile_pattern.cache_info().hits
+    parse_substitution("s/[^:]+/DATA/g").apply("CORRUPT")
+    assert compile_pattern.cache_info().hits == hits + 1
+    print("Regex Combat passed.")
+
 if __name__ == "__main__":
     test_engine()
+    test_spatial_index()
+    test_undo_journal()
+    test_incremental_render()
+    test_row_strip_cache()
+    test_frame_coalescing()
+    test_background_sector()
+    test_audio_is_non_blocking()
+    test_score_store()
+    test_config_reload()
+    test_profiler()
+    test_camera()
+    test_compact_storage()
+    test_effect_clock()
+    test_event_bus()
+    test_headless_replay()
+    test_overlay_replay()
+    test_procgen_solvability()
+    test_lazy_curriculum()
+    test_level_pack()
+    test_par_solver()
+    test_parser_bindings()
+    test_macro_playback()
+    test_jump_motions()
+    test_ray_moves()
+    test_regex_combat()
@@ -5,14 +5,14 @@ analysis_results = Analysis(
     ['src\\app.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('src\\data\\curriculum.pack', 'src\\data')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
     excludes=[],
     noarchive=False,
-    optimize=0,
+    optimize=1,
 )
 python_archive = PYZ(analysis_results.pure)
 
@@ -26,7 +26,7 @@ executable_config = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,